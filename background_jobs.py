@@ -0,0 +1,44 @@
+"""Thread pool that shares one in-flight call between identical requests."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class BackgroundJobs:
+    """Run slow calls off the Streamlit script thread.
+
+    ``submit`` is keyed: while a job for a key is still running, submitting the
+    same key returns the existing future instead of starting a second call, so
+    several sessions asking for the same prompt wait on one request.
+    """
+
+    def __init__(self, max_workers: int = 4) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="comparia-job")
+        # Re-entrant: a future that finishes during submit runs its callback inline.
+        self._lock = threading.RLock()
+        self._in_flight: dict[Hashable, Future] = {}
+
+    def submit(self, key: Hashable, fn: Callable, *args, **kwargs) -> Future:
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                return future
+            future = self._executor.submit(fn, *args, **kwargs)
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+            return future
+
+    def _forget(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,144 @@
+"""Concurrent API calls under a concurrency cap, a token bucket and retry with backoff."""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections.abc import Callable, Hashable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import httpx
+
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+# httpx.TimeoutException and the connect/read/network errors all derive from
+# httpx.TransportError, and none of them derive from the builtin ones.
+TRANSPORT_ERRORS = (TimeoutError, ConnectionError, httpx.TransportError)
+
+
+class TokenBucket:
+    """Allow ``rate`` calls per second on average, with bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a token is free; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def status_code(exc: BaseException) -> int | None:
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code
+
+
+def is_retryable(exc: BaseException) -> bool:
+    code = status_code(exc)
+    if code is not None:
+        return code in RETRYABLE_STATUS
+    return isinstance(exc, TRANSPORT_ERRORS)
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Server-requested delay from a Retry-After header, when there is one."""
+    response = getattr(exc, "raw_response", None) or getattr(exc, "response", None)
+    value = getattr(response, "headers", {}).get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+@dataclass
+class CallReport:
+    label: str
+    latency_sec: float = 0.0
+    attempts: int = 0
+    waited_sec: float = 0.0
+    error: str = ""
+
+    @property
+    def retries(self) -> int:
+        return max(0, self.attempts - 1)
+
+
+def call_with_backoff(
+    fn: Callable[[], object],
+    report: CallReport,
+    *,
+    bucket: TokenBucket | None = None,
+    max_retries: int = 4,
+    base_delay: float = 0.5,
+    max_delay: float = 16.0,
+    breaker=None,
+):
+    """Call ``fn`` until it succeeds, retrying 429/5xx and transport errors
+    with full-jitter exponential backoff. Every attempt takes a bucket token.
+
+    With a ``breaker`` (circuit_breaker.CircuitBreaker), attempts fail fast
+    without waiting for a token while it is open.
+    """
+    started = time.perf_counter()
+    try:
+        for attempt in range(max_retries + 1):
+            report.attempts = attempt + 1
+            try:
+                if breaker is not None:
+                    breaker.raise_if_open()
+                if bucket is not None:
+                    report.waited_sec += bucket.acquire()
+                return fn()
+            except Exception as exc:
+                if attempt == max_retries or not is_retryable(exc):
+                    report.error = str(exc)
+                    raise
+                delay = retry_after(exc) or random.uniform(0, min(max_delay, base_delay * 2**attempt))
+                report.waited_sec += delay
+                time.sleep(delay)
+    finally:
+        report.latency_sec = time.perf_counter() - started
+
+
+def run_batch(
+    calls: dict[Hashable, Callable[[], object]],
+    *,
+    max_concurrency: int = 4,
+    rate_per_sec: float = 2.0,
+    **backoff,
+) -> tuple[dict[Hashable, object], list[CallReport]]:
+    """Run ``calls`` concurrently. Failed calls map to their exception instead
+    of aborting the batch; one report per call comes back in input order."""
+    bucket = TokenBucket(rate_per_sec)
+    reports = {key: CallReport(str(key)) for key in calls}
+    results: dict[Hashable, object] = {}
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="comparia-batch") as executor:
+        futures = {
+            key: executor.submit(call_with_backoff, fn, reports[key], bucket=bucket, **backoff)
+            for key, fn in calls.items()
+        }
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as exc:
+                results[key] = exc
+    return results, [reports[key] for key in calls]
@@ -0,0 +1,116 @@
+"""Circuit breaker that stops calling a failing service for a cool-down window."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the service while the breaker is open."""
+
+
+class CircuitBreaker:
+    """Trip after ``failure_threshold`` consecutive failures.
+
+    While open, calls fail fast with ``CircuitOpenError``. Once
+    ``cooldown_seconds`` have passed a single probe call is let through
+    (half-open): success closes the breaker, failure re-opens it for another
+    cool-down. A probe that never reports back is replaced after a cool-down.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self.last_error = ""
+
+    @property
+    def state(self) -> str:
+        """``closed``, ``open`` (failing fast) or ``half-open`` (probe due or running)."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._probing or self._clock() - self._opened_at >= self.cooldown_seconds:
+                return "half-open"
+            return "open"
+
+    @property
+    def failures(self) -> int:
+        return self._failures
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed; 0 when calls go through."""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self._opened_at + self.cooldown_seconds - self._clock())
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now; claims the probe slot when half-opening."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = self._clock()
+            if now - self._opened_at < self.cooldown_seconds:
+                return False
+            self._opened_at = now
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self, error: BaseException | None = None) -> None:
+        with self._lock:
+            self._failures += 1
+            if error is not None:
+                self.last_error = str(error)
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+                self._probing = False
+
+    def reset(self) -> None:
+        self.record_success()
+
+    def blocked(self) -> bool:
+        """Whether calls are being rejected; unlike ``allow`` this never claims the probe."""
+        with self._lock:
+            return self._opened_at is not None and self._clock() - self._opened_at < self.cooldown_seconds
+
+    def _open_error(self) -> CircuitOpenError:
+        return CircuitOpenError(f"AI calls paused for {self.retry_in():.0f}s after {self._failures} consecutive failures")
+
+    def check(self) -> None:
+        if not self.allow():
+            raise self._open_error()
+
+    def raise_if_open(self) -> None:
+        """Fail fast while blocked, leaving the probe slot to the actual call."""
+        if self.blocked():
+            raise self._open_error()
+
+    def call(self, fn: Callable, *args, **kwargs):
+        self.check()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as exc:
+            self.record_failure(exc)
+            raise
+        self.record_success()
+        return result
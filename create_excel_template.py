@@ -1,22 +1,84 @@
+import argparse
+import time
+
 import pandas as pd
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
-import os
-
-def create_excel_template():
-    """Create a comprehensive Excel template for data collection"""
-    
-    # Create workbook
-    wb = Workbook()
-    
-    # Remove default sheet
-    wb.remove(wb.active)
-    
-    # Define styles
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    category_fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.utils import get_column_letter
+
+TEMPLATE_FILE = "compar_ia_data_collection_template.xlsx"
+MAX_COLUMN_WIDTH = 50
+
+HEADERS = [
+    "Task ID", "Task Category", "Task Description", "Model", "Model Size",
+    "Quality Score (1-5)", "Latency (sec)", "Energy (kWh)", "CO₂ (kg eq.)",
+    "Cost (€)", "Notes"
+]
+# Summary sheet label for each model size
+SIZE_LABELS = {
+    "Small": "Small (8B parameters):",
+    "Medium": "Medium (20B parameters):",
+    "Large": "Large (70B+ parameters):",
+}
+
+# Task definitions
+TASKS = {
+    "Factual & Rewriting (1-10)": [
+        "Who is the current UN Secretary-General?",
+        "Summarise a 150-word news article in one sentence.",
+        "Translate a paragraph about climate change into French.",
+        "Classify sentiment of 3 tweets (positive/negative).",
+        "Extract email & phone number from a text.",
+        "Explain the difference between RAM and ROM.",
+        "Name three renewable energy sources.",
+        "Turn a dense paragraph into bullet points.",
+        "Rewrite a sentence in a formal business tone.",
+        "Create a catchy blog title about electric cars."
+    ],
+    "Reasoning & Quantitative (11-15)": [
+        "Train A leaves at 10:00 at 100 km/h, Train B at 11:00 at 120 km/h — when do they meet?",
+        "Solve a system: 2x+3y=12 and x-y=4.",
+        "Give the derivative of x³+2x²-5x+7.",
+        "Explain 'overfitting' simply.",
+        "Convert 1500 W to kWh for 24 h and to yearly cost at 0.20 €/kWh."
+    ],
+    "Programming & Debugging (16-20)": [
+        "Write Python code reversing a string.",
+        "Fix the bug in 'for i in range(5) print(i)'.",
+        "Explain what this recursive Python function returns (teacher gives code).",
+        "Suggest an optimisation for a slow SQL query (given).",
+        "Explain Big-O complexity of binary search."
+    ],
+    "Knowledge & Reasoning (21-25)": [
+        "Compare nuclear vs solar energy (3 pros / 3 cons each).",
+        "Explain GDPR compliance steps for a SaaS startup.",
+        "Summarise a Wikipedia article on climate change into 5 key bullet points.",
+        "Describe in detail the transformer architecture (attention, encoder/decoder).",
+        "List and explain three differences between supervised, unsupervised, and reinforcement learning."
+    ],
+    "Advanced & Creative (26-30)": [
+        "Write a project plan for deploying AI to monitor deforestation using satellites.",
+        "Draft a LinkedIn post convincing a company to adopt green AI.",
+        "Create a short legal disclaimer about data privacy for an AI chatbot.",
+        "Imagine and explain a new business model that uses AI to reduce carbon emissions in logistics.",
+        "Analyse a research abstract (teacher provides) and rewrite it for a non-technical policymaker."
+    ]
+}
+
+# Models to test
+MODELS = [
+    ("LLaMA 3.1 8B", "Small"),
+    ("Gemma 8B", "Small"),
+    ("Mistral Small", "Medium"),
+    ("GPT-OSS 20B", "Medium"),
+    ("GPT-5", "Large"),
+    ("DeepSeek R1", "Large")
+]
+
+
+def template_styles():
+    """Named styles of the template, registered once per workbook"""
     border = Border(
         left=Side(style='thin'),
         right=Side(style='thin'),
@@ -24,144 +86,98 @@ def create_excel_template():
         bottom=Side(style='thin')
     )
     center_alignment = Alignment(horizontal='center', vertical='center')
-    
-    # Task definitions
-    tasks = {
-        "Factual & Rewriting (1-10)": [
-            "Who is the current UN Secretary-General?",
-            "Summarise a 150-word news article in one sentence.",
-            "Translate a paragraph about climate change into French.",
-            "Classify sentiment of 3 tweets (positive/negative).",
-            "Extract email & phone number from a text.",
-            "Explain the difference between RAM and ROM.",
-            "Name three renewable energy sources.",
-            "Turn a dense paragraph into bullet points.",
-            "Rewrite a sentence in a formal business tone.",
-            "Create a catchy blog title about electric cars."
-        ],
-        "Reasoning & Quantitative (11-15)": [
-            "Train A leaves at 10:00 at 100 km/h, Train B at 11:00 at 120 km/h — when do they meet?",
-            "Solve a system: 2x+3y=12 and x-y=4.",
-            "Give the derivative of x³+2x²-5x+7.",
-            "Explain 'overfitting' simply.",
-            "Convert 1500 W to kWh for 24 h and to yearly cost at 0.20 €/kWh."
-        ],
-        "Programming & Debugging (16-20)": [
-            "Write Python code reversing a string.",
-            "Fix the bug in 'for i in range(5) print(i)'.",
-            "Explain what this recursive Python function returns (teacher gives code).",
-            "Suggest an optimisation for a slow SQL query (given).",
-            "Explain Big-O complexity of binary search."
-        ],
-        "Knowledge & Reasoning (21-25)": [
-            "Compare nuclear vs solar energy (3 pros / 3 cons each).",
-            "Explain GDPR compliance steps for a SaaS startup.",
-            "Summarise a Wikipedia article on climate change into 5 key bullet points.",
-            "Describe in detail the transformer architecture (attention, encoder/decoder).",
-            "List and explain three differences between supervised, unsupervised, and reinforcement learning."
-        ],
-        "Advanced & Creative (26-30)": [
-            "Write a project plan for deploying AI to monitor deforestation using satellites.",
-            "Draft a LinkedIn post convincing a company to adopt green AI.",
-            "Create a short legal disclaimer about data privacy for an AI chatbot.",
-            "Imagine and explain a new business model that uses AI to reduce carbon emissions in logistics.",
-            "Analyse a research abstract (teacher provides) and rewrite it for a non-technical policymaker."
-        ]
-    }
-    
-    # Models to test
-    models = [
-        ("LLaMA 3.1 8B", "Small"),
-        ("Gemma 8B", "Small"),
-        ("Mistral Small", "Medium"),
-        ("GPT-OSS 20B", "Medium"),
-        ("GPT-5", "Large"),
-        ("DeepSeek R1", "Large")
+    return [
+        NamedStyle(
+            name="comparia_header",
+            font=Font(bold=True, color="FFFFFF"),
+            fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+            alignment=center_alignment,
+            border=border,
+        ),
+        # First row of each task category
+        NamedStyle(
+            name="comparia_category",
+            fill=PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid"),
+            alignment=center_alignment,
+            border=border,
+        ),
+        NamedStyle(name="comparia_cell", alignment=center_alignment, border=border),
+        NamedStyle(name="comparia_title", font=Font(bold=True)),
+        NamedStyle(name="comparia_bullet", font=Font(italic=True)),
     ]
-    
-    # Create data collection sheet
-    ws_data = wb.create_sheet("Data Collection")
-    
-    # Headers
-    headers = [
-        "Task ID", "Task Category", "Task Description", "Model", "Model Size",
-        "Quality Score (1-5)", "Latency (sec)", "Energy (kWh)", "CO₂ (kg eq.)", 
-        "Cost (€)", "Notes"
-    ]
-    
-    # Write headers
-    for col, header in enumerate(headers, 1):
-        cell = ws_data.cell(row=1, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = center_alignment
-        cell.border = border
-    
-    # Write data
-    row = 2
-    task_id = 1
-    
+
+
+def styled_cells(ws, style, count):
+    """Reusable cells for write-only rows: set .value, then append"""
+    cells = []
+    for _ in range(count):
+        cell = WriteOnlyCell(ws)
+        cell.style = style
+        cells.append(cell)
+    return cells
+
+
+def column_widths(columns):
+    """Widths from the distinct values of each column, capped like Excel autofit"""
+    widths = []
+    for header, values in zip(HEADERS, columns):
+        longest = max([len(header)] + [len(str(value)) for value in set(values)])
+        widths.append(min(longest + 2, MAX_COLUMN_WIDTH))
+    return widths
+
+
+def write_data_sheet(wb, tasks, models):
+    """Write the Data Collection sheet row by row; returns the number of runs"""
+    ws = wb.create_sheet("Data Collection")
+
+    # One entry per task, expanded to one row per model below
+    task_ids, categories, descriptions = [], [], []
     for category, task_list in tasks.items():
         for task_desc in task_list:
-            for model_name, model_size in models:
-                # Task ID
-                ws_data.cell(row=row, column=1, value=task_id).border = border
-                # Task Category
-                ws_data.cell(row=row, column=2, value=category).border = border
-                # Task Description
-                ws_data.cell(row=row, column=3, value=task_desc).border = border
-                # Model
-                ws_data.cell(row=row, column=4, value=model_name).border = border
-                # Model Size
-                ws_data.cell(row=row, column=5, value=model_size).border = border
-                # Quality Score (empty for user input)
-                ws_data.cell(row=row, column=6, value="").border = border
-                # Latency (empty for user input)
-                ws_data.cell(row=row, column=7, value="").border = border
-                # Energy (empty for user input)
-                ws_data.cell(row=row, column=8, value="").border = border
-                # CO₂ (empty for user input)
-                ws_data.cell(row=row, column=9, value="").border = border
-                # Cost (empty for user input)
-                ws_data.cell(row=row, column=10, value="").border = border
-                # Notes (empty for user input)
-                ws_data.cell(row=row, column=11, value="").border = border
-                
-                row += 1
-            task_id += 1
-    
-    # Apply category coloring
-    current_category = None
-    for row in range(2, ws_data.max_row + 1):
-        category_cell = ws_data.cell(row=row, column=2)
-        if category_cell.value != current_category:
-            current_category = category_cell.value
-            fill_color = category_fill
-        else:
-            fill_color = None
-        
-        for col in range(1, 12):
-            cell = ws_data.cell(row=row, column=col)
-            if fill_color:
-                cell.fill = fill_color
-            cell.alignment = center_alignment
-    
-    # Auto-adjust column widths
-    for column in ws_data.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws_data.column_dimensions[column_letter].width = adjusted_width
-    
-    # Create instructions sheet
-    ws_instructions = wb.create_sheet("Instructions")
-    
+            task_ids.append(len(task_ids) + 1)
+            categories.append(category)
+            descriptions.append(task_desc)
+    model_names = [name for name, _ in models]
+    model_sizes = [size for _, size in models]
+
+    # Write-only sheets take their column widths before the first row
+    widths = column_widths([task_ids, categories, descriptions, model_names, model_sizes] + [[]] * 6)
+    for col, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(col)].width = width
+
+    header_cells = styled_cells(ws, "comparia_header", len(HEADERS))
+    for cell, header in zip(header_cells, HEADERS):
+        cell.value = header
+    ws.append(header_cells)
+
+    first_cells = styled_cells(ws, "comparia_category", len(HEADERS))
+    body_cells = styled_cells(ws, "comparia_cell", len(HEADERS))
+    previous_category = None
+    for task_id, category, task_desc in zip(task_ids, categories, descriptions):
+        for model_name, model_size in models:
+            cells = first_cells if category != previous_category else body_cells
+            previous_category = category
+            # The measurement columns stay blank for user input
+            for cell, value in zip(cells, (task_id, category, task_desc, model_name, model_size)):
+                cell.value = value
+            ws.append(cells)
+    return len(task_ids) * len(models)
+
+
+def write_text_sheet(wb, title, rows, widths):
+    ws = wb.create_sheet(title)
+    for col, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(col)].width = width
+    for row in rows:
+        style = row[0]
+        cells = [WriteOnlyCell(ws, value=value) for value in row[1:]]
+        if style:
+            cells[0].style = style
+        ws.append(cells)
+
+
+def instruction_rows():
+    """Instructions sheet rows as (style, text)"""
     instructions = [
         ["Compar'IA Benchmarking - Data Collection Instructions"],
         [""],
@@ -218,48 +234,45 @@ def create_excel_template():
         [""],
         ["Good luck with your benchmarking! 🚀"]
     ]
-    
-    for row, instruction in enumerate(instructions, 1):
-        cell = ws_instructions.cell(row=row, column=1, value=instruction[0])
-        if instruction[0].startswith("Compar'IA") or instruction[0].startswith("1.") or instruction[0].startswith("2.") or instruction[0].startswith("3.") or instruction[0].startswith("4.") or instruction[0].startswith("5.") or instruction[0].startswith("6.") or instruction[0].startswith("7."):
-            cell.font = Font(bold=True)
-        elif instruction[0].startswith("   •"):
-            cell.font = Font(italic=True)
-    
-    # Auto-adjust column width for instructions
-    ws_instructions.column_dimensions['A'].width = 80
-    
-    # Create summary sheet
-    ws_summary = wb.create_sheet("Summary")
-    
+
+    rows = []
+    for (text,) in instructions:
+        if text.startswith("Compar'IA") or text[:2] in ("1.", "2.", "3.", "4.", "5.", "6.", "7."):
+            rows.append(("comparia_title", text))
+        elif text.startswith("   •"):
+            rows.append(("comparia_bullet", text))
+        else:
+            rows.append((None, text))
+    return rows
+
+
+def summary_rows(tasks, models):
+    """Summary sheet rows as (style, label[, value]), counted from the campaign"""
+    n_tasks = sum(len(task_list) for task_list in tasks.values())
+    n_runs = n_tasks * len(models)
+    sizes = pd.Series([size for _, size in models]).value_counts()
     summary_data = [
         ["Compar'IA Benchmarking Summary"],
         [""],
-        ["Total Tasks:", "30"],
-        ["Total Models:", "6"],
-        ["Total Test Runs:", "180"],
+        ["Total Tasks:", str(n_tasks)],
+        ["Total Models:", str(len(models))],
+        ["Total Test Runs:", str(n_runs)],
         [""],
         ["Models by Size:"],
-        ["Small (8B parameters):", "2 models"],
-        ["Medium (20B parameters):", "2 models"],
-        ["Large (70B+ parameters):", "2 models"],
+        *[[label, f"{sizes.get(size, 0)} models"] for size, label in SIZE_LABELS.items()],
         [""],
         ["Task Distribution:"],
-        ["Factual & Rewriting:", "10 tasks"],
-        ["Reasoning & Quantitative:", "5 tasks"],
-        ["Programming & Debugging:", "5 tasks"],
-        ["Knowledge & Reasoning:", "5 tasks"],
-        ["Advanced & Creative:", "5 tasks"],
+        *[[f"{category.split(' (')[0]}:", f"{len(task_list)} tasks"] for category, task_list in tasks.items()],
         [""],
         ["Expected Metrics per Model:"],
-        ["Quality Scores:", "30 scores (1-5 scale)"],
-        ["Latency Measurements:", "30 measurements (seconds)"],
-        ["Energy Consumption:", "30 measurements (kWh)"],
-        ["CO₂ Emissions:", "30 measurements (kg eq.)"],
-        ["Cost Analysis:", "30 measurements (€)"],
+        ["Quality Scores:", f"{n_tasks} scores (1-5 scale)"],
+        ["Latency Measurements:", f"{n_tasks} measurements (seconds)"],
+        ["Energy Consumption:", f"{n_tasks} measurements (kWh)"],
+        ["CO₂ Emissions:", f"{n_tasks} measurements (kg eq.)"],
+        ["Cost Analysis:", f"{n_tasks} measurements (€)"],
         [""],
         ["Data Collection Status:"],
-        ["Completed Tasks:", "0/180"],
+        ["Completed Tasks:", f"0/{n_runs}"],
         ["Completion Rate:", "0%"],
         [""],
         ["Next Steps:"],
@@ -269,26 +282,61 @@ def create_excel_template():
         ["4. Analyze results and create visualizations"],
         ["5. Prepare presentation slides"]
     ]
-    
-    for row, data in enumerate(summary_data, 1):
-        cell = ws_summary.cell(row=row, column=1, value=data[0])
-        if len(data) > 1:
-            ws_summary.cell(row=row, column=2, value=data[1])
-        
-        if data[0].startswith("Compar'IA") or data[0].endswith(":"):
-            cell.font = Font(bold=True)
-    
-    # Auto-adjust column widths for summary
-    ws_summary.column_dimensions['A'].width = 30
-    ws_summary.column_dimensions['B'].width = 20
-    
+    return [
+        ("comparia_title" if data[0].startswith("Compar'IA") or data[0].endswith(":") else None, *data)
+        for data in summary_data
+    ]
+
+
+def create_excel_template(filename=TEMPLATE_FILE, tasks=None, models=None):
+    """Create a comprehensive Excel template for data collection
+
+    The workbook is written in openpyxl's write-only mode: rows are streamed
+    to disk as they are appended, and every cell points at a named style
+    instead of carrying its own font/fill/border objects.
+    """
+    tasks = tasks or TASKS
+    models = models or MODELS
+    started = time.perf_counter()
+
+    wb = Workbook(write_only=True)
+    for style in template_styles():
+        wb.add_named_style(style)
+
+    n_runs = write_data_sheet(wb, tasks, models)
+    write_text_sheet(wb, "Instructions", instruction_rows(), [80])
+    write_text_sheet(wb, "Summary", summary_rows(tasks, models), [30, 20])
+
     # Save the workbook
-    filename = "compar_ia_data_collection_template.xlsx"
     wb.save(filename)
     print(f"✅ Excel template created: {filename}")
     print(f"📊 Total sheets: {len(wb.worksheets)}")
-    print(f"📝 Data collection rows: {ws_data.max_row - 1}")
-    print(f"🎯 Total test runs: {(ws_data.max_row - 1)}")
+    print(f"📝 Data collection rows: {n_runs}")
+    print(f"🎯 Total test runs: {n_runs}")
+    print(f"⏱️ Written in {time.perf_counter() - started:.2f}s")
+    return n_runs
+
+
+def read_campaign(tasks_csv=None, models_csv=None):
+    """Tasks and models from CSV files, defaulting to the 30 × 6 reference campaign"""
+    tasks, models = TASKS, MODELS
+    if tasks_csv:
+        task_df = pd.read_csv(tasks_csv)
+        tasks = {
+            str(category): group["Task Description"].astype(str).tolist()
+            for category, group in task_df.groupby("Task Category", sort=False)
+        }
+    if models_csv:
+        model_df = pd.read_csv(models_csv)
+        models = list(zip(model_df["Model"].astype(str), model_df["Model Size"].astype(str)))
+    return tasks, models
+
 
 if __name__ == "__main__":
-    create_excel_template()
+    parser = argparse.ArgumentParser(description="Create the Compar'IA data collection workbook")
+    parser.add_argument("--output", default=TEMPLATE_FILE)
+    parser.add_argument("--tasks", help="CSV with 'Task Category' and 'Task Description' columns")
+    parser.add_argument("--models", help="CSV with 'Model' and 'Model Size' columns")
+    args = parser.parse_args()
+    tasks, models = read_campaign(args.tasks, args.models)
+    create_excel_template(args.output, tasks, models)
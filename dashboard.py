@@ -8,6 +8,12 @@ import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 
+from export_formats import EXPORT_FORMATS, XLSX_MAX_ROWS, export_file_name, export_mime, write_export
+from profiling import run_profiled
+from quantile_sketch import KLLSketch
+from report_store import MANIFEST_NAME, REPORT_DIR, load_analysis_report, read_table
+from synthetic_data import default_profiles, generate_runs
+
 
 APP_TITLE = "Compar'IA"
 DATA_FILES = (
@@ -21,6 +27,18 @@ SIZE_COLORS = {
     "Medium": "#38bdf8",
     "Large": "#f43f5e",
 }
+# Tail percentiles tracked with mergeable sketches during ingestion.
+PERCENTILES = (50, 90, 95, 99)
+TAIL_METRICS = ("Latency_sec", "Energy_kWh")
+SKETCH_KEYS = ("Model", "Model_Size", "Task_Category")
+TASK_METRICS = ("Quality_Score", "Latency_sec", "Energy_kWh", "Cost_EUR")
+SCORING_MODES = {"Mean-based": None, "Task-normalized (min-max)": "minmax", "Task-normalized (z-score)": "zscore"}
+# Download label -> file name stem
+EXPORT_LEVELS = {
+    "Model metrics": "comparia_sustainability",
+    "Task-level runs": "comparia_task_runs",
+    "Size aggregates": "comparia_size_summary",
+}
 PAGES_URL = "https://likhitayerra.github.io/Compar-IA-Benchmarking-Dashboard/"
 TASK_CATALOG: list[tuple[int, str, str]] = [
     (1, "Factual & Rewriting", "Who is the current UN Secretary-General?"),
@@ -262,51 +280,7 @@ def minmax(
 
 
 def create_sample_data(seed: int = 42) -> pd.DataFrame:
-    rng = np.random.default_rng(seed)
-    models = [
-        ("LLaMA 3.1 8B", "Small"),
-        ("Gemma 8B", "Small"),
-        ("Mistral Small", "Medium"),
-        ("GPT-OSS 20B", "Medium"),
-        ("GPT-5", "Large"),
-        ("DeepSeek R1", "Large"),
-    ]
-    categories = [
-        "Factual & Rewriting",
-        "Reasoning & Quantitative",
-        "Programming & Debugging",
-        "Knowledge & Synthesis",
-        "Advanced & Creative",
-    ]
-
-    rows = []
-    for task_id in range(1, 31):
-        category = categories[min((task_id - 1) // 6, len(categories) - 1)]
-        difficulty = 1.0 + (0.1 if task_id > 20 else 0.0)
-
-        for model, size in models:
-            if size == "Small":
-                quality, latency, energy, cost = 3.7, 2.6, 0.16, 0.02
-            elif size == "Medium":
-                quality, latency, energy, cost = 4.1, 4.4, 0.34, 0.08
-            else:
-                quality, latency, energy, cost = 4.45, 6.8, 0.88, 0.26
-
-            rows.append(
-                {
-                    "Task_ID": task_id,
-                    "Task_Category": category,
-                    "Model": model,
-                    "Model_Size": size,
-                    "Quality_Score": np.clip(rng.normal(quality, 0.45) / difficulty, 1, 5),
-                    "Latency_sec": max(0.2, rng.normal(latency * difficulty, latency * 0.18)),
-                    "Energy_kWh": max(0.01, rng.normal(energy * difficulty, energy * 0.18)),
-                    "CO2_kg": max(0.005, rng.normal(energy * difficulty * 0.45, energy * 0.08)),
-                    "Cost_EUR": max(0.001, rng.normal(cost * difficulty, cost * 0.16)),
-                    "Notes": "Synthetic demonstration row",
-                }
-            )
-    return pd.DataFrame(rows)
+    return generate_runs(default_profiles(), seed=seed, categorical=False)
 
 
 def load_raw_data() -> tuple[pd.DataFrame | None, str]:
@@ -320,16 +294,28 @@ def load_raw_data() -> tuple[pd.DataFrame | None, str]:
     return None, "No populated task-level CSV found"
 
 
-def load_aggregated_data() -> tuple[pd.DataFrame | None, str]:
+def aggregated_data_path() -> Path | None:
+    """Metrics table of the last generate_report.py run, else AGGREGATED_DATA_FILE."""
+    try:
+        manifest = load_analysis_report(Path(REPORT_DIR) / MANIFEST_NAME, tables=[]).manifest
+    except (OSError, ValueError):
+        manifest = {}
+    if "metrics" in manifest.get("tables", {}):
+        return Path(REPORT_DIR) / manifest["tables"]["metrics"]["file"]
     path = Path(AGGREGATED_DATA_FILE)
-    if not path.exists():
-        return None, f"{AGGREGATED_DATA_FILE} not found"
+    return path if path.exists() else None
+
+
+def load_aggregated_data() -> tuple[pd.DataFrame | None, str]:
+    path = aggregated_data_path()
+    if path is None:
+        return None, f"Neither {REPORT_DIR}/ nor {AGGREGATED_DATA_FILE} found"
 
-    metrics = pd.read_csv(path)
+    metrics = pd.read_csv(path) if path.suffix == ".csv" else read_table(path)
     required = {"Model", "Model_Size", "Quality_Score_mean", "Latency_sec_mean", "Energy_kWh_mean", "CO2_kg_mean"}
     if required.issubset(metrics.columns):
-        return metrics, f"Loaded aggregated metrics from {AGGREGATED_DATA_FILE}"
-    return None, f"{AGGREGATED_DATA_FILE} is missing required columns"
+        return metrics, f"Loaded aggregated metrics from {path.as_posix()}"
+    return None, f"{path.as_posix()} is missing required columns"
 
 
 def infer_model_size(model: str) -> str:
@@ -364,10 +350,66 @@ def standardize_raw_data(df: pd.DataFrame) -> pd.DataFrame:
     return df.dropna(subset=["Model", "Quality_Score", "Latency_sec", "Energy_kWh"])
 
 
-def aggregate_raw_data(df: pd.DataFrame) -> pd.DataFrame:
+def percentile_columns(metric: str) -> list[str]:
+    return [f"{metric}_p{p}" for p in PERCENTILES]
+
+
+def build_metric_sketches(
+    df: pd.DataFrame, keys: tuple[str, ...] = SKETCH_KEYS, k: int = 200
+) -> dict[tuple, dict[str, KLLSketch]]:
+    """One KLL sketch per group and tail metric. Groups are kept at the finest
+    grain (model × category) so coarser views are merges, not rescans."""
+    columns = {metric: df[metric].to_numpy(dtype=float) for metric in TAIL_METRICS if metric in df.columns}
+    groups = df.groupby(list(keys), dropna=False, observed=True, sort=False).indices
+    sketches: dict[tuple, dict[str, KLLSketch]] = {}
+    for key, positions in groups.items():
+        key = key if isinstance(key, tuple) else (key,)
+        sketches[key] = {metric: KLLSketch(k, seed=0).update(values[positions]) for metric, values in columns.items()}
+    return sketches
+
+
+def sketch_percentiles(
+    sketches: dict[tuple, dict[str, KLLSketch]],
+    keys: tuple[str, ...] = SKETCH_KEYS,
+    by: tuple[str, ...] = ("Model", "Model_Size"),
+) -> pd.DataFrame:
+    positions = [keys.index(name) for name in by]
+    merged: dict[tuple, dict[str, KLLSketch]] = {}
+    for key, metric_sketches in sketches.items():
+        target = merged.setdefault(tuple(key[i] for i in positions), {})
+        for metric, sketch in metric_sketches.items():
+            if metric in target:
+                target[metric].merge(sketch)
+            else:
+                target[metric] = sketch.copy()
+
+    qs = np.asarray(PERCENTILES, dtype=float) / 100
+    columns = [col for metric in TAIL_METRICS for col in percentile_columns(metric)]
+    rows = []
+    for group, metric_sketches in merged.items():
+        row = dict(zip(by, group))
+        for metric, sketch in metric_sketches.items():
+            row.update(zip(percentile_columns(metric), sketch.quantiles(qs)))
+        rows.append(row)
+    return pd.DataFrame(rows, columns=[*by, *columns])
+
+
+def tail_percentiles(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Tail percentiles per model and per task category, both merged from one
+    pass of model × category sketches."""
+    sketches = build_metric_sketches(df)
+    return {
+        "model": sketch_percentiles(sketches),
+        "category": sketch_percentiles(sketches, by=("Task_Category",)),
+    }
+
+
+def aggregate_raw_data(df: pd.DataFrame, tails: pd.DataFrame | None = None) -> pd.DataFrame:
+    """Per-model metrics; ``tails`` is the ``tail_percentiles(df)["model"]``
+    table when the caller already has it."""
     df = standardize_raw_data(df)
     metrics = (
-        df.groupby(["Model", "Model_Size"], dropna=False)
+        df.groupby(["Model", "Model_Size"], dropna=False, observed=True)
         .agg(
             Quality_Score_mean=("Quality_Score", "mean"),
             Quality_Score_std=("Quality_Score", "std"),
@@ -383,14 +425,117 @@ def aggregate_raw_data(df: pd.DataFrame) -> pd.DataFrame:
         )
         .reset_index()
     )
-    return metrics
+    tails = tail_percentiles(df)["model"] if tails is None else tails
+    return metrics.merge(tails, on=["Model", "Model_Size"], how="left")
+
+
+def build_task_matrix(df: pd.DataFrame) -> dict:
+    """Pivot runs into dense Task × Model arrays (cell mean per metric).
+
+    Cells without a run are NaN; the mask travels with the arrays so per-task
+    normalization and the later aggregation can skip them."""
+    task_codes, tasks = pd.factorize(df["Task_ID"], sort=True)
+    model_codes, models = pd.factorize(df["Model"].map(clean_model_name), sort=True)
+    shape = (len(tasks), len(models))
+    cells = task_codes * len(models) + model_codes
+    observed = (task_codes >= 0) & (model_codes >= 0)
+
+    values: dict[str, np.ndarray] = {}
+    for metric in TASK_METRICS:
+        column = pd.to_numeric(df[metric], errors="coerce").to_numpy(dtype=float)
+        valid = observed & np.isfinite(column)
+        sums = np.bincount(cells[valid], weights=column[valid], minlength=shape[0] * shape[1])
+        counts = np.bincount(cells[valid], minlength=shape[0] * shape[1])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values[metric] = np.where(counts > 0, sums / counts, np.nan).reshape(shape)
+    return {"tasks": tasks, "models": models, "values": values}
+
+
+def normalize_per_task(values: np.ndarray, method: str = "minmax") -> np.ndarray:
+    """Scale each task row independently; missing cells stay NaN. Min-max maps
+    to [0, 1]; z-scores are left unbounded and rescaled after aggregation."""
+    mask = np.isfinite(values)
+    counts = mask.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if method == "zscore":
+            mean = np.where(mask, values, 0.0).sum(axis=1, keepdims=True) / counts
+            std = np.sqrt(np.where(mask, (values - mean) ** 2, 0.0).sum(axis=1, keepdims=True) / counts)
+            scaled = np.where(std > 0, (values - mean) / std, 0.0)
+        else:
+            lo = np.where(mask, values, np.inf).min(axis=1, keepdims=True)
+            hi = np.where(mask, values, -np.inf).max(axis=1, keepdims=True)
+            span = hi - lo
+            scaled = np.where(span > 0, (values - lo) / span, 0.5)
+    return np.where(mask, scaled, np.nan)
+
+
+def task_normalized_components(task_matrix: dict, method: str = "minmax") -> pd.DataFrame:
+    """Per-model score components from per-task normalization, aligned with the
+    ``*_norm`` columns produced by ``prepare_metrics``."""
+    values = task_matrix["values"]
+    quality = values["Quality_Score"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratios = {
+            "Quality_norm": quality,
+            "EnergyEfficiency_norm": np.where(values["Energy_kWh"] > 0, quality / values["Energy_kWh"], np.nan),
+            "CostEfficiency_norm": np.where(values["Cost_EUR"] > 0, quality / values["Cost_EUR"], np.nan),
+            "SpeedEfficiency_norm": np.where(values["Latency_sec"] > 0, quality / values["Latency_sec"], np.nan),
+        }
+
+    components = {}
+    for col, ratio in ratios.items():
+        normalized = normalize_per_task(ratio, method)
+        mask = np.isfinite(normalized)
+        counts = mask.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            components[col] = np.where(counts > 0, np.where(mask, normalized, 0.0).sum(axis=0) / counts, np.nan)
+    scores = pd.DataFrame(components, index=pd.Index(task_matrix["models"], name="Model"))
+    if method == "zscore":
+        scores = scores.apply(minmax)
+    return scores
+
+
+def composite_score(metrics: pd.DataFrame, weights: dict[str, float]) -> pd.Series:
+    components = {
+        "Quality_norm": weights["quality"],
+        "EnergyEfficiency_norm": weights["energy"],
+        "CostEfficiency_norm": weights["cost"],
+        "SpeedEfficiency_norm": weights["speed"],
+    }
+    numerator = pd.Series(0.0, index=metrics.index)
+    denominator = pd.Series(0.0, index=metrics.index)
+    for col, weight in components.items():
+        valid = metrics[col].notna()
+        numerator = numerator.add(metrics[col].where(valid, 0) * weight, fill_value=0)
+        denominator = denominator.add(valid.astype(float) * weight, fill_value=0)
+    return safe_divide(numerator, denominator).fillna(0)
 
 
-def prepare_metrics(metrics: pd.DataFrame, weights: dict[str, float]) -> pd.DataFrame:
+def prepare_metrics(
+    metrics: pd.DataFrame,
+    weights: dict[str, float],
+    *,
+    task_matrix: dict | None = None,
+    task_normalization: str = "minmax",
+) -> pd.DataFrame:
+    """Score models on their mean metrics, or, when ``task_matrix`` is given,
+    on components normalized within each task so a single hard task cannot
+    dominate a model's average."""
     metrics = metrics.copy()
     metrics["Model"] = metrics["Model"].map(clean_model_name)
     metrics["Model_Size"] = pd.Categorical(metrics["Model_Size"], SIZE_ORDER, ordered=True)
 
+    # Precomputed CSVs only carry a median; it stands in for p50 and the
+    # remaining tail columns stay empty rather than being guessed.
+    for metric in TAIL_METRICS:
+        p50 = f"{metric}_p50"
+        if p50 not in metrics.columns and f"{metric}_median" in metrics.columns:
+            metrics[p50] = metrics[f"{metric}_median"]
+        for col in percentile_columns(metric):
+            if col not in metrics.columns:
+                metrics[col] = np.nan
+            metrics[col] = pd.to_numeric(metrics[col], errors="coerce")
+
     for col in [
         "Quality_Score_mean",
         "Latency_sec_mean",
@@ -428,20 +573,12 @@ def prepare_metrics(metrics: pd.DataFrame, weights: dict[str, float]) -> pd.Data
     metrics["LowCO2_norm"] = minmax(metrics["CO2_kg_mean"], higher_is_better=False)
     metrics["LowLatency_norm"] = minmax(metrics["Latency_sec_mean"], higher_is_better=False)
 
-    components = {
-        "Quality_norm": weights["quality"],
-        "EnergyEfficiency_norm": weights["energy"],
-        "CostEfficiency_norm": weights["cost"],
-        "SpeedEfficiency_norm": weights["speed"],
-    }
-    numerator = pd.Series(0.0, index=metrics.index)
-    denominator = pd.Series(0.0, index=metrics.index)
-    for col, weight in components.items():
-        valid = metrics[col].notna()
-        numerator = numerator.add(metrics[col].where(valid, 0) * weight, fill_value=0)
-        denominator = denominator.add(valid.astype(float) * weight, fill_value=0)
+    if task_matrix is not None:
+        per_task = task_normalized_components(task_matrix, task_normalization).reindex(metrics["Model"])
+        for col in per_task.columns:
+            metrics[col] = per_task[col].to_numpy()
 
-    metrics["Sustainability_Score"] = safe_divide(numerator, denominator).fillna(0)
+    metrics["Sustainability_Score"] = composite_score(metrics, weights)
     metrics["Footprint_Index"] = (0.55 * metrics["LowEnergy_norm"] + 0.45 * metrics["LowCO2_norm"]).fillna(0)
     metrics["Operational_Readiness"] = (
         0.45 * metrics["Quality_norm"] + 0.35 * metrics["LowLatency_norm"] + 0.20 * metrics["Footprint_Index"]
@@ -571,8 +708,14 @@ def build_latency_bar(metrics: pd.DataFrame) -> go.Figure:
     return fig
 
 
+def format_optional(value: float, spec: str, suffix: str = "") -> str:
+    return "n/a" if pd.isna(value) else f"{value:{spec}}{suffix}"
+
+
 def render_recommendation_card(title: str, row: pd.Series, style: str) -> None:
     badge = size_badge_class(row["Model_Size"])
+    latency_p95 = format_optional(row.get("Latency_sec_p95"), ".1f", "s")
+    energy_p95 = format_optional(row.get("Energy_kWh_p95"), ".2f", " kWh")
     st.markdown(
         f"""
         <div class="rec-card {style}">
@@ -583,7 +726,9 @@ def render_recommendation_card(title: str, row: pd.Series, style: str) -> None:
                 Score <b>{row['Sustainability_Score']:.2f}</b> ·
                 Quality <b>{row['Quality_Score_mean']:.2f}</b> ·
                 Energy <b>{row['Energy_kWh_mean']:.2f} kWh</b> ·
-                Latency <b>{row['Latency_sec_mean']:.1f}s</b>
+                Latency <b>{row['Latency_sec_mean']:.1f}s</b><br>
+                p95 latency <b>{latency_p95}</b> ·
+                p95 energy <b>{energy_p95}</b>
             </div>
         </div>
         """,
@@ -604,6 +749,42 @@ def metric_card(label: str, value: str, help_text: str) -> None:
     )
 
 
+def aggregate_by_size(table: pd.DataFrame) -> pd.DataFrame:
+    grouped = table.groupby("Model_Size", observed=True, sort=False)
+    summary = grouped.mean(numeric_only=True)
+    summary.insert(0, "Models", grouped.size())
+    order = [size for size in SIZE_ORDER if size in summary.index]
+    return summary.reindex(order + [size for size in summary.index if size not in order]).reset_index()
+
+
+def render_export_panel(tables: dict[str, pd.DataFrame | None]) -> None:
+    """Download any of ``tables`` in any export format. Encoding runs only on click."""
+    available = {label: table for label, table in tables.items() if table is not None and not table.empty}
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        level = st.selectbox("Export", list(available), key="export_level")
+    with c2:
+        fmt = st.selectbox(
+            "Format", list(EXPORT_FORMATS), format_func=lambda key: EXPORT_FORMATS[key].label, key="export_format"
+        )
+    with c3:
+        compression = st.selectbox("Compression", EXPORT_FORMATS[fmt].compressions, key=f"export_compression_{fmt}")
+    table = available[level]
+    too_large = fmt == "xlsx" and len(table) > XLSX_MAX_ROWS
+    st.download_button(
+        f"Export {EXPORT_FORMATS[fmt].label}",
+        data=lambda: write_export(table, fmt, compression),
+        file_name=export_file_name(EXPORT_LEVELS[level], fmt, compression),
+        mime=export_mime(fmt, compression),
+        key="export_data",
+        disabled=too_large,
+    )
+    if too_large:
+        st.caption(f"{len(table):,} rows exceed one Excel sheet; choose CSV, Parquet or Arrow.")
+    else:
+        st.caption(f"{len(table):,} rows × {table.shape[1]} columns")
+
+
 def build_matrix(metrics: pd.DataFrame, *, compact: bool = False) -> go.Figure:
     plot_df = metrics.copy()
     marker_sizes = np.clip(plot_df["Latency_sec_mean"].to_numpy(dtype=float) * 1.15 + 8, 14, 24)
@@ -749,6 +930,13 @@ def build_recommendations(metrics: pd.DataFrame) -> dict[str, pd.Series]:
     return recommendations
 
 
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_task_matrix(raw_df: pd.DataFrame) -> dict:
+    """Pivot once per filtered dataset; switching scoring mode or moving a
+    weight slider then only re-runs the per-task normalization."""
+    return build_task_matrix(raw_df)
+
+
 def main() -> None:
     configure_page()
     raw_df, raw_message = load_raw_data()
@@ -789,6 +977,9 @@ def main() -> None:
 
     st.sidebar.link_button("Open paper-style HTML demo", PAGES_URL, use_container_width=True)
 
+    task_source = None
+    filtered_raw = None
+    category_tails = None
     if raw_df is not None and selected_categories is not None:
         filtered_raw = raw_df[
             raw_df["Model"].map(clean_model_name).isin(selected_models)
@@ -798,7 +989,11 @@ def main() -> None:
         if filtered_raw.empty:
             st.warning("No rows match the current filters.")
             return
-        base_metrics = aggregate_raw_data(filtered_raw)
+        tails = tail_percentiles(filtered_raw)
+        base_metrics = aggregate_raw_data(filtered_raw, tails["model"])
+        category_tails = tails["category"]
+        if "Task_ID" in filtered_raw.columns:
+            task_source = filtered_raw
     else:
         base_metrics = base_metrics[
             base_metrics["Model"].map(clean_model_name).isin(selected_models)
@@ -846,7 +1041,22 @@ def main() -> None:
         with w4:
             weight_cost = st.slider("Cost", 0.0, 1.0, 0.15, 0.05, key="weight_cost")
         weights = {"quality": weight_quality, "energy": weight_energy, "cost": weight_cost, "speed": weight_speed}
-        metrics = prepare_metrics(base_metrics, weights)
+        normalization = None
+        if task_source is not None:
+            scoring_mode = st.radio(
+                "Scoring",
+                list(SCORING_MODES),
+                horizontal=True,
+                key="scoring_mode",
+                help="Task-normalized scoring scales every metric within each task before averaging.",
+            )
+            normalization = SCORING_MODES[scoring_mode]
+        metrics = prepare_metrics(
+            base_metrics,
+            weights,
+            task_matrix=cached_task_matrix(task_source) if normalization else None,
+            task_normalization=normalization or "minmax",
+        )
         st.plotly_chart(build_matrix(metrics), use_container_width=True, key="matrix_main")
 
     with tabs[2]:
@@ -872,11 +1082,16 @@ def main() -> None:
     with tabs[4]:
         display_cols = [
             "Model", "Model_Size", "Quality_Score_mean", "Latency_sec_mean",
-            "Energy_kWh_mean", "CO2_kg_mean", "Cost_EUR_mean",
+            *percentile_columns("Latency_sec"),
+            "Energy_kWh_mean", *percentile_columns("Energy_kWh"),
+            "CO2_kg_mean", "Cost_EUR_mean",
             "Sustainability_Score", "Footprint_Index",
         ]
         existing_cols = [col for col in display_cols if col in metrics.columns]
         st.dataframe(metrics[existing_cols].round(4), use_container_width=True, hide_index=True)
+        if category_tails is not None:
+            section_heading("Tail percentiles by task category", "p50–p99 latency and energy over the filtered runs.")
+            st.dataframe(category_tails.round(4), use_container_width=True, hide_index=True)
         section_heading(
             "Reference task list (30 tasks)",
             "The 180 measurements come from these 30 prompts, run once on each of the six models.",
@@ -895,17 +1110,16 @@ def main() -> None:
             3. Reload the app — aggregations, scoring, and recommendations recompute automatically.
             """
         )
-        csv = metrics[existing_cols].to_csv(index=False).encode("utf-8")
-        st.download_button(
-            "Export CSV",
-            data=csv,
-            file_name="comparia_sustainability.csv",
-            mime="text/csv",
-            key="export_csv",
+        render_export_panel(
+            {
+                "Model metrics": metrics[existing_cols],
+                "Task-level runs": filtered_raw,
+                "Size aggregates": aggregate_by_size(metrics[existing_cols]),
+            }
         )
 
     st.caption(f"Static HTML mirror: {PAGES_URL}")
 
 
 if __name__ == "__main__":
-    main()
+    run_profiled(main, "dashboard")
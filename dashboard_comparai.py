@@ -7,8 +7,20 @@ import numpy as np
 import io
 from openpyxl import load_workbook
 import os
-import json
-from mistralai import Mistral
+import functools
+import hashlib
+import logging
+import time
+
+from background_jobs import BackgroundJobs
+from batch_calls import CallReport, run_batch
+from circuit_breaker import CircuitBreaker
+from insight_backends import GuardedBackend, backend_from_env, pooled_http_client
+from profiling import run_profiled
+from report_store import MANIFEST_NAME, REPORT_DIR, load_analysis_report
+from prompt_builder import DEFAULT_PROMPT_BUDGET, budget_table, compact_json, estimate_tokens
+from response_cache import ResponseCache
+from synthetic_data import build_profiles, generate_runs
 
 # Page configuration
 st.set_page_config(
@@ -18,36 +30,279 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Mistral API Configuration
-MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
+# Token budget for the data section of an insight prompt
+PROMPT_TOKEN_BUDGET = DEFAULT_PROMPT_BUDGET
+
+logger = logging.getLogger(__name__)
+
+# Every analysis type × focus metric offered by the custom insight generators
+CUSTOM_INSIGHT_COMBINATIONS = [
+    ("Model Comparison", "Quality Score"),
+    ("Model Comparison", "Latency"),
+    ("Model Comparison", "Energy"),
+    ("Model Comparison", "CO₂"),
+    ("Model Comparison", "Consistency"),
+    ("Efficiency Analysis", "Energy"),
+    ("Efficiency Analysis", "Cost"),
+    ("Efficiency Analysis", "Latency"),
+    ("Environmental Impact", "Energy"),
+    ("Environmental Impact", "CO₂"),
+    ("Environmental Impact", "Overall"),
+    ("Consistency Analysis", "Consistency"),
+    ("Consistency Analysis", "Latency"),
+]
+# Ranked lists in the fallback insights stop after this many models
+FALLBACK_RANKING_LIMIT = 50
+
+# Fallback custom insights: header per analysis type, then the ranked lists
+# (title, column, ascending, value format) per (analysis type, focus metric).
+# A None focus metric covers the focus metrics without their own entry.
+CUSTOM_ANALYSIS_HEADERS = {
+    "Model Comparison": "## 🔍 **Model Comparison Analysis - Focus: {focus_metric}**",
+    "Efficiency Analysis": "## ⚡ **Efficiency Analysis - Focus: {focus_metric}**",
+    "Environmental Impact": "## 🌍 **Environmental Impact Analysis - Focus: {focus_metric}**",
+    "Consistency Analysis": "## 🎯 **Consistency Analysis - Focus: {focus_metric}**",
+}
+CUSTOM_RANKINGS = {
+    ("Model Comparison", "Quality Score"): [("Quality Score Ranking:", 'Quality_Score_mean', False, '%.2f/5.0')],
+    ("Model Comparison", "Latency"): [("Latency Ranking (Lower is Better):", 'Latency_ms_mean', True, '%.1fs')],
+    ("Model Comparison", "Energy"): [("Energy Consumption Ranking (Lower is Better):", 'Energy_Wh_mean', True, '%.3f Wh')],
+    ("Model Comparison", "CO₂"): [("CO₂ Emissions Ranking (Lower is Better):", 'CO2_g_mean', True, '%.3f g')],
+    ("Model Comparison", "Consistency"): [("Consistency Ranking (Higher is Better):", 'Quality_Consistency', False, '%.3f')],
+    ("Efficiency Analysis", "Energy"): [("Energy Efficiency (Quality per Wh):", 'Quality_Efficiency', False, '%.2f')],
+    ("Efficiency Analysis", "Cost"): [("Speed Efficiency (Quality per second):", 'Speed_Efficiency', False, '%.2f')],
+    ("Efficiency Analysis", "Latency"): [("Speed Efficiency (Quality per second):", 'Speed_Efficiency', False, '%.2f')],
+    ("Environmental Impact", "Energy"): [("Energy Consumption (Lower is Better):", 'Energy_Wh_mean', True, '%.3f Wh')],
+    ("Environmental Impact", "CO₂"): [("CO₂ Emissions (Lower is Better):", 'CO2_g_mean', True, '%.3f g')],
+    ("Environmental Impact", None): [("Overall Environmental Impact (Lower is Better):", 'Environmental_Impact', True, '%.3f')],
+    ("Consistency Analysis", "Consistency"): [("Quality Consistency (Higher is Better):", 'Quality_Consistency', False, '%.3f')],
+    ("Consistency Analysis", None): [
+        ("Quality Consistency:", 'Quality_Consistency', False, '%.3f'),
+        ("Latency Consistency:", 'Latency_Consistency', False, '%.3f'),
+    ],
+}
+# Key insight line: label, column, highest (True) or lowest wins, value format
+CUSTOM_HIGHLIGHTS = {
+    ("Model Comparison", "Quality Score"): ("Best Performer", 'Quality_Score_mean', True, '%.2f/5.0'),
+    ("Model Comparison", "Latency"): ("Fastest Model", 'Latency_ms_mean', False, '%.1fs'),
+    ("Model Comparison", "Energy"): ("Most Energy Efficient", 'Energy_Wh_mean', False, '%.3f Wh'),
+    ("Efficiency Analysis", "Energy"): ("Most Energy Efficient", 'Quality_Efficiency', True, '%.2f quality/Wh'),
+    ("Efficiency Analysis", "Cost"): ("Most Consistent", 'Quality_Consistency', True, '%.3f consistency score'),
+    ("Environmental Impact", "Energy"): ("Lowest Energy Consumption", 'Energy_Wh_mean', False, '%.3f Wh'),
+    ("Environmental Impact", "CO₂"): ("Lowest CO₂ Emissions", 'CO2_g_mean', False, '%.3f g'),
+    ("Consistency Analysis", None): ("Most Consistent", 'Quality_Consistency', True, '%.3f consistency score'),
+}
+# Enhanced fallback insights: size classes and use cases
+MODEL_SIZE_PROFILES = [
+    ('Small', 'Small Models (8B)', 'Resource-constrained environments, edge computing'),
+    ('Medium', 'Medium Models (20B)', 'Balanced applications, moderate resource requirements'),
+    ('Large', 'Large Models (70B+)', 'High-stakes applications, maximum quality requirements'),
+]
+FALLBACK_USE_CASES = [
+    {
+        'name': 'High-Volume Production',
+        'criteria': ['Speed_Efficiency', 'Quality_Consistency'],
+        'description': 'Best for applications requiring high throughput at low cost'
+    },
+    {
+        'name': 'Environmental Sustainability',
+        'criteria': ['Environmental_Impact', 'Quality_Efficiency'],
+        'description': 'Best for environmentally conscious applications'
+    },
+    {
+        'name': 'Quality-Critical Applications',
+        'criteria': ['Quality_Score_mean', 'Quality_Consistency'],
+        'description': 'Best for applications where quality is paramount'
+    },
+    {
+        'name': 'Real-Time Systems',
+        'criteria': ['Latency_ms_mean', 'Speed_Efficiency'],
+        'description': 'Best for real-time or low-latency requirements'
+    }
+]
+LOWER_IS_BETTER = {'Latency_ms_mean', 'Environmental_Impact'}
+# Batch mode limits: parallel requests and average requests per second
+BATCH_MAX_CONCURRENCY = 4
+BATCH_RATE_PER_SEC = 1.0
+# AI backend transport: connect/read timeouts in seconds, and the circuit
+# breaker that skips straight to the fallback insights after repeated failures
+AI_CONNECT_TIMEOUT = 5.0
+AI_READ_TIMEOUT = 30.0
+AI_BREAKER_FAILURES = 3
+AI_BREAKER_COOLDOWN = 60.0
+
+@st.cache_resource
+def get_http_client():
+    """Keep-alive HTTP connection pool shared by all sessions"""
+    return pooled_http_client(connect_timeout=AI_CONNECT_TIMEOUT, read_timeout=AI_READ_TIMEOUT)
+
+@st.cache_resource
+def get_circuit_breaker():
+    """Circuit breaker shared by all sessions, so one outage pauses every caller"""
+    return CircuitBreaker(failure_threshold=AI_BREAKER_FAILURES, cooldown_seconds=AI_BREAKER_COOLDOWN)
 
+# AI backend: Mistral by default, see insight_backends.py for the alternatives
 @st.cache_resource
 def get_mistral_client():
-    """Initialize and cache Mistral client"""
+    """Initialize and cache the insight backend selected by COMPARIA_INSIGHT_BACKEND"""
     try:
-        client = Mistral(api_key=MISTRAL_API_KEY)
-        return client
+        backend = backend_from_env(http_client=get_http_client())
     except Exception as e:
-        st.error(f"Failed to initialize Mistral client: {e}")
+        st.error(f"Failed to initialize AI backend: {e}")
         return None
+    return GuardedBackend(backend, get_circuit_breaker()) if backend is not None else None
+
+@st.cache_resource
+def get_response_cache():
+    """Open the on-disk cache for Mistral responses"""
+    return ResponseCache()
+
+# Status labels shown next to AI answers
+CACHE_STATUS_LABELS = {
+    'hit': '💾 Response cache: hit (no API call)',
+    'miss': '🌐 Response cache: miss (fresh answer, now cached)',
+    'bypass': '↪️ Response cache: bypassed',
+    'error': '⚠️ Response cache: not stored (API error)',
+}
+
+def log_prompt_tokens(prompt, usage):
+    """Log the prompt size estimate next to the count reported by the API"""
+    actual = getattr(usage, 'prompt_tokens', None)
+    logger.info("Prompt tokens: estimated %d, actual %s", estimate_tokens(prompt), actual if actual is not None else 'n/a')
+
+def request_mistral_completion(client, prompt, model="mistral-small-latest", max_tokens=2000, temperature=0.7):
+    """One chat completion; raises on API errors so callers can decide to retry"""
+    text, usage = client.complete(prompt, model=model, max_tokens=max_tokens, temperature=temperature)
+    log_prompt_tokens(prompt, usage)
+    return text
+
+def fetch_mistral_response(client, cache, prompt, model="mistral-small-latest", max_tokens=2000, temperature=0.7, use_cache=True):
+    """Cache lookup plus API call; makes no Streamlit calls so it can run in a worker thread"""
+    key = cache.key(model, temperature, max_tokens, prompt)
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached, 'hit'
 
-def call_mistral_api(prompt, model="mistral-small-latest"):
-    """Call Mistral API with error handling"""
     try:
-        client = get_mistral_client()
         if client is None:
-            return "Mistral API not available"
-        
-        messages = [{"role": "user", "content": prompt}]
-        response = client.chat.complete(
-            model=model,
-            messages=messages,
-            max_tokens=2000,
-            temperature=0.7
-        )
-        return response.choices[0].message.content
+            return "Mistral API not available", 'error'
+        text = request_mistral_completion(client, prompt, model, max_tokens, temperature)
+    except Exception as e:
+        return f"Error calling Mistral API: {str(e)}", 'error'
+    # message.content may be None or a list of content chunks; neither can be shown or cached
+    if not isinstance(text, str) or not text:
+        return "Error calling Mistral API: empty or non-text response", 'error'
+
+    # Only successful answers are stored, even when the lookup was bypassed
+    cache.set(key, text, model)
+    return text, 'miss' if use_cache else 'bypass'
+
+def call_mistral_api_with_status(prompt, model="mistral-small-latest", max_tokens=2000, temperature=0.7, use_cache=None):
+    """Call Mistral API through the response cache; returns (text, cache status)"""
+    if use_cache is None:
+        use_cache = not st.session_state.get('bypass_ai_cache', False)
+    return fetch_mistral_response(get_mistral_client(), get_response_cache(), prompt, model, max_tokens, temperature, use_cache)
+
+def mistral_stream_chunks(client, prompt, model="mistral-small-latest", max_tokens=2000, temperature=0.7):
+    """Yield text deltas from the backend's streaming chat API"""
+    yield from client.stream(
+        prompt, model=model, max_tokens=max_tokens, temperature=temperature,
+        on_usage=lambda usage: log_prompt_tokens(prompt, usage)
+    )
+
+def write_mistral_stream(prompt, model="mistral-small-latest", max_tokens=2000, temperature=0.7, use_cache=None):
+    """Render a Mistral answer as it streams in; returns (text, cache status) like call_mistral_api_with_status"""
+    if use_cache is None:
+        use_cache = not st.session_state.get('bypass_ai_cache', False)
+    cache = get_response_cache()
+    key = cache.key(model, temperature, max_tokens, prompt)
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            st.markdown(cached)
+            return cached, 'hit'
+
+    client = get_mistral_client()
+    if client is None:
+        return "Mistral API not available", 'error'
+    placeholder = st.empty()
+    try:
+        with placeholder.container():
+            text = st.write_stream(mistral_stream_chunks(client, prompt, model, max_tokens, temperature))
     except Exception as e:
-        return f"Error calling Mistral API: {str(e)}"
+        # Drop the partial answer so the fallback is not shown under half a response
+        placeholder.empty()
+        return f"Error calling Mistral API: {str(e)}", 'error'
+    if not isinstance(text, str) or not text:
+        placeholder.empty()
+        return "Error calling Mistral API: empty stream", 'error'
+
+    # A completed stream is cached exactly like a regular response
+    cache.set(key, text, model)
+    return text, 'miss' if use_cache else 'bypass'
+
+@st.cache_resource
+def get_ai_jobs():
+    """Worker pool shared by all sessions for background AI calls"""
+    return BackgroundJobs(max_workers=4)
+
+def submit_ai_job(state_key, prompt, label, model="mistral-small-latest", max_tokens=2000, temperature=0.7):
+    """Start a background Mistral call, or join the one already running for this prompt"""
+    cache = get_response_cache()
+    use_cache = not st.session_state.get('bypass_ai_cache', False)
+    key = cache.key(model, temperature, max_tokens, prompt)
+    future = get_ai_jobs().submit(
+        (key, use_cache), fetch_mistral_response,
+        get_mistral_client(), cache, prompt, model, max_tokens, temperature, use_cache
+    )
+    st.session_state[state_key] = {'key': key, 'future': future, 'label': label, 'started': time.time(), 'polling': False}
+
+def render_ai_job(state_key, render_answer, render_fallback):
+    """Placeholder while a background AI job runs, then its answer or the fallback"""
+    job = st.session_state.get(state_key)
+    if job is None:
+        return
+    if not job['future'].done():
+        st.info(f"🤖 {job['label']}... ({time.time() - job['started']:.0f}s)")
+        return
+    if job['polling']:
+        # Finished between polls: repaint the whole page once without the timer
+        job['polling'] = False
+        st.rerun()
+    text, status = job['future'].result()
+    if status != 'error':
+        render_answer(text)
+        st.caption(CACHE_STATUS_LABELS[status])
+    else:
+        render_fallback()
+
+def show_ai_job(state_key, render_answer, render_fallback):
+    """Render a background AI job in a fragment that polls every second while it runs"""
+    job = st.session_state.get(state_key)
+    if job is None:
+        return
+    job['polling'] = not job['future'].done()
+    st.fragment(render_ai_job, run_every=1.0 if job['polling'] else None)(state_key, render_answer, render_fallback)
+
+def call_mistral_api(prompt, model="mistral-small-latest"):
+    """Call Mistral API with error handling"""
+    return call_mistral_api_with_status(prompt, model)[0]
+
+# Sample data distributions (mean, std) per model size, in ms / Wh / g
+# CO₂ follows energy with a rough 0.5 g per Wh conversion factor
+SAMPLE_SIZE_PROFILES = {
+    'Small': {'Quality_Score': (3.2, 0.8), 'Latency_ms': (2500, 500), 'Energy_Wh': (150, 30)},
+    'Medium': {'Quality_Score': (3.8, 0.6), 'Latency_ms': (4200, 800), 'Energy_Wh': (350, 70)},
+    'Large': {'Quality_Score': (4.3, 0.5), 'Latency_ms': (6800, 1200), 'Energy_Wh': (850, 150)}
+}
+SAMPLE_DERIVED = {'CO2_g': lambda columns: columns['Energy_Wh'] * 0.5}
+SAMPLE_BOUNDS = {
+    'Quality_Score': (1, 5),
+    'Latency_ms': (100, None),
+    'Energy_Wh': (1, None),
+    'CO2_g': (0.5, None)
+}
 
 # Custom CSS for better styling
 st.markdown("""
@@ -135,48 +390,32 @@ def load_comparai_data():
         # Fallback to sample data
         return create_sample_data()
 
-def process_metrics_csv(df):
+def process_metrics_csv(df, seed=42):
     """Process the metrics CSV file to create proper data structure"""
     # The CSV contains aggregated metrics, we need to create individual task data
-    data = []
-    
-    for _, row in df.iterrows():
-        model = row['Model']
-        model_size = row['Model_Size']
-        quality_mean = row['Quality_Score_mean']
-        quality_std = row['Quality_Score_std']
-        latency_mean = row['Latency_sec_mean'] * 1000  # Convert to ms
-        latency_std = row['Latency_sec_std'] * 1000
-        energy_mean = row['Energy_kWh_mean'] * 1000  # Convert to Wh
-        energy_std = row['Energy_kWh_std'] * 1000
-        co2_mean = row['CO2_kg_mean'] * 1000  # Convert to g
-        co2_std = row['CO2_kg_std'] * 1000
-        
-        # Create 30 tasks per model with realistic variation
-        for task_id in range(1, 31):
-            # Generate realistic task variations
-            quality = max(1, min(5, np.random.normal(quality_mean, quality_std)))
-            latency = max(100, np.random.normal(latency_mean, latency_std))
-            energy = max(1, np.random.normal(energy_mean, energy_std))
-            co2 = max(0.5, np.random.normal(co2_mean, co2_std))
-            
-            # Task categories
-            categories = ['Text Generation', 'Code Generation', 'Question Answering', 'Summarization', 'Translation', 'Advanced']
-            category = categories[(task_id - 1) // 5] if task_id <= 25 else 'Advanced'
-            
-            data.append({
-                'Task_ID': task_id,
-                'Task_Category': category,
-                'Model': model,
-                'Model_Size': model_size,
-                'Quality_Score': quality,
-                'Latency_ms': latency,
-                'Energy_Wh': energy,
-                'CO2_g': co2,
-                'Notes': ''
-            })
-    
-    return pd.DataFrame(data)
+    profiles = pd.DataFrame({
+        'Model': df['Model'],
+        'Model_Size': df['Model_Size'],
+        'Quality_Score_mean': df['Quality_Score_mean'],
+        'Quality_Score_std': df['Quality_Score_std'],
+        'Latency_ms_mean': df['Latency_sec_mean'] * 1000,  # Convert to ms
+        'Latency_ms_std': df['Latency_sec_std'] * 1000,
+        'Energy_Wh_mean': df['Energy_kWh_mean'] * 1000,  # Convert to Wh
+        'Energy_Wh_std': df['Energy_kWh_std'] * 1000,
+        'CO2_g_mean': df['CO2_kg_mean'] * 1000,  # Convert to g
+        'CO2_g_std': df['CO2_kg_std'] * 1000,
+    })
+    
+    # Create 30 tasks per model with realistic variation, 5 tasks per category
+    return generate_runs(
+        profiles,
+        seed=seed,
+        categories=('Text Generation', 'Code Generation', 'Question Answering', 'Summarization', 'Translation', 'Advanced'),
+        hard_task_multipliers={},
+        bounds=SAMPLE_BOUNDS,
+        notes='',
+        categorical=False
+    )
 
 def clean_comparai_data(df):
     """Clean and standardize the ComparAI data format"""
@@ -246,52 +485,23 @@ def clean_comparai_data(df):
     
     return df
 
-def create_sample_data():
+def create_sample_data(seed=42):
     """Create sample data for demonstration purposes"""
     models = ['LLaMA 3.1 8B', 'Gemma 8B', 'Mistral Small', 'GPT-OSS 20B', 'GPT-5', 'DeepSeek R1']
     model_sizes = ['Small', 'Small', 'Medium', 'Medium', 'Large', 'Large']
-    categories = ['Factual', 'Reasoning', 'Programming', 'Knowledge', 'Advanced']
-    
-    data = []
-    np.random.seed(42)
-    
-    for task_id in range(1, 31):
-        category = categories[(task_id - 1) // 6] if task_id <= 25 else 'Advanced'
-        
-        for i, model in enumerate(models):
-            if 'Small' in model_sizes[i]:
-                quality = np.random.normal(3.2, 0.8)
-                latency = np.random.normal(2500, 500)  # ms
-                energy = np.random.normal(150, 30)  # Wh
-            elif 'Medium' in model_sizes[i]:
-                quality = np.random.normal(3.8, 0.6)
-                latency = np.random.normal(4200, 800)  # ms
-                energy = np.random.normal(350, 70)  # Wh
-            else:
-                quality = np.random.normal(4.3, 0.5)
-                latency = np.random.normal(6800, 1200)  # ms
-                energy = np.random.normal(850, 150)  # Wh
-            
-            if task_id > 20:
-                quality *= 0.9
-                latency *= 1.3
-                energy *= 1.2
-            
-            co2 = energy * 0.5  # Rough conversion factor (Wh to g CO2)
-            
-            data.append({
-                'Task_ID': task_id,
-                'Task_Category': category,
-                'Model': model,
-                'Model_Size': model_sizes[i],
-                'Quality_Score': max(1, min(5, quality)),
-                'Latency_ms': max(100, latency),
-                'Energy_Wh': max(1, energy),
-                'CO2_g': max(0.5, co2),
-                'Notes': ''
-            })
-    
-    return pd.DataFrame(data)
+    profiles = build_profiles(list(zip(models, model_sizes)), SAMPLE_SIZE_PROFILES)
+    
+    # Tasks 21-30 are harder: lower quality, slower and more energy-hungry
+    return generate_runs(
+        profiles,
+        seed=seed,
+        categories=('Factual', 'Reasoning', 'Programming', 'Knowledge', 'Advanced'),
+        hard_task_multipliers={'Quality_Score': 0.9, 'Latency_ms': 1.3, 'Energy_Wh': 1.2},
+        bounds=SAMPLE_BOUNDS,
+        derived=SAMPLE_DERIVED,
+        notes='',
+        categorical=False
+    )
 
 def calculate_metrics(df):
     """Calculate aggregated metrics by model"""
@@ -638,6 +848,33 @@ def prepare_data_summary(metrics, df):
     
     return summary
 
+def serialize_data_summary(data_summary, budget=PROMPT_TOKEN_BUDGET):
+    """Compact prompt text for a data summary, with model details cut to the top-N that fit the budget"""
+    summary = {key: value for key, value in data_summary.items() if key != 'model_details'}
+    header = compact_json(summary)
+    details = pd.DataFrame(data_summary.get('model_details', []))
+    if details.empty:
+        return header
+    details = details.sort_values('Quality_Score_mean', ascending=False)
+    table, kept = budget_table(details, budget - estimate_tokens(header))
+    return f"{header}\nMODELS (top {kept} of {len(details)} by quality):\n{table}"
+
+def metrics_fingerprint(metrics):
+    """Content hash of a metrics frame, used as the cache key for derived insights"""
+    row_hashes = pd.util.hash_pandas_object(metrics, index=False).to_numpy()
+    columns = "|".join(map(str, metrics.columns)).encode("utf-8")
+    return hashlib.sha1(columns + row_hashes.tobytes()).hexdigest()
+
+def ranked_lines(metrics, column, ascending, value_format, limit=FALLBACK_RANKING_LIMIT):
+    """Numbered "rank. model: value" lines for the top models by column, formatted column-wise"""
+    values = metrics[column].to_numpy(dtype=float)
+    # NaN sorts last either way, as with sort_values
+    order = np.argsort(values if ascending else -values, kind='stable')[:limit]
+    ranks = np.arange(1, len(order) + 1).astype(str)
+    models = metrics['Model'].to_numpy(dtype=str)[order]
+    lines = np.char.add(np.char.add(np.char.add(ranks, ". "), np.char.add(models, ": ")), np.char.mod(value_format, values[order]))
+    return lines.tolist()
+
 def generate_basic_insights(metrics, df):
     """Generate basic statistical insights"""
     insights = []
@@ -673,7 +910,7 @@ def generate_mistral_insights(data_summary, metrics):
     You are an expert AI researcher analyzing LLM benchmarking data. Please provide sophisticated insights and recommendations based on this data:
 
     DATA SUMMARY:
-    {json.dumps(data_summary, indent=2)}
+    {serialize_data_summary(data_summary)}
 
     Please provide:
     1. **Advanced Performance Analysis**: Deep insights into model performance patterns, trade-offs, and unexpected findings
@@ -687,15 +924,16 @@ def generate_mistral_insights(data_summary, metrics):
     """
     
     # Call Mistral API
-    mistral_response = call_mistral_api(prompt)
+    mistral_response, cache_status = call_mistral_api_with_status(prompt)
     
-    if "Error calling Mistral API" not in mistral_response and "Mistral API not available" not in mistral_response:
+    if cache_status != 'error':
         insights.append("## 🤖 **AI-Enhanced Analysis**")
         insights.append("")
         insights.append("*Powered by Mistral AI*")
         insights.append("")
         insights.append(mistral_response)
         insights.append("")
+        insights.append(f"*{CACHE_STATUS_LABELS[cache_status]}*")
     else:
         # Fallback to enhanced basic analysis if Mistral fails
         insights.extend(generate_enhanced_fallback_insights(metrics, data_summary))
@@ -703,60 +941,45 @@ def generate_mistral_insights(data_summary, metrics):
     return insights
 
 def generate_enhanced_fallback_insights(metrics, data_summary):
-    """Enhanced fallback insights when Mistral API is not available"""
+    """Enhanced fallback insights when Mistral API is not available, cached per metrics fingerprint"""
+    return cached_enhanced_fallback_insights(metrics_fingerprint(metrics), metrics)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def cached_enhanced_fallback_insights(fingerprint, _metrics):
+    """Enhanced fallback insights for one metrics frame; _metrics is keyed by its fingerprint"""
+    metrics = _metrics
     insights = []
     
     insights.append("## 📊 **Advanced Statistical Analysis**")
     insights.append("")
     
-    # Model size analysis
-    small_models = metrics[metrics['Model_Size'] == 'Small']
-    medium_models = metrics[metrics['Model_Size'] == 'Medium']
-    large_models = metrics[metrics['Model_Size'] == 'Large']
-    
+    # Model size analysis: one groupby for every size class
     insights.append("### **Model Size Performance Patterns**")
     insights.append("")
     
-    if not small_models.empty:
-        best_small = small_models.loc[small_models['Quality_Score_mean'].idxmax()]
-        insights.append(f"**Small Models (8B)**: {best_small['Model']} leads with {best_small['Quality_Score_mean']:.2f} quality")
-        insights.append(f"  - Average latency: {small_models['Latency_ms_mean'].mean():.1f}s")
-        insights.append(f"  - Average energy: {small_models['Energy_Wh_mean'].mean():.3f} Wh")
-        insights.append(f"  - **Best for**: Resource-constrained environments, edge computing")
-        insights.append("")
-    
-    if not medium_models.empty:
-        best_medium = medium_models.loc[medium_models['Quality_Score_mean'].idxmax()]
-        insights.append(f"**Medium Models (20B)**: {best_medium['Model']} leads with {best_medium['Quality_Score_mean']:.2f} quality")
-        insights.append(f"  - Average latency: {medium_models['Latency_ms_mean'].mean():.1f}s")
-        insights.append(f"  - Average energy: {medium_models['Energy_Wh_mean'].mean():.3f} Wh")
-        insights.append(f"  - **Best for**: Balanced applications, moderate resource requirements")
-        insights.append("")
-    
-    if not large_models.empty:
-        best_large = large_models.loc[large_models['Quality_Score_mean'].idxmax()]
-        insights.append(f"**Large Models (70B+)**: {best_large['Model']} leads with {best_large['Quality_Score_mean']:.2f} quality")
-        insights.append(f"  - Average latency: {large_models['Latency_ms_mean'].mean():.1f}s")
-        insights.append(f"  - Average energy: {large_models['Energy_Wh_mean'].mean():.3f} Wh")
-        insights.append(f"  - **Best for**: High-stakes applications, maximum quality requirements")
+    by_size = metrics.dropna(subset=['Quality_Score_mean']).groupby('Model_Size', observed=True)
+    best_by_size = metrics.loc[by_size['Quality_Score_mean'].idxmax(), ['Model_Size', 'Model', 'Quality_Score_mean']].set_index('Model_Size')
+    size_means = by_size[['Latency_ms_mean', 'Energy_Wh_mean']].mean()
+    for size, label, best_for in MODEL_SIZE_PROFILES:
+        if size not in best_by_size.index:
+            continue
+        best = best_by_size.loc[size]
+        insights.append(f"**{label}**: {best['Model']} leads with {best['Quality_Score_mean']:.2f} quality")
+        insights.append(f"  - Average latency: {size_means.at[size, 'Latency_ms_mean']:.1f}s")
+        insights.append(f"  - Average energy: {size_means.at[size, 'Energy_Wh_mean']:.3f} Wh")
+        insights.append(f"  - **Best for**: {best_for}")
         insights.append("")
     
     # Efficiency analysis
     insights.append("### **Efficiency Analysis**")
     insights.append("")
     
-    # Energy efficiency analysis
-    energy_efficiency = metrics.sort_values('Quality_Efficiency', ascending=False)
     insights.append("**Energy Efficiency Ranking:**")
-    for i, (_, model) in enumerate(energy_efficiency.head(3).iterrows(), 1):
-        insights.append(f"{i}. {model['Model']}: {model['Quality_Efficiency']:.2f} quality/Wh")
+    insights.extend(ranked_lines(metrics, 'Quality_Efficiency', False, '%.2f quality/Wh', limit=3))
     insights.append("")
     
-    # Cost efficiency analysis
-    speed_efficiency = metrics.sort_values('Speed_Efficiency', ascending=False)
     insights.append("**Speed Efficiency Ranking:**")
-    for i, (_, model) in enumerate(speed_efficiency.head(3).iterrows(), 1):
-        insights.append(f"{i}. {model['Model']}: {model['Speed_Efficiency']:.2f} quality/s")
+    insights.extend(ranked_lines(metrics, 'Speed_Efficiency', False, '%.2f quality/s', limit=3))
     insights.append("")
     
     # Environmental impact analysis
@@ -776,43 +999,15 @@ def generate_enhanced_fallback_insights(metrics, data_summary):
     insights.append("### **Strategic Recommendations**")
     insights.append("")
     
-    # Find the best model for different use cases
-    use_cases = [
-        {
-            'name': 'High-Volume Production',
-            'criteria': ['Speed_Efficiency', 'Quality_Consistency'],
-            'description': 'Best for applications requiring high throughput at low cost'
-        },
-        {
-            'name': 'Environmental Sustainability',
-            'criteria': ['Environmental_Impact', 'Quality_Efficiency'],
-            'description': 'Best for environmentally conscious applications'
-        },
-        {
-            'name': 'Quality-Critical Applications',
-            'criteria': ['Quality_Score_mean', 'Quality_Consistency'],
-            'description': 'Best for applications where quality is paramount'
-        },
-        {
-            'name': 'Real-Time Systems',
-            'criteria': ['Latency_ms_mean', 'Speed_Efficiency'],
-            'description': 'Best for real-time or low-latency requirements'
-        }
-    ]
+    # Rank every criterion once (1 = best), then average the ranks per use case
+    criteria = sorted({criterion for use_case in FALLBACK_USE_CASES for criterion in use_case['criteria']})
+    ranks = pd.DataFrame({
+        criterion: metrics[criterion].rank(ascending=criterion in LOWER_IS_BETTER)
+        for criterion in criteria
+    })
     
-    for use_case in use_cases:
-        # Calculate composite score for this use case
-        use_case_metrics = metrics.copy()
-        for criterion in use_case['criteria']:
-            if criterion in use_case_metrics.columns:
-                if 'Latency' in criterion or 'Environmental' in criterion:
-                    use_case_metrics[criterion] = use_case_metrics[criterion].rank(ascending=True)
-                else:
-                    use_case_metrics[criterion] = use_case_metrics[criterion].rank(ascending=False)
-        
-        use_case_metrics['Use_Case_Score'] = use_case_metrics[use_case['criteria']].mean(axis=1)
-        best_model = use_case_metrics.loc[use_case_metrics['Use_Case_Score'].idxmax()]
-        
+    for use_case in FALLBACK_USE_CASES:
+        best_model = metrics.loc[ranks[use_case['criteria']].mean(axis=1).idxmin()]
         insights.append(f"**{use_case['name']}**")
         insights.append(f"  - Recommended: {best_model['Model']}")
         insights.append(f"  - Use case: {use_case['description']}")
@@ -854,151 +1049,42 @@ def create_performance_heatmap(metrics):
     return fig
 
 def generate_custom_insights(metrics, analysis_type, focus_metric):
-    """Generate custom insights based on user selection"""
+    """Generate custom insights based on user selection, cached per metrics fingerprint"""
+    return cached_custom_insights(metrics_fingerprint(metrics), analysis_type, focus_metric, metrics)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_custom_insights(fingerprint, analysis_type, focus_metric, _metrics):
+    """Custom insights for one metrics frame; _metrics is keyed by its fingerprint"""
+    metrics = _metrics
     insights = []
     
-    if analysis_type == "Model Comparison":
-        insights.append(f"## 🔍 **Model Comparison Analysis - Focus: {focus_metric}**")
+    if analysis_type in CUSTOM_ANALYSIS_HEADERS:
+        insights.append(CUSTOM_ANALYSIS_HEADERS[analysis_type].format(focus_metric=focus_metric))
         insights.append("")
-        
-        if focus_metric == "Quality Score":
-            sorted_models = metrics.sort_values('Quality_Score_mean', ascending=False)
-            insights.append("**Quality Score Ranking:**")
-            for i, (_, model) in enumerate(sorted_models.iterrows(), 1):
-                insights.append(f"{i}. {model['Model']}: {model['Quality_Score_mean']:.2f}/5.0")
-        
-        elif focus_metric == "Latency":
-            sorted_models = metrics.sort_values('Latency_ms_mean', ascending=True)
-            insights.append("**Latency Ranking (Lower is Better):**")
-            for i, (_, model) in enumerate(sorted_models.iterrows(), 1):
-                insights.append(f"{i}. {model['Model']}: {model['Latency_ms_mean']:.1f}s")
-        
-        elif focus_metric == "Energy":
-            sorted_models = metrics.sort_values('Energy_Wh_mean', ascending=True)
-            insights.append("**Energy Consumption Ranking (Lower is Better):**")
-            for i, (_, model) in enumerate(sorted_models.iterrows(), 1):
-                insights.append(f"{i}. {model['Model']}: {model['Energy_Wh_mean']:.3f} Wh")
-        
-        elif focus_metric == "CO₂":
-            sorted_models = metrics.sort_values('CO2_g_mean', ascending=True)
-            insights.append("**CO₂ Emissions Ranking (Lower is Better):**")
-            for i, (_, model) in enumerate(sorted_models.iterrows(), 1):
-                insights.append(f"{i}. {model['Model']}: {model['CO2_g_mean']:.3f} g")
-        
-        elif focus_metric == "Consistency":
-            sorted_models = metrics.sort_values('Quality_Consistency', ascending=False)
-            insights.append("**Consistency Ranking (Higher is Better):**")
-            for i, (_, model) in enumerate(sorted_models.iterrows(), 1):
-                insights.append(f"{i}. {model['Model']}: {model['Quality_Consistency']:.3f}")
-    
-    elif analysis_type == "Efficiency Analysis":
-        insights.append(f"## ⚡ **Efficiency Analysis - Focus: {focus_metric}**")
-        insights.append("")
-        
-        if focus_metric == "Energy":
-            sorted_models = metrics.sort_values('Quality_Efficiency', ascending=False)
-            insights.append("**Energy Efficiency (Quality per Wh):**")
-            for i, (_, model) in enumerate(sorted_models.iterrows(), 1):
-                insights.append(f"{i}. {model['Model']}: {model['Quality_Efficiency']:.2f}")
-        
-        elif focus_metric == "Cost":
-            sorted_models = metrics.sort_values('Speed_Efficiency', ascending=False)
-            insights.append("**Speed Efficiency (Quality per second):**")
-            for i, (_, model) in enumerate(sorted_models.iterrows(), 1):
-                insights.append(f"{i}. {model['Model']}: {model['Speed_Efficiency']:.2f}")
-        
-        elif focus_metric == "Latency":
-            sorted_models = metrics.sort_values('Speed_Efficiency', ascending=False)
-            insights.append("**Speed Efficiency (Quality per msond):**")
-            for i, (_, model) in enumerate(sorted_models.iterrows(), 1):
-                insights.append(f"{i}. {model['Model']}: {model['Speed_Efficiency']:.2f}")
-    
-    elif analysis_type == "Environmental Impact":
-        insights.append(f"## 🌍 **Environmental Impact Analysis - Focus: {focus_metric}**")
-        insights.append("")
-        
-        if focus_metric == "Energy":
-            sorted_models = metrics.sort_values('Energy_Wh_mean', ascending=True)
-            insights.append("**Energy Consumption (Lower is Better):**")
-            for i, (_, model) in enumerate(sorted_models.iterrows(), 1):
-                insights.append(f"{i}. {model['Model']}: {model['Energy_Wh_mean']:.3f} Wh")
-        
-        elif focus_metric == "CO₂":
-            sorted_models = metrics.sort_values('CO2_g_mean', ascending=True)
-            insights.append("**CO₂ Emissions (Lower is Better):**")
-            for i, (_, model) in enumerate(sorted_models.iterrows(), 1):
-                insights.append(f"{i}. {model['Model']}: {model['CO2_g_mean']:.3f} g")
-        
-        else:
-            sorted_models = metrics.sort_values('Environmental_Impact', ascending=True)
-            insights.append("**Overall Environmental Impact (Lower is Better):**")
-            for i, (_, model) in enumerate(sorted_models.iterrows(), 1):
-                insights.append(f"{i}. {model['Model']}: {model['Environmental_Impact']:.3f}")
     
-    elif analysis_type == "Consistency Analysis":
-        insights.append(f"## 🎯 **Consistency Analysis - Focus: {focus_metric}**")
-        insights.append("")
-        
-        if focus_metric == "Consistency":
-            sorted_models = metrics.sort_values('Quality_Consistency', ascending=False)
-            insights.append("**Quality Consistency (Higher is Better):**")
-            for i, (_, model) in enumerate(sorted_models.iterrows(), 1):
-                insights.append(f"{i}. {model['Model']}: {model['Quality_Consistency']:.3f}")
-        
-        else:
-            # Show all consistency metrics
-            insights.append("**Quality Consistency:**")
-            quality_consistency = metrics.sort_values('Quality_Consistency', ascending=False)
-            for i, (_, model) in enumerate(quality_consistency.iterrows(), 1):
-                insights.append(f"{i}. {model['Model']}: {model['Quality_Consistency']:.3f}")
-            
+    rankings = CUSTOM_RANKINGS.get((analysis_type, focus_metric), CUSTOM_RANKINGS.get((analysis_type, None), []))
+    for i, (title, column, ascending, value_format) in enumerate(rankings):
+        if i:
             insights.append("")
-            insights.append("**Latency Consistency:**")
-            latency_consistency = metrics.sort_values('Latency_Consistency', ascending=False)
-            for i, (_, model) in enumerate(latency_consistency.iterrows(), 1):
-                insights.append(f"{i}. {model['Model']}: {model['Latency_Consistency']:.3f}")
+        insights.append(f"**{title}**")
+        insights.extend(ranked_lines(metrics, column, ascending, value_format))
+        if len(metrics) > FALLBACK_RANKING_LIMIT:
+            insights.append(f"... and {len(metrics) - FALLBACK_RANKING_LIMIT} more models")
     
     # Add summary insights
     insights.append("")
     insights.append("### 💡 **Key Insights:**")
     
-    if analysis_type == "Model Comparison":
-        if focus_metric == "Quality Score":
-            best = metrics.loc[metrics['Quality_Score_mean'].idxmax()]
-            insights.append(f"- **Best Performer**: {best['Model']} with {best['Quality_Score_mean']:.2f}/5.0")
-        elif focus_metric == "Latency":
-            fastest = metrics.loc[metrics['Latency_ms_mean'].idxmin()]
-            insights.append(f"- **Fastest Model**: {fastest['Model']} with {fastest['Latency_ms_mean']:.1f}s")
-        elif focus_metric == "Energy":
-            most_efficient = metrics.loc[metrics['Energy_Wh_mean'].idxmin()]
-            insights.append(f"- **Most Energy Efficient**: {most_efficient['Model']} with {most_efficient['Energy_Wh_mean']:.3f} Wh")
-    
-    elif analysis_type == "Efficiency Analysis":
-        if focus_metric == "Energy":
-            most_efficient = metrics.loc[metrics['Quality_Efficiency'].idxmax()]
-            insights.append(f"- **Most Energy Efficient**: {most_efficient['Model']} with {most_efficient['Quality_Efficiency']:.2f} quality/Wh")
-        elif focus_metric == "Cost":
-            most_consistent = metrics.loc[metrics['Quality_Consistency'].idxmax()]
-            insights.append(f"- **Most Consistent**: {most_consistent['Model']} with {most_consistent['Quality_Consistency']:.3f} consistency score")
-    
-    elif analysis_type == "Environmental Impact":
-        if focus_metric == "Energy":
-            lowest_energy = metrics.loc[metrics['Energy_Wh_mean'].idxmin()]
-            insights.append(f"- **Lowest Energy Consumption**: {lowest_energy['Model']} with {lowest_energy['Energy_Wh_mean']:.3f} Wh")
-        elif focus_metric == "CO₂":
-            lowest_co2 = metrics.loc[metrics['CO2_g_mean'].idxmin()]
-            insights.append(f"- **Lowest CO₂ Emissions**: {lowest_co2['Model']} with {lowest_co2['CO2_g_mean']:.3f} g")
-    
-    elif analysis_type == "Consistency Analysis":
-        most_consistent = metrics.loc[metrics['Quality_Consistency'].idxmax()]
-        insights.append(f"- **Most Consistent**: {most_consistent['Model']} with {most_consistent['Quality_Consistency']:.3f} consistency score")
+    highlight = CUSTOM_HIGHLIGHTS.get((analysis_type, focus_metric), CUSTOM_HIGHLIGHTS.get((analysis_type, None)))
+    if highlight:
+        label, column, highest, value_format = highlight
+        best = metrics.loc[metrics[column].idxmax() if highest else metrics[column].idxmin()]
+        insights.append(f"- **{label}**: {best['Model']} with {value_format % best[column]}")
     
     return insights
 
-def generate_mistral_custom_insights(metrics, analysis_type, focus_metric, custom_question=""):
-    """Generate custom insights using Mistral AI with user-specific questions"""
-    insights = []
-    
+def build_custom_insight_prompt(metrics, analysis_type, focus_metric, custom_question=""):
+    """Build the Mistral prompt for one analysis type and focus metric"""
     # Prepare focused data for the specific analysis
     if analysis_type == "Model Comparison":
         if focus_metric == "Quality Score":
@@ -1031,6 +1117,9 @@ def generate_mistral_custom_insights(metrics, analysis_type, focus_metric, custo
     else:  # Consistency Analysis
         data_focus = metrics[['Model', 'Quality_Consistency', 'Latency_Consistency', 'Energy_Consistency', 'Model_Size']].sort_values('Quality_Consistency', ascending=False)
     
+    # Rows are already ordered by the focus metric, so the budget keeps the leaders
+    data_table, kept = budget_table(data_focus, PROMPT_TOKEN_BUDGET)
+    
     # Create Mistral prompt
     prompt = f"""
     You are an expert AI researcher analyzing LLM benchmarking data. Please provide sophisticated insights for this specific analysis:
@@ -1038,8 +1127,8 @@ def generate_mistral_custom_insights(metrics, analysis_type, focus_metric, custo
     ANALYSIS TYPE: {analysis_type}
     FOCUS METRIC: {focus_metric}
     
-    DATA:
-    {data_focus.to_string()}
+    DATA (top {kept} of {len(data_focus)} models):
+    {data_table}
     
     ADDITIONAL CONTEXT:
     - This is a comparison of different LLM models across various performance metrics
@@ -1059,22 +1148,84 @@ def generate_mistral_custom_insights(metrics, analysis_type, focus_metric, custo
     Format your response with clear markdown headers and be specific with data points.
     """
     
-    # Call Mistral API
-    mistral_response = call_mistral_api(prompt)
-    
-    if "Error calling Mistral API" not in mistral_response and "Mistral API not available" not in mistral_response:
-        insights.append(f"## 🤖 **AI-Enhanced {analysis_type} - {focus_metric}**")
-        insights.append("")
-        insights.append("*Powered by Mistral AI*")
-        insights.append("")
-        insights.append(mistral_response)
-        insights.append("")
+    return prompt
+
+def custom_ai_insight_lines(metrics, analysis_type, focus_metric, mistral_response, cache_status, rendered=False):
+    """Insight lines for a custom analysis answer, or the basic analysis when the call failed"""
+    insights = []
+    if cache_status != 'error':
+        if not rendered:
+            insights.append(f"## 🤖 **AI-Enhanced {analysis_type} - {focus_metric}**")
+            insights.append("")
+            insights.append("*Powered by Mistral AI*")
+            insights.append("")
+            insights.append(mistral_response)
+            insights.append("")
+        insights.append(f"*{CACHE_STATUS_LABELS[cache_status]}*")
     else:
         # Fallback to basic analysis
         insights.extend(generate_custom_insights(metrics, analysis_type, focus_metric))
-    
     return insights
 
+def generate_mistral_custom_insights(metrics, analysis_type, focus_metric, custom_question="", stream=False):
+    """Generate custom insights using Mistral AI with user-specific questions
+
+    With stream=True the AI section is rendered while it arrives and only the
+    lines that follow it are returned.
+    """
+    prompt = build_custom_insight_prompt(metrics, analysis_type, focus_metric, custom_question)
+    
+    # Call Mistral API
+    if stream:
+        st.markdown(f"## 🤖 **AI-Enhanced {analysis_type} - {focus_metric}**\n\n*Powered by Mistral AI*")
+        mistral_response, cache_status = write_mistral_stream(prompt)
+    else:
+        mistral_response, cache_status = call_mistral_api_with_status(prompt)
+    
+    return custom_ai_insight_lines(metrics, analysis_type, focus_metric, mistral_response, cache_status, rendered=stream)
+
+def generate_batch_custom_insights(metrics, combinations=None, use_cache=True, model="mistral-small-latest", max_tokens=2000, temperature=0.7):
+    """Run every analysis type × focus metric concurrently; returns ({label: insight lines}, call reports)"""
+    combinations = CUSTOM_INSIGHT_COMBINATIONS if combinations is None else combinations
+    client = get_mistral_client()
+    cache = get_response_cache()
+    
+    answers = {}
+    keys = {}
+    calls = {}
+    reports = {}
+    for analysis_type, focus_metric in combinations:
+        label = f"{analysis_type} · {focus_metric}"
+        prompt = build_custom_insight_prompt(metrics, analysis_type, focus_metric)
+        keys[label] = cache.key(model, temperature, max_tokens, prompt)
+        cached = cache.get(keys[label]) if use_cache else None
+        if cached is not None:
+            answers[label] = (cached, 'hit')
+            reports[label] = CallReport(label)
+        elif client is None:
+            answers[label] = ("Mistral API not available", 'error')
+            reports[label] = CallReport(label, error="Mistral API not available")
+        else:
+            calls[label] = functools.partial(request_mistral_completion, client, prompt, model, max_tokens, temperature)
+    
+    results, call_reports = run_batch(
+        calls, max_concurrency=BATCH_MAX_CONCURRENCY, rate_per_sec=BATCH_RATE_PER_SEC,
+        breaker=client.breaker if client is not None else None
+    )
+    reports.update((report.label, report) for report in call_reports)
+    for label, result in results.items():
+        if isinstance(result, Exception):
+            answers[label] = (f"Error calling Mistral API: {result}", 'error')
+        else:
+            cache.set(keys[label], result, model)
+            answers[label] = (result, 'miss' if use_cache else 'bypass')
+    
+    insights = {}
+    for analysis_type, focus_metric in combinations:
+        label = f"{analysis_type} · {focus_metric}"
+        insights[label] = custom_ai_insight_lines(metrics, analysis_type, focus_metric, *answers[label])
+    return insights, [reports[f"{a} · {f}"] for a, f in combinations]
+
 def main():
     # Header
     st.markdown('<h1 class="main-header">🤖 Compar\'IA Benchmarking Dashboard</h1>', unsafe_allow_html=True)
@@ -1094,12 +1245,30 @@ def main():
     # Display AI status
     st.sidebar.header("🤖 AI Status")
     client = get_mistral_client()
-    if client is not None:
-        st.sidebar.success("✅ Mistral AI Connected")
+    breaker = get_circuit_breaker()
+    if client is not None and breaker.state == 'open':
+        st.sidebar.error(f"⏸️ {client.name} paused after {breaker.failures} failed calls")
+        st.sidebar.info(f"📊 Basic insights for the next {breaker.retry_in():.0f}s")
+        if breaker.last_error:
+            st.sidebar.caption(f"Last error: {breaker.last_error[:200]}")
+        if st.sidebar.button("Retry AI now"):
+            breaker.reset()
+            st.rerun()
+    elif client is not None and breaker.state == 'half-open':
+        st.sidebar.warning(f"🔄 {client.name}: checking whether the service is back")
+    elif client is not None:
+        st.sidebar.success(f"✅ {client.name} Connected")
         st.sidebar.info("🤖 AI-enhanced insights available")
+        if breaker.failures:
+            st.sidebar.caption(f"{breaker.failures}/{breaker.failure_threshold} recent failures before pausing")
     else:
-        st.sidebar.warning("⚠️ Mistral AI Unavailable")
+        st.sidebar.warning("⚠️ AI backend unavailable")
         st.sidebar.info("📊 Basic insights only")
+    st.sidebar.checkbox("Stream AI responses", key='stream_ai_responses',
+                        help="Show answers token by token instead of generating them in the background")
+    st.sidebar.checkbox("Bypass AI response cache", key='bypass_ai_cache',
+                        help="Always call the API; fresh answers still refresh the cache")
+    st.sidebar.caption(f"💾 {len(get_response_cache())} cached AI responses")
     
     # Sidebar
     st.sidebar.header("📊 Dashboard Controls")
@@ -1107,6 +1276,7 @@ def main():
     # Model filter
     selected_models = st.sidebar.multiselect(
         "Select Models to Display",
+        key="filter_models",
         options=df['Model'].unique(),
         default=df['Model'].unique()
     )
@@ -1114,6 +1284,7 @@ def main():
     # Category filter
     selected_categories = st.sidebar.multiselect(
         "Select Task Categories",
+        key="filter_categories",
         options=df['Task_Category'].unique(),
         default=df['Task_Category'].unique()
     )
@@ -1368,52 +1539,175 @@ def main():
         
         with col1:
             if st.button("🤖 Generate AI Insights", type="primary"):
-                with st.spinner("🤖 AI is analyzing your data..."):
-                    try:
-                        # Generate a simple, focused AI insight
-                        prompt = f"""
-                        Analyze this LLM benchmarking data and provide 3-5 key insights in simple bullet points:
-                        
-                        Models: {', '.join(filtered_metrics['Model'].tolist())}
-                        Best Quality: {filtered_metrics.loc[filtered_metrics['Quality_Score_mean'].idxmax(), 'Model']} ({filtered_metrics['Quality_Score_mean'].max():.2f}/5)
-                        Fastest: {filtered_metrics.loc[filtered_metrics['Latency_ms_mean'].idxmin(), 'Model']} ({filtered_metrics['Latency_ms_mean'].min():.0f}ms)
-                        Most Energy Efficient: {filtered_metrics.loc[filtered_metrics['Energy_Wh_mean'].idxmin(), 'Model']} ({filtered_metrics['Energy_Wh_mean'].min():.0f}Wh)
-                        
-                        Focus on: key findings, best model recommendations, and trade-offs. Keep it concise and actionable.
-                        """
-                        
-                        ai_response = call_mistral_api(prompt)
-                        
-                        if "Error calling Mistral API" not in ai_response:
-                            st.success("✅ AI Analysis Complete")
-                            st.markdown("### 🎯 **Key Insights**")
-                            st.markdown(ai_response)
-                        else:
-                            st.warning("⚠️ AI temporarily unavailable. Showing basic insights:")
-                            show_basic_insights(filtered_metrics)
-                            
-                    except Exception as e:
-                        st.error(f"Error: {e}")
+                # Generate a simple, focused AI insight
+                prompt = f"""
+                Analyze this LLM benchmarking data and provide 3-5 key insights in simple bullet points:
+                
+                Models: {', '.join(filtered_metrics['Model'].tolist())}
+                Best Quality: {filtered_metrics.loc[filtered_metrics['Quality_Score_mean'].idxmax(), 'Model']} ({filtered_metrics['Quality_Score_mean'].max():.2f}/5)
+                Fastest: {filtered_metrics.loc[filtered_metrics['Latency_ms_mean'].idxmin(), 'Model']} ({filtered_metrics['Latency_ms_mean'].min():.0f}ms)
+                Most Energy Efficient: {filtered_metrics.loc[filtered_metrics['Energy_Wh_mean'].idxmin(), 'Model']} ({filtered_metrics['Energy_Wh_mean'].min():.0f}Wh)
+                
+                Focus on: key findings, best model recommendations, and trade-offs. Keep it concise and actionable.
+                """
+                if st.session_state.get('stream_ai_responses'):
+                    st.session_state.pop('ai_insight_job', None)
+                    st.markdown("### 🎯 **Key Insights**")
+                    ai_response, cache_status = write_mistral_stream(prompt)
+                    if cache_status != 'error':
+                        st.caption(CACHE_STATUS_LABELS[cache_status])
+                    else:
+                        st.warning("⚠️ AI temporarily unavailable. Showing basic insights:")
                         show_basic_insights(filtered_metrics)
+                else:
+                    submit_ai_job('ai_insight_job', prompt, "AI is analyzing your data")
+            
+            def render_insight(text):
+                st.success("✅ AI Analysis Complete")
+                st.markdown("### 🎯 **Key Insights**")
+                st.markdown(text)
+            
+            def render_insight_fallback():
+                st.warning("⚠️ AI temporarily unavailable. Showing basic insights:")
+                show_basic_insights(filtered_metrics)
+            
+            # Runs in the background; the rest of the page does not wait for it
+            show_ai_job('ai_insight_job', render_insight, render_insight_fallback)
         
         with col2:
             st.metric("Models Analyzed", len(filtered_metrics))
-            st.metric("AI Status", "✅ Connected" if get_mistral_client() else "❌ Offline")
+            if get_mistral_client() is None:
+                ai_status = "❌ Offline"
+            elif get_circuit_breaker().state == 'open':
+                ai_status = "⏸️ Paused"
+            else:
+                ai_status = "✅ Connected"
+            st.metric("AI Status", ai_status)
         
         # Simple custom question
         st.subheader("💬 Ask a Question")
         question = st.text_input("Ask about your data:", placeholder="Which model is best for production?")
         
         if question and st.button("🔍 Get Answer"):
-            with st.spinner("Thinking..."):
-                try:
-                    answer = call_mistral_api(f"Based on this LLM benchmarking data, answer: {question}")
-                    if "Error calling Mistral API" not in answer:
-                        st.markdown(f"**Answer:** {answer}")
-                    else:
-                        st.info("AI temporarily unavailable. Please try again later.")
-                except Exception as e:
-                    st.error(f"Error: {e}")
+            question_prompt = f"Based on this LLM benchmarking data, answer: {question}"
+            if st.session_state.get('stream_ai_responses'):
+                st.session_state.pop('ai_answer_job', None)
+                st.markdown("**Answer:**")
+                answer, cache_status = write_mistral_stream(question_prompt)
+                if cache_status != 'error':
+                    st.caption(CACHE_STATUS_LABELS[cache_status])
+                else:
+                    st.info("AI temporarily unavailable. Please try again later.")
+            else:
+                submit_ai_job('ai_answer_job', question_prompt, "Thinking")
+        
+        show_ai_job(
+            'ai_answer_job',
+            lambda answer: st.markdown(f"**Answer:** {answer}"),
+            lambda: st.info("AI temporarily unavailable. Please try again later.")
+        )
+        
+        # Custom analysis: one analysis type × focus metric, optionally with a question
+        st.subheader("🎯 Custom Analysis")
+        custom_col1, custom_col2 = st.columns(2)
+        with custom_col1:
+            analysis_type = st.selectbox(
+                "Analysis type", list(dict.fromkeys(analysis for analysis, _ in CUSTOM_INSIGHT_COMBINATIONS)),
+                key="custom_analysis_type"
+            )
+        with custom_col2:
+            focus_metric = st.selectbox(
+                "Focus metric", [focus for analysis, focus in CUSTOM_INSIGHT_COMBINATIONS if analysis == analysis_type],
+                key="custom_focus_metric"
+            )
+        custom_question = st.text_input("Specific question (optional):", key="custom_question")
+        
+        if st.button("🎯 Run Custom Analysis"):
+            stream = st.session_state.get('stream_ai_responses', False)
+            if stream:
+                custom_lines = generate_mistral_custom_insights(
+                    filtered_metrics, analysis_type, focus_metric, custom_question, stream=True
+                )
+            else:
+                with st.spinner("🤖 Running custom analysis..."):
+                    custom_lines = generate_mistral_custom_insights(
+                        filtered_metrics, analysis_type, focus_metric, custom_question
+                    )
+            st.markdown("\n".join(custom_lines))
+        
+        # Batch mode: every custom analysis at once
+        st.subheader("📚 Batch Analysis")
+        st.caption(f"Runs all {len(CUSTOM_INSIGHT_COMBINATIONS)} analysis × focus combinations, "
+                   f"{BATCH_MAX_CONCURRENCY} at a time with rate limiting and retries")
+        if st.button("📚 Run All Custom Analyses"):
+            with st.spinner("🤖 Running batch analysis..."):
+                st.session_state['ai_batch'] = generate_batch_custom_insights(
+                    filtered_metrics, use_cache=not st.session_state.get('bypass_ai_cache', False)
+                )
+        
+        if 'ai_batch' in st.session_state:
+            batch_insights, batch_reports = st.session_state['ai_batch']
+            st.dataframe(pd.DataFrame([{
+                'Analysis': report.label,
+                'Latency (s)': round(report.latency_sec, 2),
+                'Attempts': report.attempts,
+                'Retries': report.retries,
+                'Waited (s)': round(report.waited_sec, 2),
+                'Error': report.error,
+            } for report in batch_reports]), use_container_width=True, hide_index=True)
+            for label, lines in batch_insights.items():
+                with st.expander(label):
+                    st.markdown("\n".join(lines))
+        
+        show_saved_report()
+    
+    # Data export
+    st.sidebar.header("📥 Export Data")
+    
+    if st.sidebar.button("Download Processed Data"):
+        csv = filtered_metrics.to_csv(index=False)
+        st.sidebar.download_button(
+            label="Download CSV",
+            data=csv,
+            file_name="compar_ia_benchmark_results.csv",
+            mime="text/csv"
+        )
+    
+    # Advanced analysis mstion
+    st.sidebar.header("🔬 Advanced Analysis")
+    
+    if st.sidebar.button("Generate Detailed Report"):
+        st.sidebar.success("Detailed report generated!")
+        # This could generate a comprehensive PDF report
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def cached_analysis_report(manifest_path, modified):
+    """Saved report; modified (the manifest mtime) refreshes it after a new generate_report run"""
+    return load_analysis_report(manifest_path)
+
+def show_saved_report(report_dir=REPORT_DIR):
+    """Insights, recommendations and rankings from the last generate_report.py run"""
+    manifest_path = os.path.join(report_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return
+    try:
+        report = cached_analysis_report(manifest_path, os.path.getmtime(manifest_path))
+    except (OSError, ValueError) as e:
+        st.warning(f"Could not read the saved analysis report: {e}")
+        return
+    
+    st.subheader("📄 Saved Analysis Report")
+    summary = report.summary
+    st.caption(f"generate_report.py run of {report.created} · {summary.get('total_models', '?')} models, "
+               f"{summary.get('total_tasks', '?')} tasks, {summary.get('total_runs', '?')} runs")
+    with st.expander("💡 Insights"):
+        st.markdown("\n\n".join(report.insights))
+    with st.expander("🎯 Recommendations"):
+        st.markdown("\n".join(report.recommendations))
+    if 'rankings' in report.tables:
+        with st.expander("🏆 Rankings"):
+            rankings = report.tables['rankings'].pivot(index='rank', columns='ranking', values='Model')
+            st.dataframe(rankings, use_container_width=True)
 
 def show_basic_insights(metrics):
     """Show basic insights when AI is not available"""
@@ -1442,27 +1736,8 @@ def show_basic_insights(metrics):
         st.subheader("🔥 **Performance Heatmap**")
         st.markdown("Visual comparison of all models across key metrics")
         
-        heatmap_fig = create_performance_heatmap(filtered_metrics)
+        heatmap_fig = create_performance_heatmap(metrics)
         st.plotly_chart(heatmap_fig, use_container_width=True)
-    
-    # Data export
-    st.sidebar.header("📥 Export Data")
-    
-    if st.sidebar.button("Download Processed Data"):
-        csv = filtered_metrics.to_csv(index=False)
-        st.sidebar.download_button(
-            label="Download CSV",
-            data=csv,
-            file_name="compar_ia_benchmark_results.csv",
-            mime="text/csv"
-        )
-    
-    # Advanced analysis mstion
-    st.sidebar.header("🔬 Advanced Analysis")
-    
-    if st.sidebar.button("Generate Detailed Report"):
-        st.sidebar.success("Detailed report generated!")
-        # This could generate a comprehensive PDF report
 
 if __name__ == "__main__":
-    main()
+    run_profiled(main, 'dashboard_comparai')
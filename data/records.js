@@ -0,0 +1 @@
+window.COMPARIA_RECORDS = {"version":3,"count":6,"strings":{"Model":["GPT-OSS 20B","LLaMA 3.1 8B","Gemma 8B","Mistral Small","GPT-5","DeepSeek R1"],"Model_Size":["Medium","Small","Small","Medium","Large","Large"]},"float32":{"Quality_Score_mean":"EFiVQN0kkkBWDpFA8KeKQFYOkUDdJIJA","Latency_sec_mean":"RItoQZqZW0EOLVhBL91iQUSLw0FI4cRB","Energy_kWh_mean":"4Xp0P5qZyT/RIus/308tQAAAtEHLIRZC","CO2_kg_mean":"ZmbmPiuHdj/Jdo4/L93UP2ZmZkGWQ8BB","Cost_EUR_mean":"AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA","QualityEfficiency":"k2GcQGaUOUBT7R1AOM/MP0dNTj7K6t09","SpeedEfficiency":"amikPkVeqj48x6s+qHacPhjnPT5mOSk+","QualityNorm":"IbBqP7pJZD+sHGI/309VP6wcYj+6SUQ/","EnergyEffNorm":"AACAPz3mFz/tQwE/oqOnPlrcKD1epLU8","SpeedEffNorm":"FgR1Pw7mfT8AAIA/MS1pP2GBDT+ZMfw+","LowEnergyNorm":"AACAPympez+903k/MLtzP5hs0j4AAAAA","LowCO2Norm":"AACAP2Zuej+OzXg/ItVyP0Uj0T4AAAAA","LowLatencyNorm":"hGdoP2YQez8AAIA/rZdwPy6FdjwAAAAA","FootprintIndex":"AACAP4Qbez/CXXk/qlNzP2bY0T4AAAAA","SustainabilityScore":"EhRiPxBFRz9AKUE/cR0sP5aVDD8Stfg+","Rank":"AACAPwAAAEAAAEBAAACAQAAAoEAAAMBA"},"order":{"Rank":"AAAAAAEAAAACAAAAAwAAAAQAAAAFAAAA","Model":"BQAAAAQAAAAAAAAAAgAAAAEAAAADAAAA","Model_Size":"AQAAAAIAAAAAAAAAAwAAAAQAAAAFAAAA","Quality_Score_mean":"BQAAAAMAAAACAAAABAAAAAEAAAAAAAAA","Latency_sec_mean":"AgAAAAEAAAADAAAAAAAAAAQAAAAFAAAA","Energy_kWh_mean":"AAAAAAEAAAACAAAAAwAAAAQAAAAFAAAA","CO2_kg_mean":"AAAAAAEAAAACAAAAAwAAAAQAAAAFAAAA","FootprintIndex":"BQAAAAQAAAADAAAAAgAAAAEAAAAAAAAA"}};
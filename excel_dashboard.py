@@ -6,6 +6,8 @@ import numpy as np
 import os
 from mistralai import Mistral
 
+from workbook_io import read_sheet
+
 # Page configuration
 st.set_page_config(
     page_title="ComparAI Benchmarking Dashboard",
@@ -90,7 +92,8 @@ def load_excel_data():
         excel_file = 'ComparAI_Benchmark_Template_v2 (3).xlsx'
         if os.path.exists(excel_file):
             # Read the 'Runs' sheet which contains the detailed data
-            df = pd.read_excel(excel_file, sheet_name='Runs')
+            # (reader picked by COMPARIA_EXCEL_READER, see workbook_io)
+            df = read_sheet(excel_file, sheet='Runs')
             
             # Clean the data
             df = df.dropna(subset=['Model', 'Quality (1-5)', 'Latency (milli sec)', 'Energy(wh)', 'co2 (g)'])
@@ -0,0 +1,140 @@
+"""Chunked table exports in CSV, Parquet, Arrow IPC and XLSX.
+
+A frame is encoded ``chunk_rows`` rows at a time into a temporary file on
+disk, so the encoded output is never built as one string or bytes object next
+to the frame. ``write_export`` returns that file as a ``BufferedReader``, one of
+the types ``st.download_button`` accepts from a deferred ``data`` callable; the
+file is removed when the reader is closed or collected.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import gzip
+import io
+import os
+import tempfile
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import IO
+
+import pandas as pd
+
+DEFAULT_CHUNK_ROWS = 50_000
+XLSX_MAX_ROWS = 1_048_575  # one row of the sheet is the header
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    label: str
+    extension: str
+    mime: str
+    compressions: tuple[str, ...]  # first one is the default
+
+
+EXPORT_FORMATS = {
+    "csv": ExportFormat("CSV", "csv", "text/csv", ("none", "gzip")),
+    "parquet": ExportFormat("Parquet", "parquet", "application/vnd.apache.parquet", ("zstd", "snappy", "gzip", "none")),
+    "arrow": ExportFormat("Arrow IPC", "arrow", "application/vnd.apache.arrow.file", ("lz4", "zstd", "none")),
+    "xlsx": ExportFormat(
+        "Excel", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ("none",)
+    ),
+}
+
+
+def iter_chunks(df: pd.DataFrame, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start : start + chunk_rows]
+
+
+def export_file_name(stem: str, fmt: str, compression: str = "none") -> str:
+    name = f"{stem}.{EXPORT_FORMATS[fmt].extension}"
+    # Parquet and Arrow compress inside the file; only CSV gets a suffix
+    return f"{name}.gz" if fmt == "csv" and compression == "gzip" else name
+
+
+def export_mime(fmt: str, compression: str = "none") -> str:
+    return "application/gzip" if fmt == "csv" and compression == "gzip" else EXPORT_FORMATS[fmt].mime
+
+
+def _write_csv(df: pd.DataFrame, sink: IO[bytes], compression: str, chunk_rows: int) -> None:
+    out = gzip.GzipFile(fileobj=sink, mode="wb", compresslevel=6, mtime=0) if compression == "gzip" else sink
+    for i, chunk in enumerate(iter_chunks(df, chunk_rows)):
+        out.write(chunk.to_csv(index=False, header=i == 0).encode("utf-8"))
+    if out is not sink:
+        out.close()
+
+
+def _arrow_chunks(df: pd.DataFrame, chunk_rows: int):
+    import pyarrow as pa
+
+    # One schema for every chunk, so a chunk of all-missing values keeps its type
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    return schema, (pa.Table.from_pandas(chunk, schema=schema, preserve_index=False) for chunk in iter_chunks(df, chunk_rows))
+
+
+def _write_parquet(df: pd.DataFrame, sink: IO[bytes], compression: str, chunk_rows: int) -> None:
+    import pyarrow.parquet as pq
+
+    schema, tables = _arrow_chunks(df, chunk_rows)
+    with pq.ParquetWriter(sink, schema, compression=None if compression == "none" else compression) as writer:
+        for table in tables:
+            writer.write_table(table)
+
+
+def _write_arrow(df: pd.DataFrame, sink: IO[bytes], compression: str, chunk_rows: int) -> None:
+    import pyarrow.ipc as ipc
+
+    schema, tables = _arrow_chunks(df, chunk_rows)
+    options = ipc.IpcWriteOptions(compression=None if compression == "none" else compression)
+    with ipc.new_file(sink, schema, options=options) as writer:
+        for table in tables:
+            writer.write_table(table)
+
+
+def _write_xlsx(df: pd.DataFrame, sink: IO[bytes], compression: str, chunk_rows: int) -> None:
+    from openpyxl import Workbook
+
+    if len(df) > XLSX_MAX_ROWS:
+        raise ValueError(f"{len(df):,} rows do not fit in one Excel sheet (max {XLSX_MAX_ROWS:,}); use CSV or Parquet")
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("data")
+    sheet.append([str(col) for col in df.columns])
+    for chunk in iter_chunks(df, chunk_rows):
+        # NaN is not a valid cell value; write blanks instead
+        for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+            sheet.append(row)
+    workbook.save(sink)
+
+
+WRITERS = {"csv": _write_csv, "parquet": _write_parquet, "arrow": _write_arrow, "xlsx": _write_xlsx}
+
+
+class ExportFile(io.BufferedReader):
+    """Read-only handle on an encoded export that deletes the file on close."""
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.name)
+
+
+def write_export(
+    df: pd.DataFrame, fmt: str, compression: str | None = None, *, chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> ExportFile:
+    """Encode ``df`` as ``fmt`` and return the file, open for reading from the start."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {sorted(EXPORT_FORMATS)}")
+    compression = compression or EXPORT_FORMATS[fmt].compressions[0]
+    if compression not in EXPORT_FORMATS[fmt].compressions:
+        raise ValueError(f"{EXPORT_FORMATS[fmt].label} does not support {compression!r} compression")
+    with tempfile.NamedTemporaryFile(prefix="comparia-export-", suffix=f".{fmt}", delete=False) as sink:
+        try:
+            WRITERS[fmt](df.reset_index(drop=True), sink, compression, chunk_rows)
+        except BaseException:
+            sink.close()
+            os.unlink(sink.name)
+            raise
+    return ExportFile(io.FileIO(sink.name, "rb"))
@@ -4,53 +4,68 @@ Advanced Analysis Report Generator for ComparAI Benchmarking
 Generates comprehensive reports with statistical analysis
 """
 
+import argparse
+import functools
+import time
 import pandas as pd
 import numpy as np
 from openpyxl import load_workbook
-import json
-from datetime import datetime
 
-def load_comparai_data():
+from report_store import MANIFEST_NAME, REPORT_DIR, ReportWriter
+from stage_dag import Stage, StageCache, file_fingerprint, run_stages
+
+WORKBOOK_PATH = 'ComparAI_Benchmark_Template_v2-3.xlsx'
+
+# Columns each section reads; a section is recomputed only when these change
+METRIC_COLUMNS = ['Model', 'Model_Size', 'Quality_Score', 'Latency_sec', 'Energy_kWh', 'CO2_kg', 'Cost_EUR']
+OVERALL_COLUMNS = ['Task_ID', 'Model', 'Date']
+SIZE_COLUMNS = ['Model_Size', 'Quality_Score', 'Latency_sec', 'Energy_kWh', 'CO2_kg']
+CATEGORY_COLUMNS = ['Task_Category', 'Quality_Score', 'Latency_sec', 'Energy_kWh']
+CORRELATION_COLUMNS = ['Quality_Score', 'Latency_sec', 'Energy_kWh', 'CO2_kg', 'Cost_EUR']
+
+def load_comparai_data(path=WORKBOOK_PATH):
     """Load data from the ComparAI Excel template"""
     try:
-        wb = load_workbook('ComparAI_Benchmark_Template_v2-3.xlsx', data_only=True)
-        ws = wb['Runs']
-        
-        data = []
-        headers = []
-        
-        # Get headers
-        for col in range(1, ws.max_column + 1):
-            header = ws.cell(row=1, column=col).value
-            if header:
-                headers.append(str(header))
-            else:
-                headers.append(f"Column_{col}")
-        
-        # Get data
-        for row in range(2, ws.max_row + 1):
-            row_data = []
-            has_data = False
-            
-            for col in range(1, ws.max_column + 1):
-                cell_value = ws.cell(row=row, column=col).value
-                row_data.append(cell_value)
-                if cell_value is not None:
-                    has_data = True
-            
-            if has_data:
-                data.append(row_data)
-        
-        df = pd.DataFrame(data, columns=headers)
-        
-        # Clean and standardize
-        df = clean_comparai_data(df)
-        return df
-        
+        return read_comparai_workbook(path)
     except Exception as e:
         print(f"Error loading data: {e}")
         return None
 
+def read_comparai_workbook(path=WORKBOOK_PATH):
+    """Read and clean the Runs sheet; raises when the workbook cannot be used"""
+    wb = load_workbook(path, data_only=True)
+    ws = wb['Runs']
+    
+    data = []
+    headers = []
+    
+    # Get headers
+    for col in range(1, ws.max_column + 1):
+        header = ws.cell(row=1, column=col).value
+        if header:
+            headers.append(str(header))
+        else:
+            headers.append(f"Column_{col}")
+    
+    # Get data
+    for row in range(2, ws.max_row + 1):
+        row_data = []
+        has_data = False
+        
+        for col in range(1, ws.max_column + 1):
+            cell_value = ws.cell(row=row, column=col).value
+            row_data.append(cell_value)
+            if cell_value is not None:
+                has_data = True
+        
+        if has_data:
+            data.append(row_data)
+    
+    df = pd.DataFrame(data, columns=headers)
+    
+    # Clean and standardize
+    return clean_comparai_data(df)
+
 def clean_comparai_data(df):
     """Clean and standardize the ComparAI data format"""
     df = df.dropna(subset=['Model', 'Task ID'])
@@ -134,63 +149,80 @@ def calculate_advanced_metrics(df):
     
     return metrics
 
-def perform_statistical_analysis(df, metrics):
-    """Perform comprehensive statistical analysis"""
-    analysis = {}
-    
-    # Overall statistics
-    analysis['overall'] = {
+def analyze_overall(df):
+    """Run, task and model counts"""
+    return {
         'total_tasks': len(df['Task_ID'].unique()),
         'total_models': len(df['Model'].unique()),
         'total_runs': len(df),
         'date_range': f"{df.get('Date', pd.Series(['Unknown'])).min()} to {df.get('Date', pd.Series(['Unknown'])).max()}"
     }
-    
-    # Model size analysis
+
+def analyze_by_size(df):
+    """Mean quality, latency, energy and CO₂ per model size"""
     size_analysis = df.groupby('Model_Size').agg({
         'Quality_Score': 'mean',
         'Latency_sec': 'mean',
         'Energy_kWh': 'mean',
         'CO2_kg': 'mean'
     }).round(3)
-    analysis['by_size'] = size_analysis.to_dict()
-    
-    # Task category analysis
-    if 'Task_Category' in df.columns:
-        category_analysis = df.groupby('Task_Category').agg({
-            'Quality_Score': ['mean', 'std'],
-            'Latency_sec': ['mean', 'std'],
-            'Energy_kWh': ['mean', 'std']
-        }).round(3)
-        analysis['by_category'] = category_analysis.to_dict()
-    
-    # Correlation analysis
-    numeric_cols = ['Quality_Score', 'Latency_sec', 'Energy_kWh', 'CO2_kg', 'Cost_EUR']
-    correlation_matrix = df[numeric_cols].corr()
-    analysis['correlations'] = correlation_matrix.to_dict()
-    
-    # Performance rankings
+    return size_analysis.to_dict()
+
+def analyze_by_category(df):
+    """Per task category statistics, or None without a category column"""
+    if 'Task_Category' not in df.columns:
+        return None
+    category_analysis = df.groupby('Task_Category').agg({
+        'Quality_Score': ['mean', 'std'],
+        'Latency_sec': ['mean', 'std'],
+        'Energy_kWh': ['mean', 'std']
+    }).round(3)
+    return category_analysis.to_dict()
+
+def analyze_correlations(df):
+    """Correlation matrix of the numeric run measurements"""
+    return df[CORRELATION_COLUMNS].corr().to_dict()
+
+def rank_models(metrics):
+    """Models ranked on each headline metric (quality descending, costs ascending)"""
     rankings = {}
     for metric in ['Quality_Score_mean', 'Latency_sec_mean', 'Energy_kWh_mean', 'CO2_kg_mean', 'Cost_EUR_mean']:
         if metric in metrics.columns:
             sorted_models = metrics.sort_values(metric, ascending=metric != 'Quality_Score_mean')
             rankings[metric] = sorted_models[['Model', metric]].to_dict('records')
-    
-    analysis['rankings'] = rankings
-    
-    # Efficiency analysis
-    efficiency_metrics = ['Quality_Efficiency', 'Cost_Efficiency', 'Speed_Efficiency', 'Quality_Consistency']
+    return rankings
+
+def rank_efficiency(metrics):
+    """Models ranked on each efficiency metric"""
     efficiency_analysis = {}
-    for metric in efficiency_metrics:
+    for metric in ['Quality_Efficiency', 'Cost_Efficiency', 'Speed_Efficiency', 'Quality_Consistency']:
         if metric in metrics.columns:
             sorted_models = metrics.sort_values(metric, ascending=False)
             efficiency_analysis[metric] = sorted_models[['Model', metric]].to_dict('records')
-    
-    analysis['efficiency'] = efficiency_analysis
-    
+    return efficiency_analysis
+
+def assemble_analysis(overall, by_size, by_category, correlations, rankings, efficiency):
+    """Combine the analysis sections in report order"""
+    analysis = {'overall': overall, 'by_size': by_size}
+    if by_category is not None:
+        analysis['by_category'] = by_category
+    analysis['correlations'] = correlations
+    analysis['rankings'] = rankings
+    analysis['efficiency'] = efficiency
     return analysis
 
-def generate_insights(metrics, analysis):
+def perform_statistical_analysis(df, metrics):
+    """Perform comprehensive statistical analysis"""
+    return assemble_analysis(
+        analyze_overall(df),
+        analyze_by_size(df),
+        analyze_by_category(df),
+        analyze_correlations(df),
+        rank_models(metrics),
+        rank_efficiency(metrics)
+    )
+
+def generate_insights(metrics, analysis=None):
     """Generate actionable insights and recommendations"""
     insights = []
     
@@ -235,7 +267,7 @@ def generate_insights(metrics, analysis):
     
     return insights
 
-def generate_recommendations(metrics, analysis):
+def generate_recommendations(metrics, analysis=None):
     """Generate specific use-case recommendations"""
     recommendations = []
     
@@ -288,89 +320,190 @@ def generate_recommendations(metrics, analysis):
     
     return recommendations
 
-def save_analysis_report(metrics, analysis, insights, recommendations):
-    """Save comprehensive analysis report"""
-    # Convert analysis to JSON-serializable format
-    def convert_to_serializable(obj):
-        if isinstance(obj, dict):
-            return {str(k): convert_to_serializable(v) for k, v in obj.items()}
-        elif isinstance(obj, (list, tuple)):
-            return [convert_to_serializable(item) for item in obj]
-        elif isinstance(obj, (np.integer, np.floating)):
-            return float(obj)
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        elif hasattr(obj, 'to_dict'):
-            return obj.to_dict()
-        else:
-            return str(obj)
-    
-    report = {
-        'timestamp': datetime.now().isoformat(),
-        'summary': {
+def ranking_table(rankings):
+    """Long table (ranking, rank, Model, value) from {metric: ranked records}"""
+    frames = []
+    for metric, records in rankings.items():
+        frame = pd.DataFrame.from_records(records, columns=['Model', metric]).rename(columns={metric: 'value'})
+        frame.insert(0, 'rank', np.arange(1, len(frame) + 1))
+        frame.insert(0, 'ranking', metric)
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=['ranking', 'rank', 'Model', 'value'])
+    return pd.concat(frames, ignore_index=True)
+
+def section_table(section, index_name):
+    """Table from a {column: {row: value}} section, with flattened column names"""
+    table = pd.DataFrame(section)
+    if isinstance(table.columns, pd.MultiIndex):
+        table.columns = ['_'.join(map(str, col)) for col in table.columns]
+    return table.rename_axis(index_name).reset_index()
+
+def save_analysis_report(metrics, analysis, insights, recommendations, report_dir=REPORT_DIR, table_format='parquet'):
+    """Save the analysis report as a JSON manifest plus one columnar table per section"""
+    with ReportWriter(report_dir, table_format) as report:
+        report.set('summary', {
             'total_models': len(metrics),
-            'total_tasks': analysis['overall']['total_tasks'],
-            'total_runs': analysis['overall']['total_runs']
-        },
-        'metrics': metrics.to_dict('records'),
-        'statistical_analysis': convert_to_serializable(analysis),
-        'insights': insights,
-        'recommendations': recommendations
-    }
-    
-    # Save as JSON
-    with open('comparai_analysis_report.json', 'w') as f:
-        json.dump(report, f, indent=2, default=str)
+            'total_tasks': int(analysis['overall']['total_tasks']),
+            'total_runs': int(analysis['overall']['total_runs'])
+        })
+        report.set('overall', analysis['overall'])
+        report.write_table('metrics', metrics)
+        report.write_table('rankings', ranking_table(analysis['rankings']))
+        report.write_table('efficiency', ranking_table(analysis['efficiency']))
+        report.write_table('correlations', section_table(analysis['correlations'], 'metric'))
+        report.write_table('by_size', section_table(analysis['by_size'], 'Model_Size'))
+        if 'by_category' in analysis:
+            report.write_table('by_category', section_table(analysis['by_category'], 'Task_Category'))
+        report.set('insights', insights)
+        report.set('recommendations', recommendations)
     
     # Save metrics as CSV
     metrics.to_csv('comparai_metrics_detailed.csv', index=False)
     
     print("✅ Analysis report saved:")
-    print("   - comparai_analysis_report.json")
+    print(f"   - {report_dir}/ ({MANIFEST_NAME} + {len(report.manifest['tables'])} {table_format} tables)")
     print("   - comparai_metrics_detailed.csv")
 
-def main():
+def size_table(df):
+    """by_size section as a table"""
+    return section_table(analyze_by_size(df), 'Model_Size')
+
+def category_table(df):
+    """by_category section as a table, or None without a category column"""
+    section = analyze_by_category(df)
+    return None if section is None else section_table(section, 'Task_Category')
+
+def correlation_table(df):
+    """correlations section as a table"""
+    return section_table(analyze_correlations(df), 'metric')
+
+def rankings_table(metrics):
+    """rankings section as a long table"""
+    return ranking_table(rank_models(metrics))
+
+def efficiency_table(metrics):
+    """efficiency section as a long table"""
+    return ranking_table(rank_efficiency(metrics))
+
+def store_table(name, report, table):
+    """Write one section table to the report; returns its manifest entry"""
+    if table is None:
+        return None
+    report.write_table(name, table)
+    return report.manifest['tables'][name]
+
+# Report stage DAG: the workbook feeds the runs table, the sections read
+# either the runs or the per-model metrics and are independent of each other.
+# A stage's key covers its own function only, so each one lists (depends) the
+# helpers it calls and the module constants it reads.
+REPORT_STAGES = [
+    Stage('runs', read_comparai_workbook, inputs=('workbook',), depends=(clean_comparai_data,)),
+    Stage('metrics', calculate_advanced_metrics, inputs=('runs',), columns={'runs': METRIC_COLUMNS}),
+    Stage('overall', analyze_overall, inputs=('runs',), columns={'runs': OVERALL_COLUMNS}),
+    Stage('by_size', size_table, inputs=('runs',), columns={'runs': SIZE_COLUMNS},
+          depends=(analyze_by_size, section_table)),
+    Stage('by_category', category_table, inputs=('runs',), columns={'runs': CATEGORY_COLUMNS},
+          depends=(analyze_by_category, section_table)),
+    Stage('correlations', correlation_table, inputs=('runs',), columns={'runs': CORRELATION_COLUMNS},
+          depends=(analyze_correlations, section_table, CORRELATION_COLUMNS)),
+    Stage('rankings', rankings_table, inputs=('metrics',), depends=(rank_models, ranking_table)),
+    Stage('efficiency', efficiency_table, inputs=('metrics',), depends=(rank_efficiency, ranking_table)),
+    Stage('insights', generate_insights, inputs=('metrics',)),
+    Stage('recommendations', generate_recommendations, inputs=('metrics',)),
+]
+
+# Tables in manifest order. Each one is written by its own store_<name> stage
+# as soon as it is ready and then dropped, so the sections are never held
+# together in memory.
+REPORT_TABLES = ['metrics', 'rankings', 'efficiency', 'correlations', 'by_size', 'by_category']
+STORE_STAGES = [
+    Stage(f'store_{name}', functools.partial(store_table, name), inputs=('report', name), cache=False)
+    for name in REPORT_TABLES
+]
+REPORT_VALUES = ['overall', 'metrics', 'insights', 'recommendations', *(stage.name for stage in STORE_STAGES)]
+
+STAGE_STATUS_ICONS = {'computed': '🔄', 'cached': '💾', 'uncached': '➡️'}
+
+def run_report_stages(workbook=WORKBOOK_PATH, use_cache=True, cache_dir=None, workers=4, report=None):
+    """Run the report DAG; returns (values by stage name, stage runs).
+
+    With a ReportWriter as ``report`` the section tables are written to it
+    and only the REPORT_VALUES are returned.
+    """
+    cache = StageCache(cache_dir) if use_cache else None
+    sources = {'workbook': str(workbook)}
+    fingerprints = {'workbook': file_fingerprint(workbook)}
+    stages = REPORT_STAGES
+    if report is not None:
+        sources['report'] = report
+        fingerprints['report'] = f"{report.directory}:{report.table_format}"
+        stages = REPORT_STAGES + STORE_STAGES
+    return run_stages(
+        stages,
+        sources,
+        source_fingerprints=fingerprints,
+        cache=cache,
+        max_workers=workers,
+        keep=REPORT_VALUES if report is not None else None
+    )
+
+def finish_report(report, values):
+    """Manifest fields besides the tables, which the store stages wrote"""
+    overall = values['overall']
+    report.set('summary', {
+        'total_models': len(values['metrics']),
+        'total_tasks': int(overall['total_tasks']),
+        'total_runs': int(overall['total_runs'])
+    })
+    report.set('overall', overall)
+    report.set('insights', values['insights'])
+    report.set('recommendations', values['recommendations'])
+    tables = {name: values[f'store_{name}'] for name in REPORT_TABLES}
+    report.manifest['tables'] = {name: entry for name, entry in tables.items() if entry is not None}
+
+def main(argv=None):
     """Main analysis function"""
+    parser = argparse.ArgumentParser(description="Generate the ComparAI analysis report")
+    parser.add_argument('--workbook', default=WORKBOOK_PATH, help="benchmark workbook with a Runs sheet")
+    parser.add_argument('--workers', type=int, default=4, help="sections computed in parallel")
+    parser.add_argument('--cache-dir', default=None, help="stage cache directory (default .cache/stages)")
+    parser.add_argument('--no-cache', action='store_true', help="recompute every section")
+    parser.add_argument('--output', default=REPORT_DIR, help="report directory")
+    parser.add_argument('--format', choices=['parquet', 'arrow'], default='parquet', help="table format")
+    args = parser.parse_args(argv)
+    
     print("🔬 ComparAI Advanced Analysis Report Generator")
     print("=" * 50)
     
-    # Load data
-    print("📊 Loading ComparAI data...")
-    df = load_comparai_data()
-    
-    if df is None:
+    print("📊 Running analysis stages (tables are saved as they are computed)...")
+    started = time.perf_counter()
+    try:
+        # The manifest is only written when every stage succeeded
+        with ReportWriter(args.output, args.format) as report:
+            values, runs = run_report_stages(args.workbook, not args.no_cache, args.cache_dir, args.workers, report)
+            finish_report(report, values)
+    except Exception as e:
+        print(f"Error loading data: {e}")
         print("❌ Failed to load data")
         return
     
-    print(f"✅ Loaded {len(df)} data points")
-    
-    # Calculate metrics
-    print("📈 Calculating advanced metrics...")
-    metrics = calculate_advanced_metrics(df)
-    print(f"✅ Calculated metrics for {len(metrics)} models")
-    
-    # Perform statistical analysis
-    print("🔍 Performing statistical analysis...")
-    analysis = perform_statistical_analysis(df, metrics)
-    print("✅ Statistical analysis complete")
+    for run in runs:
+        print(f"   {STAGE_STATUS_ICONS[run.status]} {run.name:<20} {run.status:<9} {run.seconds * 1000:8.1f} ms")
+    computed = sum(run.status == 'computed' for run in runs)
+    print(f"✅ {len(runs)} stages in {time.perf_counter() - started:.2f}s ({computed} recomputed)")
+    print(f"✅ {values['overall']['total_runs']} data points, {len(values['metrics'])} models, {len(values['insights'])} insights")
     
-    # Generate insights
-    print("💡 Generating insights...")
-    insights = generate_insights(metrics, analysis)
-    print(f"✅ Generated {len(insights)} insights")
-    
-    # Generate recommendations
-    print("🎯 Generating recommendations...")
-    recommendations = generate_recommendations(metrics, analysis)
-    print("✅ Recommendations generated")
+    # Save metrics as CSV
+    values['metrics'].to_csv('comparai_metrics_detailed.csv', index=False)
     
-    # Save report
-    print("💾 Saving analysis report...")
-    save_analysis_report(metrics, analysis, insights, recommendations)
+    print("✅ Analysis report saved:")
+    print(f"   - {args.output}/ ({MANIFEST_NAME} + {len(report.manifest['tables'])} {args.format} tables)")
+    print("   - comparai_metrics_detailed.csv")
     
     print("\n🎉 Advanced analysis complete!")
     print("\nKey findings:")
-    for insight in insights[:5]:  # Show first 5 insights
+    for insight in values['insights'][:5]:  # Show first 5 insights
         print(f"  {insight}")
 
 if __name__ == "__main__":
@@ -0,0 +1,297 @@
+"""Interchangeable chat backends for the AI insight tab.
+
+``COMPARIA_INSIGHT_BACKEND`` selects one of:
+
+- ``mistral`` (default): the Mistral API, using ``MISTRAL_API_KEY``.
+- ``openai``: any OpenAI-compatible ``/chat/completions`` endpoint at
+  ``COMPARIA_OPENAI_BASE_URL`` (e.g. scripts/stub_insight_server.py, vLLM, Ollama).
+- ``stub``: a deterministic in-process responder with injectable latency and
+  failures, for offline load tests and CI.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+
+import httpx
+
+from circuit_breaker import CircuitBreaker
+
+try:
+    from mistralai import Mistral
+except ImportError:  # optional: only needed for the mistral backend
+    Mistral = None
+
+BACKEND_ENV = "COMPARIA_INSIGHT_BACKEND"
+DEFAULT_BACKEND = "mistral"
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 60.0
+
+
+@dataclass
+class Usage:
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+
+
+class BackendError(RuntimeError):
+    """A failed completion; ``status_code`` mirrors the HTTP status so retry
+    logic can tell rate limits and server errors from client errors."""
+
+    def __init__(self, message: str, status_code: int | None = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class PooledClient(httpx.Client):
+    """Keep-alive client whose timeouts hold even when an SDK passes
+    ``timeout=None`` per request (mistralai does when ``timeout_ms`` is unset,
+    which would otherwise disable timeouts altogether)."""
+
+    def build_request(self, *args, timeout=httpx.USE_CLIENT_DEFAULT, **kwargs):
+        return super().build_request(*args, timeout=httpx.USE_CLIENT_DEFAULT if timeout is None else timeout, **kwargs)
+
+
+def pooled_http_client(
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    read_timeout: float = DEFAULT_READ_TIMEOUT,
+    max_connections: int = 10,
+) -> httpx.Client:
+    """One connection pool for all backend calls; TLS sessions are reused across reruns."""
+    return PooledClient(
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections, keepalive_expiry=60.0),
+    )
+
+
+class InsightBackend(ABC):
+    """Interface shared by all backends."""
+
+    name = "backend"
+
+    @abstractmethod
+    def complete(self, prompt: str, *, model: str, max_tokens: int, temperature: float) -> tuple[str, Usage | None]:
+        ...
+
+    @abstractmethod
+    def stream(
+        self,
+        prompt: str,
+        *,
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        on_usage: Callable[[Usage | None], None] | None = None,
+    ) -> Iterator[str]:
+        ...
+
+
+class MistralBackend(InsightBackend):
+    name = "Mistral AI"
+
+    def __init__(self, api_key: str, *, http_client: httpx.Client | None = None, timeout_ms: int | None = None) -> None:
+        if Mistral is None:
+            raise ImportError("The mistral backend needs the mistralai package")
+        self.client = Mistral(api_key=api_key, client=http_client, timeout_ms=timeout_ms)
+
+    def complete(self, prompt, *, model, max_tokens, temperature):
+        response = self.client.chat.complete(
+            model=model, messages=[{"role": "user", "content": prompt}], max_tokens=max_tokens, temperature=temperature
+        )
+        usage = response.usage
+        return response.choices[0].message.content, Usage(usage.prompt_tokens, usage.completion_tokens) if usage else None
+
+    def stream(self, prompt, *, model, max_tokens, temperature, on_usage=None):
+        usage = None
+        messages = [{"role": "user", "content": prompt}]
+        with self.client.chat.stream(model=model, messages=messages, max_tokens=max_tokens, temperature=temperature) as events:
+            for event in events:
+                # Usage arrives on the final chunk
+                if event.data.usage:
+                    usage = Usage(event.data.usage.prompt_tokens, event.data.usage.completion_tokens)
+                delta = event.data.choices[0].delta.content if event.data.choices else None
+                if isinstance(delta, str) and delta:
+                    yield delta
+        if on_usage is not None:
+            on_usage(usage)
+
+
+class OpenAICompatibleBackend(InsightBackend):
+    name = "OpenAI-compatible endpoint"
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        api_key: str | None = None,
+        model: str | None = None,
+        http_client: httpx.Client | None = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.http = http_client or pooled_http_client()
+
+    def _payload(self, prompt, model, max_tokens, temperature, stream):
+        return {
+            "model": self.model or model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": stream,
+        }
+
+    @staticmethod
+    def _raise_for_status(response: httpx.Response) -> None:
+        if response.is_error:
+            response.read()
+            raise BackendError(f"HTTP {response.status_code}: {response.text[:200]}", response.status_code)
+
+    @staticmethod
+    def _usage(data: dict | None) -> Usage | None:
+        return Usage(data.get("prompt_tokens"), data.get("completion_tokens")) if data else None
+
+    def complete(self, prompt, *, model, max_tokens, temperature):
+        response = self.http.post(
+            f"{self.base_url}/chat/completions",
+            json=self._payload(prompt, model, max_tokens, temperature, False),
+            headers=self.headers,
+        )
+        self._raise_for_status(response)
+        body = response.json()
+        return body["choices"][0]["message"]["content"], self._usage(body.get("usage"))
+
+    def stream(self, prompt, *, model, max_tokens, temperature, on_usage=None):
+        usage = None
+        with self.http.stream(
+            "POST",
+            f"{self.base_url}/chat/completions",
+            json=self._payload(prompt, model, max_tokens, temperature, True),
+            headers=self.headers,
+        ) as response:
+            self._raise_for_status(response)
+            for line in response.iter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                usage = self._usage(chunk.get("usage")) or usage
+                for choice in chunk.get("choices", []):
+                    delta = choice.get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+        if on_usage is not None:
+            on_usage(usage)
+
+
+class StubBackend(InsightBackend):
+    """Answers derived from the prompt hash, so the same prompt always gets the
+    same text. ``latency_ms`` ± ``jitter_ms`` is slept per call and a
+    ``failure_rate`` share of calls raise a 503 ``BackendError``."""
+
+    name = "Offline stub"
+
+    def __init__(self, *, latency_ms: float = 0.0, jitter_ms: float = 0.0, failure_rate: float = 0.0, seed: int = 0) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _delay_and_maybe_fail(self) -> None:
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+            fail = self._rng.random() < self.failure_rate
+        time.sleep(max(0.0, self.latency_ms + jitter) / 1000)
+        if fail:
+            raise BackendError("Stub backend injected failure", 503)
+
+    @staticmethod
+    def answer(prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        lines = [line.strip() for line in prompt.splitlines() if line.strip()]
+        return "\n".join(
+            [
+                f"### Offline insight `{digest[:8]}`",
+                "",
+                f"- The prompt had {len(prompt):,} characters over {len(lines)} non-empty lines.",
+                f"- First data line: {lines[min(1, len(lines) - 1)][:120] if lines else 'n/a'}",
+                "- This deterministic answer comes from the stub backend; no model was called.",
+            ]
+        )
+
+    def complete(self, prompt, *, model, max_tokens, temperature):
+        self._delay_and_maybe_fail()
+        text = self.answer(prompt)
+        return text, Usage(len(prompt) // 4, len(text) // 4)
+
+    def stream(self, prompt, *, model, max_tokens, temperature, on_usage=None):
+        self._delay_and_maybe_fail()
+        text = self.answer(prompt)
+        for word in text.split(" "):
+            yield word + " "
+        if on_usage is not None:
+            on_usage(Usage(len(prompt) // 4, len(text) // 4))
+
+
+class GuardedBackend(InsightBackend):
+    """Route every call to ``backend`` through a circuit breaker, so an outage
+    costs ``failure_threshold`` timeouts instead of one per request."""
+
+    def __init__(self, backend: InsightBackend, breaker: CircuitBreaker) -> None:
+        self.backend = backend
+        self.breaker = breaker
+        self.name = backend.name
+
+    def complete(self, prompt, *, model, max_tokens, temperature):
+        return self.breaker.call(self.backend.complete, prompt, model=model, max_tokens=max_tokens, temperature=temperature)
+
+    def stream(self, prompt, *, model, max_tokens, temperature, on_usage=None):
+        self.breaker.check()
+        chunks = self.backend.stream(prompt, model=model, max_tokens=max_tokens, temperature=temperature, on_usage=on_usage)
+        try:
+            for chunk in chunks:
+                yield chunk
+        except GeneratorExit:
+            # Abandoned by the consumer, which can only happen after a chunk
+            # arrived: the service answered, so this settles the probe too.
+            chunks.close()
+            self.breaker.record_success()
+            raise
+        except Exception as exc:
+            self.breaker.record_failure(exc)
+            raise
+        self.breaker.record_success()
+
+
+def backend_from_env(http_client: httpx.Client | None = None) -> InsightBackend | None:
+    """Backend chosen by ``COMPARIA_INSIGHT_BACKEND``; None when the mistral
+    backend has no API key configured."""
+    kind = os.getenv(BACKEND_ENV, DEFAULT_BACKEND).strip().lower()
+    if kind == "stub":
+        return StubBackend(
+            latency_ms=float(os.getenv("COMPARIA_STUB_LATENCY_MS", "0")),
+            jitter_ms=float(os.getenv("COMPARIA_STUB_JITTER_MS", "0")),
+            failure_rate=float(os.getenv("COMPARIA_STUB_FAILURE_RATE", "0")),
+        )
+    if kind == "openai":
+        return OpenAICompatibleBackend(
+            os.getenv("COMPARIA_OPENAI_BASE_URL", "http://127.0.0.1:8765/v1"),
+            api_key=os.getenv("COMPARIA_OPENAI_API_KEY"),
+            model=os.getenv("COMPARIA_OPENAI_MODEL"),
+            http_client=http_client,
+        )
+    if kind == "mistral":
+        api_key = os.getenv("MISTRAL_API_KEY")
+        return MistralBackend(api_key, http_client=http_client) if api_key else None
+    raise ValueError(f"Unknown {BACKEND_ENV} value: {kind!r}")
@@ -0,0 +1,123 @@
+"""Opt-in cProfile capture of dashboard reruns.
+
+Set ``COMPARIA_PROFILE=1`` to profile every rerun, or ``COMPARIA_PROFILE=query``
+to profile only sessions opened with ``?profile=1``. Each rerun writes a
+``.prof`` file (open with snakeviz, tuna or flameprof) and a JSON sidecar
+holding the session id, query parameters and widget state that produced it.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import pstats
+import re
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+PROFILE_ENV = "COMPARIA_PROFILE"
+PROFILE_DIR_ENV = "COMPARIA_PROFILE_DIR"
+DEFAULT_PROFILE_DIR = "profiles"
+TOP_FUNCTIONS = 15
+# Session-state keys owned by this module; kept out of the recorded widget state.
+STATE_PREFIX = "_profiling_"
+
+
+def profiling_requested() -> bool:
+    mode = os.getenv(PROFILE_ENV, "").strip().lower()
+    if mode in {"1", "true", "always"}:
+        return True
+    if mode == "query":
+        return st.query_params.get("profile") == "1"
+    return False
+
+
+def session_id() -> str:
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "local"
+
+
+def widget_state() -> dict:
+    return {
+        str(key): value
+        for key, value in st.session_state.to_dict().items()
+        if not str(key).startswith(STATE_PREFIX)
+    }
+
+
+def top_functions(profiler: cProfile.Profile, limit: int = TOP_FUNCTIONS) -> list[dict]:
+    stats = pstats.Stats(profiler).sort_stats("cumulative")
+    rows = []
+    for func in stats.fcn_list[:limit]:
+        filename, line, name = func
+        calls, _, own_time, cumulative_time, _ = stats.stats[func]
+        rows.append(
+            {
+                "function": f"{Path(filename).name}:{line}({name})",
+                "calls": calls,
+                "own_sec": round(own_time, 6),
+                "cumulative_sec": round(cumulative_time, 6),
+            }
+        )
+    return rows
+
+
+def write_profile(profiler: cProfile.Profile, app: str, started: float, duration: float) -> Path:
+    """Dump ``<app>-<time>-<session>-<rerun>.prof`` and its ``.json`` sidecar."""
+    directory = Path(os.getenv(PROFILE_DIR_ENV, DEFAULT_PROFILE_DIR))
+    directory.mkdir(parents=True, exist_ok=True)
+    rerun = st.session_state.get(f"{STATE_PREFIX}rerun", 0) + 1
+    st.session_state[f"{STATE_PREFIX}rerun"] = rerun
+    session = session_id()
+    stamp = datetime.fromtimestamp(started, timezone.utc)
+    tag = re.sub(r"\W", "", session)[:8]
+    path = directory / f"{app}-{stamp:%Y%m%dT%H%M%S}-{tag}-{rerun:04d}.prof"
+    profiler.dump_stats(path)
+    sidecar = {
+        "app": app,
+        "session_id": session,
+        "rerun": rerun,
+        "started": stamp.isoformat(timespec="seconds"),
+        "duration_sec": round(duration, 6),
+        "query_params": st.query_params.to_dict(),
+        "widget_state": widget_state(),
+        "top_functions": top_functions(profiler),
+    }
+    path.with_suffix(".json").write_text(json.dumps(sidecar, indent=2, default=str), encoding="utf-8")
+    return path
+
+
+def render_profile_download(path: Path) -> None:
+    with st.sidebar.expander("Profiler", expanded=False):
+        st.caption(f"Latest rerun: {path.name}")
+        st.download_button(
+            "Download latest profile (.prof)",
+            data=path.read_bytes(),
+            file_name=path.name,
+            mime="application/octet-stream",
+            on_click="ignore",
+            key=f"{STATE_PREFIX}download",
+        )
+
+
+def run_profiled(main: Callable[[], None], app: str) -> None:
+    """Call ``main``, under cProfile when profiling is switched on."""
+    if not profiling_requested():
+        main()
+        return
+
+    profiler = cProfile.Profile()
+    started = time.time()
+    clock = time.perf_counter()
+    try:
+        profiler.runcall(main)
+    finally:
+        # st.stop() and reruns raise through here; their partial profile is kept too.
+        path = write_profile(profiler, app, started, time.perf_counter() - clock)
+    render_profile_download(path)
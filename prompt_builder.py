@@ -0,0 +1,83 @@
+"""Compact, token-budgeted serialization of benchmark data for LLM prompts."""
+
+from __future__ import annotations
+
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+# Mistral and GPT-style tokenizers average close to four characters per token
+# on English text mixed with numbers; good enough for budgeting.
+CHARS_PER_TOKEN = 4
+DEFAULT_PROMPT_BUDGET = 1500
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def round_values(value, digits: int = 3):
+    """Round floats (and floats nested in dicts/lists) for compact output."""
+    if isinstance(value, dict):
+        return {str(key): round_values(item, digits) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [round_values(item, digits) for item in value]
+    if isinstance(value, (float, np.floating)):
+        return None if not np.isfinite(value) else float(round(float(value), digits))
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+
+def format_float(value: float, digits: int = 3) -> str:
+    """Fixed-point text for a float, rounded like ``round_values``; blank for NaN."""
+    return repr(round(float(value), digits)) if np.isfinite(value) else ""
+
+
+def compact_json(value, digits: int = 3) -> str:
+    return json.dumps(round_values(value, digits), separators=(",", ":"), ensure_ascii=False)
+
+
+def compact_table(df: pd.DataFrame, digits: int = 3) -> str:
+    """Pipe-separated columnar table: one header line, one line per row."""
+    columns = []
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_float_dtype(values):
+            columns.append([format_float(v, digits) for v in values.to_numpy(dtype=float)])
+        else:
+            columns.append(values.astype(str).tolist())
+    lines = ["|".join(map(str, df.columns))]
+    lines.extend("|".join(row) for row in zip(*columns))
+    return "\n".join(lines)
+
+
+def summarize_rows(rest: pd.DataFrame, digits: int = 3) -> str:
+    numeric = rest.select_dtypes("number")
+    means = ",".join(f"{col}={format_float(numeric[col].mean(), digits)}" for col in numeric.columns)
+    return f"+{len(rest)} more rows (means: {means})" if means else f"+{len(rest)} more rows"
+
+
+def budget_table(df: pd.DataFrame, max_tokens: int, digits: int = 3) -> tuple[str, int]:
+    """Serialize ``df`` (already sorted by relevance), keeping as many leading
+    rows as fit in ``max_tokens``. Dropped rows are summarized in one line.
+
+    Returns the text and the number of rows kept.
+    """
+    text = compact_table(df, digits)
+    if estimate_tokens(text) <= max_tokens or len(df) <= 1:
+        return text, len(df)
+
+    # Room for the summary line, then bisect on the row count: rows have
+    # near-constant width.
+    available = max_tokens - estimate_tokens(summarize_rows(df, digits)) - 1
+    low, high = 1, len(df) - 1
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(compact_table(df.head(middle), digits)) <= available:
+            low = middle
+        else:
+            high = middle - 1
+    return compact_table(df.head(low), digits) + "\n" + summarize_rows(df.iloc[low:], digits), low
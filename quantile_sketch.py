@@ -0,0 +1,111 @@
+"""Mergeable KLL quantile sketches for bounded-memory percentile estimates."""
+
+from __future__ import annotations
+
+import copy
+
+import numpy as np
+
+# Each compactor below the top holds 2/3 of the capacity of the one above it,
+# which is what keeps the retained size at O(k) instead of O(k log n).
+CAPACITY_DECAY = 2.0 / 3.0
+
+
+class KLLSketch:
+    """Karnin-Lang-Liberty sketch over a stream of floats.
+
+    Values are fed in batches with ``update``; sketches built on disjoint data
+    combine with ``merge`` without losing the rank-error guarantee, so per-group
+    sketches can be rolled up (model × category → model) without rescanning rows.
+    An estimate's rank is within ``rank_error`` (4 / k, 2% at the default k) of
+    the requested quantile with high probability.
+    """
+
+    def __init__(self, k: int = 200, *, seed: int | None = None) -> None:
+        if k < 8:
+            raise ValueError("k must be at least 8")
+        self.k = k
+        self.count = 0
+        self.min = np.nan
+        self.max = np.nan
+        self._levels: list[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def retained(self) -> int:
+        return sum(level.size for level in self._levels)
+
+    @property
+    def rank_error(self) -> float:
+        return 4.0 / self.k
+
+    def copy(self) -> KLLSketch:
+        return copy.deepcopy(self)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(2, int(np.ceil(self.k * CAPACITY_DECAY**depth)))
+
+    def update(self, values) -> KLLSketch:
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return self
+        self.count += values.size
+        self.min = np.fmin(self.min, values.min())
+        self.max = np.fmax(self.max, values.max())
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: KLLSketch) -> KLLSketch:
+        if other.count == 0:
+            return self
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for level, items in enumerate(other._levels):
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self.count += other.count
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        self._compress()
+        return self
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if items.size <= self._capacity(level):
+                level += 1
+                continue
+            grew = level + 1 == len(self._levels)
+            if grew:
+                self._levels.append(np.empty(0))
+            items = np.sort(items)
+            # An odd item stays behind so only whole pairs are compacted.
+            held = items.size % 2
+            promoted = items[held:][self._rng.integers(2) :: 2]
+            self._levels[level] = items[:held]
+            self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+            # A new top level shrinks every capacity below it, so re-check from the bottom.
+            level = 0 if grew else level + 1
+
+    def quantiles(self, qs) -> np.ndarray:
+        qs = np.clip(np.asarray(qs, dtype=float), 0.0, 1.0)
+        if self.count == 0:
+            return np.full(qs.shape, np.nan)
+        if len(self._levels) == 1:
+            return np.quantile(self._levels[0], qs)
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(level.size, 2.0**height) for height, level in enumerate(self._levels)])
+        order = np.argsort(items, kind="stable")
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, qs * cumulative[-1], side="left")
+        return items[np.minimum(positions, items.size - 1)]
+
+    def quantile(self, q: float) -> float:
+        return float(self.quantiles([q])[0])
@@ -0,0 +1,142 @@
+"""Analysis report on disk: a small JSON manifest plus one columnar table per section.
+
+Layout of a report directory::
+
+    manifest.json        summary, insights, recommendations, table index
+    metrics.parquet      one row per model
+    rankings.parquet     long format: ranking, rank, Model, value
+    ...
+
+Tables are written one at a time as the writer receives them, each file
+atomically. The manifest goes last, so readers never see it point at a table
+from an unfinished run.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+REPORT_DIR = "comparai_analysis_report"
+MANIFEST_NAME = "manifest.json"
+FORMAT_NAME = "comparai-report"
+FORMAT_VERSION = 1
+TABLE_SUFFIXES = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def _write_atomic(path: Path, write) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+class ReportWriter:
+    """Write a report section by section::
+
+        with ReportWriter("comparai_analysis_report") as report:
+            report.write_table("metrics", metrics)
+            report.set("insights", insights)
+    """
+
+    def __init__(self, directory: str | Path = REPORT_DIR, table_format: str = "parquet") -> None:
+        if table_format not in TABLE_SUFFIXES:
+            raise ValueError(f"table_format must be one of {sorted(TABLE_SUFFIXES)}")
+        self.directory = Path(directory)
+        self.table_format = table_format
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.manifest = {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "tables": {},
+        }
+
+    def write_table(self, name: str, df: pd.DataFrame) -> Path:
+        path = self.directory / f"{name}{TABLE_SUFFIXES[self.table_format]}"
+        # Parquet and Arrow need string column names and no object index
+        df = df.reset_index(drop=True)
+        df.columns = [str(col) for col in df.columns]
+        if self.table_format == "parquet":
+            _write_atomic(path, lambda tmp: df.to_parquet(tmp, index=False, compression="zstd"))
+        else:
+            _write_atomic(path, lambda tmp: df.to_feather(tmp, compression="lz4"))
+        self.manifest["tables"][name] = {"file": path.name, "rows": len(df), "columns": list(df.columns)}
+        return path
+
+    def set(self, key: str, value) -> None:
+        """Store a small JSON-serializable value in the manifest."""
+        self.manifest[key] = value
+
+    def close(self) -> Path:
+        path = self.directory / MANIFEST_NAME
+        text = json.dumps(self.manifest, indent=2, ensure_ascii=False, default=str)
+        _write_atomic(path, lambda tmp: tmp.write_text(text, encoding="utf-8"))
+        return path
+
+    def __enter__(self) -> ReportWriter:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # A failed run keeps the previous manifest
+        if exc_type is None:
+            self.close()
+
+
+@dataclass
+class AnalysisReport:
+    manifest: dict
+    tables: dict[str, pd.DataFrame] = field(default_factory=dict)
+
+    @property
+    def created(self) -> str:
+        return self.manifest.get("created", "")
+
+    @property
+    def summary(self) -> dict:
+        return self.manifest.get("summary", {})
+
+    @property
+    def insights(self) -> list[str]:
+        return self.manifest.get("insights", [])
+
+    @property
+    def recommendations(self) -> list[str]:
+        return self.manifest.get("recommendations", [])
+
+
+def read_table(path: str | Path) -> pd.DataFrame:
+    path = Path(path)
+    if path.suffix == ".arrow":
+        return pd.read_feather(path)
+    return pd.read_parquet(path)
+
+
+def load_analysis_report(path: str | Path = REPORT_DIR, tables: list[str] | None = None) -> AnalysisReport:
+    """Read a report directory (or its manifest). ``tables`` limits which
+    tables are loaded; None loads all of them.
+
+    A legacy ``comparai_analysis_report.json`` is accepted too; only its
+    metrics table is available then.
+    """
+    path = Path(path)
+    if path.suffix == ".json" and path.name != MANIFEST_NAME:
+        legacy = json.loads(path.read_text(encoding="utf-8"))
+        metrics = pd.DataFrame(legacy.pop("metrics", []))
+        legacy.pop("statistical_analysis", None)
+        legacy["created"] = legacy.pop("timestamp", "")
+        return AnalysisReport(legacy, {"metrics": metrics} if tables is None or "metrics" in tables else {})
+
+    directory = path.parent if path.name == MANIFEST_NAME else path
+    manifest = json.loads((directory / MANIFEST_NAME).read_text(encoding="utf-8"))
+    if manifest.get("format") != FORMAT_NAME or manifest.get("version", 0) > FORMAT_VERSION:
+        raise ValueError(f"{directory} is not a version {FORMAT_VERSION} {FORMAT_NAME} report")
+    names = manifest["tables"] if tables is None else [name for name in tables if name in manifest["tables"]]
+    return AnalysisReport(manifest, {name: read_table(directory / manifest["tables"][name]["file"]) for name in names})
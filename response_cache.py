@@ -0,0 +1,100 @@
+"""Disk-backed cache for LLM responses, with a TTL and an LRU size limit.
+
+Entries are keyed on (model, temperature, max_tokens, sha256(prompt)) and kept
+in a single SQLite file so they survive Streamlit reruns and app restarts.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+CACHE_DIR_ENV = "COMPARIA_CACHE_DIR"
+DEFAULT_CACHE_DIR = ".cache"
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 500
+
+
+class ResponseCache:
+    """SQLite-backed response store. Each call opens its own connection, so
+    one instance can be shared between the script thread and worker threads."""
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.path = Path(path) if path else Path(os.getenv(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)) / "llm_responses.sqlite"
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Resolved once: a cached instance outlives changes of working directory
+        self.path = self.path.resolve()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, model TEXT, response TEXT NOT NULL,"
+                " created REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def key(model: str, temperature: float, max_tokens: int, prompt: str) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        payload = json.dumps([model, float(temperature), int(max_tokens), prompt_hash])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Cached response, or None when missing or older than the TTL."""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def set(self, key: str, response: str, model: str = "") -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now),
+            )
+            conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+            # Least recently used entries go first once the table is over its limit.
+            conn.execute(
+                "DELETE FROM responses WHERE key NOT IN"
+                " (SELECT key FROM responses ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        """Number of entries still within the TTL."""
+        with self._connect() as conn:
+            cutoff = time.time() - self.ttl_seconds
+            return conn.execute("SELECT COUNT(*) FROM responses WHERE created >= ?", (cutoff,)).fetchone()[0]
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Time the workbook_io Excel readers on the benchmark workbook's Runs sheet.
+
+The default reader (plain ``pd.read_excel``) is the reference the others are
+compared with. Readers whose optional package is missing are listed as skipped. ``--rows`` repeats
+the sheet's rows into a temporary workbook to see how each reader scales::
+
+    python scripts/benchmark_excel_readers.py --rows 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from workbook_io import DEFAULT_READER, READERS, RUNS_SHEET, WORKBOOK_PATH, read_sheet  # noqa: E402
+
+REFERENCE = DEFAULT_READER
+
+
+def enlarged_copy(path: Path, sheet: str, n_rows: int, directory: Path) -> Path:
+    runs = pd.read_excel(path, sheet_name=sheet)
+    repeats = -(-n_rows // max(len(runs), 1))
+    target = directory / f"runs_{n_rows}.xlsx"
+    pd.concat([runs] * repeats, ignore_index=True).iloc[:n_rows].to_excel(target, sheet_name=sheet, index=False)
+    return target
+
+
+def time_reader(read: Callable[[], pd.DataFrame], repeat: int) -> tuple[list[float], pd.DataFrame]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        df = read()
+        timings.append(time.perf_counter() - started)
+    return timings, df
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workbook", type=Path, default=ROOT / WORKBOOK_PATH)
+    parser.add_argument("--sheet", default=RUNS_SHEET)
+    parser.add_argument("--rows", type=int, help="benchmark a copy of the sheet grown to this many rows")
+    parser.add_argument("--repeat", type=int, default=5, help="reads per reader; the median is reported")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="comparia-readers-") as tmp:
+        path = enlarged_copy(args.workbook, args.sheet, args.rows, Path(tmp)) if args.rows else args.workbook
+        readers: dict[str, Callable[[], pd.DataFrame]] = {}
+        for name, reader in READERS.items():
+            if reader.available:
+                readers[name] = lambda name=name: read_sheet(path, args.sheet, reader=name)
+            else:
+                print(f"{name}: skipped, needs the {reader.module} package")
+
+        results = {name: time_reader(read, args.repeat) for name, read in readers.items()}
+
+    reference_timings, reference = results[REFERENCE]
+    reference_median = statistics.median(reference_timings)
+    print(f"{path.name} [{args.sheet}]: {len(reference):,} rows x {reference.shape[1]} columns, {args.repeat} reads each")
+    print(f"{'reader':<22}{'median':>11}{'min':>11}{'speedup':>9}  same values")
+    for name, (timings, df) in results.items():
+        median = statistics.median(timings)
+        # Header labels may differ (calamine names a blank " " header "Unnamed: n")
+        same = df.shape == reference.shape and df.set_axis(reference.columns, axis=1).equals(reference)
+        print(
+            f"{name:<22}{median * 1000:>9.1f}ms{min(timings) * 1000:>9.1f}ms"
+            f"{reference_median / median:>8.1f}x  {'yes' if same else 'no'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""Time every dashboard.py pipeline stage on synthetic runs from 10^3 to 10^7 rows.
+
+Results are compared against a stored JSON baseline; any stage slower than the
+baseline by more than the threshold is reported and the script exits non-zero.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import dashboard  # noqa: E402
+from export_static_dashboard import DEFAULT_WEIGHTS, export_columns, pack_payload  # noqa: E402
+from synthetic_data import default_profiles, generate_runs  # noqa: E402
+
+DEFAULT_SIZES = (10**3, 10**4, 10**5, 10**6, 10**7)
+DEFAULT_BASELINE = ROOT / "benchmarks" / "pipeline_baseline.json"
+FIGURE_BUILDERS = (
+    "build_energy_bar",
+    "build_latency_bar",
+    "build_matrix",
+    "build_parallel_coordinates",
+    "build_ranking_chart",
+    "build_metric_heatmap",
+)
+# Stages faster than this are dominated by timer noise and never flagged.
+NOISE_FLOOR_SEC = 0.002
+
+Stage = tuple[str, Callable[[dict], None]]
+
+
+def synthetic_runs(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Roughly one model per thousand rows (6-2000) over 30 tasks; repetitions
+    make up the rest and the frame is trimmed to exactly ``n_rows``."""
+    n_models = int(np.clip(n_rows // 1000, 6, 2000))
+    n_tasks = 30
+    repetitions = math.ceil(n_rows / (n_models * n_tasks))
+    runs = generate_runs(default_profiles(n_models), n_tasks=n_tasks, repetitions=repetitions, seed=seed, categorical=False)
+    return runs.iloc[:n_rows]
+
+
+def pipeline_stages() -> list[Stage]:
+    """Ordered (name, step) pairs. Each step reads its inputs from and writes its
+    output to a shared state dict, so stages can be timed or traced one by one."""
+
+    def load(state: dict) -> None:
+        state["raw"], message = dashboard.load_raw_data()
+        if state["raw"] is None:
+            raise SystemExit(message)
+
+    def standardize(state: dict) -> None:
+        state["standardized"] = dashboard.standardize_raw_data(state["raw"])
+
+    def aggregate(state: dict) -> None:
+        state["aggregated"] = dashboard.aggregate_raw_data(state["raw"])
+
+    def task_matrix(state: dict) -> None:
+        state["task_matrix"] = dashboard.build_task_matrix(state["standardized"])
+
+    def prepare(state: dict) -> None:
+        state["metrics"] = dashboard.prepare_metrics(state["aggregated"], DEFAULT_WEIGHTS)
+
+    def prepare_task_normalized(state: dict) -> None:
+        dashboard.prepare_metrics(state["aggregated"], DEFAULT_WEIGHTS, task_matrix=state["task_matrix"])
+
+    def recommend(state: dict) -> None:
+        dashboard.build_recommendations(state["metrics"])
+
+    def figure(name: str) -> Callable[[dict], None]:
+        builder = getattr(dashboard, name)
+        return lambda state: builder(state["metrics"])
+
+    def export(state: dict) -> None:
+        pack_payload(export_columns(state["metrics"]))
+
+    return [
+        ("load_raw_data", load),
+        ("standardize_raw_data", standardize),
+        ("aggregate_raw_data", aggregate),
+        ("build_task_matrix", task_matrix),
+        ("prepare_metrics", prepare),
+        ("prepare_metrics[task-normalized]", prepare_task_normalized),
+        ("build_recommendations", recommend),
+        *((name, figure(name)) for name in FIGURE_BUILDERS),
+        ("export_payload", export),
+    ]
+
+
+def write_dataset(runs: pd.DataFrame, directory: Path) -> Path:
+    """Write runs where ``load_raw_data`` looks for them (relative to the cwd)."""
+    path = directory / dashboard.DATA_FILES[0]
+    runs.to_csv(path, index=False)
+    return path
+
+
+def time_pipeline(directory: Path, repeat: int) -> dict[str, float]:
+    """Best-of-``repeat`` wall time per stage, in seconds."""
+    stages = pipeline_stages()
+    best = {name: math.inf for name, _ in stages}
+    previous = Path.cwd()
+    os.chdir(directory)
+    try:
+        for _ in range(repeat):
+            state: dict = {}
+            for name, step in stages:
+                started = time.perf_counter()
+                step(state)
+                best[name] = min(best[name], time.perf_counter() - started)
+    finally:
+        os.chdir(previous)
+    return best
+
+
+def warm_up() -> None:
+    """One untraced pass pays for lazy imports (plotly templates, pandas
+    accessors) so they are not billed to the first measured stage."""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_dataset(synthetic_runs(1000), Path(tmp))
+        time_pipeline(Path(tmp), 1)
+
+
+def run_suite(sizes: list[int], repeat: int, seed: int) -> dict:
+    warm_up()
+    results: dict[str, dict[str, float]] = {}
+    for n_rows in sizes:
+        runs = synthetic_runs(n_rows, seed)
+        with tempfile.TemporaryDirectory() as tmp:
+            write_dataset(runs, Path(tmp))
+            del runs
+            timings = time_pipeline(Path(tmp), repeat)
+        results[str(n_rows)] = {name: round(seconds, 6) for name, seconds in timings.items()}
+        print(f"{n_rows:>10,} rows  total {sum(timings.values()):8.3f}s")
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float, noise_floor: float = NOISE_FLOOR_SEC) -> list[str]:
+    """Lines describing every stage slower than baseline × (1 + threshold) and
+    by at least ``noise_floor`` seconds."""
+    regressions = []
+    for size, stages in current["results"].items():
+        reference = baseline.get("results", {}).get(size, {})
+        for name, seconds in stages.items():
+            before = reference.get(name)
+            if before is None or seconds - before < noise_floor:
+                continue
+            if seconds > before * (1 + threshold):
+                label = f"{int(size):>10,} rows" if size.isdigit() else size
+                regressions.append(f"{label}  {name:<34} {before:9.4f}s -> {seconds:9.4f}s (+{seconds / before - 1:.0%})")
+    return regressions
+
+
+def print_table(report: dict) -> None:
+    sizes = list(report["results"])
+    names = list(report["results"][sizes[0]])
+    print(f"\n{'stage':<34}" + "".join(f"{int(size):>12,}" for size in sizes))
+    for name in names:
+        print(f"{name:<34}" + "".join(f"{report['results'][size][name]:12.4f}" for size in sizes))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Row counts to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; the fastest is kept")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.20, help="Allowed slowdown before a stage is flagged")
+    parser.add_argument("--save-baseline", action="store_true", help="Overwrite the baseline with this run")
+    parser.add_argument("--output", type=Path, help="Also write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    report = run_suite(args.sizes, args.repeat, args.seed)
+    print_table(report)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nSaved baseline to {args.baseline}")
+        return
+    if not args.baseline.exists():
+        raise SystemExit(f"\nNo baseline at {args.baseline}; rerun with --save-baseline to record one.")
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    uncovered = [size for size in report["results"] if size not in baseline.get("results", {})]
+    if uncovered:
+        print(f"\nNot in the baseline, not compared: {', '.join(f'{int(size):,}' for size in uncovered)} rows")
+    regressions = compare(report, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) regressed by more than {args.threshold:.0%}:")
+        print("\n".join(regressions))
+        raise SystemExit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""Wall time per Streamlit rerun for scripted interactions, driven headlessly via AppTest.
+
+dashboard.py is run against synthetic task-level CSVs and dashboard_comparai.py
+against synthetic aggregated CSVs with a growing number of models. Each
+interaction (filter change, weight slider, scoring mode) is applied and undone
+``--repeat`` times, and the cold first run is repeated as often with a fresh
+app; the median is reported and compared with a stored baseline in the same
+way as benchmark_pipeline.py, except that a slowdown must also exceed
+``--noise-floor`` seconds to be flagged. When anything is flagged the suite is
+timed once more and the faster median of the two runs is compared.
+
+Tabs are rendered client-side: every rerun already executes the body of every
+tab, so switching tabs costs nothing server-side and is not scripted here.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from benchmark_pipeline import compare, synthetic_runs, write_dataset  # noqa: E402
+from response_cache import CACHE_DIR_ENV  # noqa: E402
+from synthetic_data import default_profiles, generate_runs  # noqa: E402
+
+DEFAULT_BASELINE = ROOT / "benchmarks" / "rerun_baseline.json"
+DASHBOARD_SIZES = (10**3, 10**4, 10**5)
+COMPARAI_MODEL_COUNTS = (6, 60, 600)
+AGGREGATED_DATA_FILE = "comparai_metrics_detailed.csv"
+# Rerun medians drift by up to ~50% (a few hundred ms) between otherwise
+# identical runs on a busy machine, so only larger slowdowns are flagged.
+DEFAULT_REPEAT = 15
+DEFAULT_THRESHOLD = 0.50
+NOISE_FLOOR_SEC = 0.25
+
+# An interaction receives the app and the iteration number; even iterations
+# change a widget and odd ones restore it, so every rerun does real work.
+Interaction = Callable[[AppTest, int], None]
+
+
+def toggle_last_option(select) -> Callable[[AppTest, int], None]:
+    def interact(at: AppTest, iteration: int) -> None:
+        widget = select(at)
+        options = list(widget.options)
+        widget.set_value(options[:-1] if iteration % 2 == 0 and len(options) > 1 else options)
+
+    return interact
+
+
+def nudge_slider(key: str, changed: float, default: float) -> Interaction:
+    return lambda at, iteration: at.slider(key=key).set_value(changed if iteration % 2 == 0 else default)
+
+
+def cycle_radio(key: str) -> Interaction:
+    def interact(at: AppTest, iteration: int) -> None:
+        widget = at.radio(key=key)
+        widget.set_value(widget.options[(iteration + 1) % len(widget.options)])
+
+    return interact
+
+
+def noop(at: AppTest, iteration: int) -> None:
+    pass
+
+
+DASHBOARD_INTERACTIONS: dict[str, Interaction] = {
+    "rerun (no change)": noop,
+    "filter: model size": toggle_last_option(lambda at: at.multiselect(key="filter_size")),
+    "filter: models": toggle_last_option(lambda at: at.multiselect(key="filter_models")),
+    "filter: task categories": toggle_last_option(lambda at: at.multiselect(key="filter_categories")),
+    "slider: quality weight": nudge_slider("weight_quality", 0.80, 0.40),
+    "slider: energy weight": nudge_slider("weight_energy", 0.60, 0.25),
+    "slider: speed weight": nudge_slider("weight_speed", 0.60, 0.20),
+    "slider: cost weight": nudge_slider("weight_cost", 0.50, 0.15),
+    "radio: scoring mode": cycle_radio("scoring_mode"),
+}
+COMPARAI_INTERACTIONS: dict[str, Interaction] = {
+    "rerun (no change)": noop,
+    "filter: models": toggle_last_option(lambda at: at.multiselect(key="filter_models")),
+    "filter: task categories": toggle_last_option(lambda at: at.multiselect(key="filter_categories")),
+}
+
+
+def aggregated_metrics(n_models: int) -> pd.DataFrame:
+    """Per-model mean/std in the comparai_metrics_detailed.csv layout."""
+    runs = generate_runs(default_profiles(n_models), categorical=False)
+    metrics = runs.groupby(["Model", "Model_Size"], sort=False).agg(
+        **{
+            f"{metric}_{stat}": (metric, stat)
+            for metric in ("Quality_Score", "Latency_sec", "Energy_kWh", "CO2_kg", "Cost_EUR")
+            for stat in ("mean", "std")
+        }
+    )
+    return metrics.reset_index()
+
+
+def run_checked(at: AppTest) -> float:
+    gc.collect()
+    started = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - started
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return elapsed
+
+
+def time_app(script: Path, directory: Path, interactions: dict[str, Interaction], repeat: int, timeout: float) -> dict[str, float]:
+    """Median seconds per rerun for each interaction; each first run of the app
+    is timed with cold caches, including a fresh LLM response cache in ``directory``."""
+    previous = Path.cwd()
+    previous_cache_dir = os.environ.get(CACHE_DIR_ENV)
+    os.chdir(directory)
+    try:
+        cold = []
+        for iteration in range(repeat):
+            os.environ[CACHE_DIR_ENV] = str(directory / f".cache-{iteration}")
+            st.cache_data.clear()
+            st.cache_resource.clear()
+            at = AppTest.from_file(str(script), default_timeout=timeout)
+            cold.append(run_checked(at))
+        timings = {"first run (cold cache)": statistics.median(cold)}
+        for name, interact in interactions.items():
+            samples = []
+            for iteration in range(repeat):
+                interact(at, iteration)
+                samples.append(run_checked(at))
+            timings[name] = statistics.median(samples)
+    finally:
+        os.chdir(previous)
+        if previous_cache_dir is None:
+            os.environ.pop(CACHE_DIR_ENV, None)
+        else:
+            os.environ[CACHE_DIR_ENV] = previous_cache_dir
+    return timings
+
+
+def run_suite(dashboard_sizes: list[int], comparai_models: list[int], repeat: int, timeout: float) -> dict:
+    results: dict[str, dict[str, float]] = {}
+    for n_rows in dashboard_sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            write_dataset(synthetic_runs(n_rows), Path(tmp))
+            timings = time_app(ROOT / "dashboard.py", Path(tmp), DASHBOARD_INTERACTIONS, repeat, timeout)
+        label = f"dashboard.py {n_rows:,} rows"
+        results[label] = {name: round(seconds, 6) for name, seconds in timings.items()}
+        print(f"{label:<40} median rerun {statistics.median(timings.values()):.3f}s")
+    for n_models in comparai_models:
+        with tempfile.TemporaryDirectory() as tmp:
+            aggregated_metrics(n_models).to_csv(Path(tmp) / AGGREGATED_DATA_FILE, index=False)
+            timings = time_app(ROOT / "dashboard_comparai.py", Path(tmp), COMPARAI_INTERACTIONS, repeat, timeout)
+        label = f"dashboard_comparai.py {n_models:,} models"
+        results[label] = {name: round(seconds, 6) for name, seconds in timings.items()}
+        print(f"{label:<40} median rerun {statistics.median(timings.values()):.3f}s")
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "streamlit": st.__version__,
+            "pandas": pd.__version__,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def fastest_of(first: dict, second: dict) -> dict:
+    """``first`` with each median replaced by the lower of the two runs'."""
+    results = {
+        label: {name: min(seconds, second["results"][label][name]) for name, seconds in timings.items()}
+        for label, timings in first["results"].items()
+    }
+    return {**first, "results": results}
+
+
+def print_report(report: dict) -> None:
+    for label, timings in report["results"].items():
+        print(f"\n{label}")
+        for name, seconds in timings.items():
+            print(f"  {name:<32}{seconds:10.3f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(DASHBOARD_SIZES), help="dashboard.py row counts")
+    parser.add_argument("--models", type=int, nargs="*", default=list(COMPARAI_MODEL_COUNTS), help="dashboard_comparai.py model counts")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Reruns per interaction; the median is kept")
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds allowed per rerun")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown before an interaction is flagged"
+    )
+    parser.add_argument(
+        "--noise-floor", type=float, default=NOISE_FLOOR_SEC, help="Slowdowns smaller than this many seconds are never flagged"
+    )
+    parser.add_argument("--save-baseline", action="store_true", help="Overwrite the baseline with this run")
+    parser.add_argument("--output", type=Path, help="Also write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    report = run_suite(args.sizes, args.models, args.repeat, args.timeout)
+    print_report(report)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nSaved baseline to {args.baseline}")
+        return
+    if not args.baseline.exists():
+        raise SystemExit(f"\nNo baseline at {args.baseline}; rerun with --save-baseline to record one.")
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(report, baseline, args.threshold, args.noise_floor)
+    if regressions:
+        # A slow stretch on the machine can outlast a whole median; only
+        # interactions that are slow in a second run too are reported.
+        print(f"\n{len(regressions)} interaction(s) over the threshold; timing the suite again")
+        report = fastest_of(report, run_suite(args.sizes, args.models, args.repeat, args.timeout))
+        regressions = compare(report, baseline, args.threshold, args.noise_floor)
+    if regressions:
+        print(f"\n{len(regressions)} interaction(s) regressed by more than {args.threshold:.0%} and {args.noise_floor * 1000:.0f} ms:")
+        print("\n".join(regressions))
+        raise SystemExit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,80 +1,320 @@
 #!/usr/bin/env python3
-"""Regenerate comparia_dashboard.html embedded data from dashboard.py scoring."""
+"""Export dashboard.py scoring as the data file of the static comparia_dashboard.html.
+
+The page is a constant shell that fetches data/records.json after first
+paint. The file is columnar: model names and sizes as JSON arrays, every
+numeric column as base64 float32 that the page scores with a typed-array
+loop. Next to it go gzip (and, when the brotli package is installed, brotli)
+precompressed copies for servers that serve them as-is (nginx gzip_static /
+brotli_static, most CDNs), plus data/records.js for pages opened from file://.
+
+The export is keyed on the dataset file, the weights and the scoring code
+(the dashboard.py functions prepare_metrics reaches, not the whole file).
+When the key matches the one stored with data/ nothing is rebuilt, and the
+copies under docs/ and the root index.html are only rewritten when their
+content differs.
+"""
 
 from __future__ import annotations
 
+import argparse
+import base64
+import gzip
+import hashlib
+import inspect
 import json
-import re
+import os
 import sys
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from types import CodeType
 
+import numpy as np
 import pandas as pd
 
+try:
+    import brotli
+except ImportError:  # optional: .br copies are skipped without it
+    brotli = None
+
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
-from dashboard import load_aggregated_data, prepare_metrics  # noqa: E402
+import dashboard  # noqa: E402
+from dashboard import (  # noqa: E402
+    AGGREGATED_DATA_FILE,
+    REPORT_DIR,
+    SIZE_ORDER,
+    aggregated_data_path,
+    load_aggregated_data,
+    prepare_metrics,
+)
+from stage_dag import file_fingerprint  # noqa: E402
 
 DEFAULT_WEIGHTS = {"quality": 0.40, "energy": 0.25, "cost": 0.15, "speed": 0.20}
+DATA_DIR = "data"
+DATA_FILE = "records.json"
+SCRIPT_FILE = "records.js"
+# Build key of the files in data/, written after them
+KEY_FILE = ".export-key"
+HTML_SHELL = "comparia_dashboard.html"
+HTML_COPIES = ("docs/index.html", "index.html")
+# Bump together with PAYLOAD_VERSION in comparia_dashboard.html
+PAYLOAD_VERSION = 3
+STRING_COLUMNS = ("Model", "Model_Size")
+# Table columns shipped with a pre-sorted index. The score depends on the
+# page's weight sliders, so the page sorts that one itself.
+SORTED_COLUMNS = (
+    "Rank",
+    "Model",
+    "Model_Size",
+    "Quality_Score_mean",
+    "Latency_sec_mean",
+    "Energy_kWh_mean",
+    "CO2_kg_mean",
+    "FootprintIndex",
+)
+
+
+# Exported column -> prepare_metrics column, in page order
+FLOAT_COLUMNS = {
+    "Quality_Score_mean": "Quality_Score_mean",
+    "Latency_sec_mean": "Latency_sec_mean",
+    "Energy_kWh_mean": "Energy_kWh_mean",
+    "CO2_kg_mean": "CO2_kg_mean",
+    "Cost_EUR_mean": "Cost_EUR_mean",
+    "QualityEfficiency": "Quality_Efficiency",
+    "SpeedEfficiency": "Speed_Efficiency",
+    "QualityNorm": "Quality_norm",
+    "EnergyEffNorm": "EnergyEfficiency_norm",
+    "SpeedEffNorm": "SpeedEfficiency_norm",
+    "LowEnergyNorm": "LowEnergy_norm",
+    "LowCO2Norm": "LowCO2_norm",
+    "LowLatencyNorm": "LowLatency_norm",
+    "FootprintIndex": "Footprint_Index",
+    "SustainabilityScore": "Sustainability_Score",
+}
+
+
+def export_columns(metrics: pd.DataFrame) -> pd.DataFrame:
+    """One row per model, best score first, with the page's column names."""
+    ranked = metrics.sort_values("Sustainability_Score", ascending=False, kind="stable")
+    columns = pd.DataFrame({"Model": ranked["Model"].astype(str), "Model_Size": ranked["Model_Size"].astype(str)})
+    for name, source in FLOAT_COLUMNS.items():
+        if source in ranked.columns:
+            values = pd.to_numeric(ranked[source], errors="coerce").fillna(0.0)
+        else:
+            values = pd.Series(0.0, index=ranked.index)
+        columns[name] = values.to_numpy(dtype="float64")
+    columns["Rank"] = np.arange(1, len(columns) + 1, dtype="float64")
+    return columns.reset_index(drop=True)
+
+
+def sort_index(values: pd.Series) -> np.ndarray:
+    """Row positions in ascending order, ties in export order."""
+    if values.name == "Model_Size":
+        values = pd.Series(pd.Categorical(values, categories=SIZE_ORDER).codes)
+    return np.argsort(values.to_numpy(), kind="stable")
+
+
+def pack_payload(columns: pd.DataFrame) -> dict:
+    """Strings as JSON arrays, numbers as base64 little-endian float32 columns.
+
+    The page decodes each numeric column straight into a Float32Array, and
+    each ``order`` entry (uint32 row positions) into a Uint32Array, so that
+    sorting the table is a matter of walking another index.
+    """
+    numeric = [name for name in columns.columns if name not in STRING_COLUMNS]
+    return {
+        "version": PAYLOAD_VERSION,
+        "count": len(columns),
+        "strings": {name: columns[name].tolist() for name in STRING_COLUMNS},
+        "float32": {
+            name: base64.b64encode(columns[name].to_numpy(dtype="<f4").tobytes()).decode("ascii") for name in numeric
+        },
+        "order": {
+            name: base64.b64encode(sort_index(columns[name]).astype("<u4").tobytes()).decode("ascii")
+            for name in SORTED_COLUMNS
+        },
+    }
+
+
+def write_atomic(path: Path, payload: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(payload)
+    os.replace(tmp, path)
+
+
+def sync_file(source: Path, target: Path) -> bool:
+    """Copy ``source`` over ``target`` unless they already match; True when written."""
+    content = source.read_bytes()
+    if target.exists() and target.stat().st_size == len(content) and target.read_bytes() == content:
+        return False
+    target.parent.mkdir(parents=True, exist_ok=True)
+    write_atomic(target, content)
+    return True
+
+
+def _global_names(code: CodeType) -> set[str]:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, CodeType):  # nested functions and lambdas
+            names |= _global_names(const)
+    return names
+
+
+def scoring_code_fingerprint(*roots) -> str:
+    """Hash of ``roots``, every dashboard.py function they reach and the module
+    constants those read, so UI-only edits to dashboard.py keep the key."""
+    sources: dict[str, str] = {}
+    stack = list(roots)
+    while stack:
+        fn = stack.pop()
+        if fn.__name__ in sources:
+            continue
+        sources[fn.__name__] = inspect.getsource(fn)
+        for name in _global_names(fn.__code__):
+            value = getattr(dashboard, name, None)
+            if inspect.isfunction(value) and value.__module__ == dashboard.__name__:
+                stack.append(value)
+            elif isinstance(value, (str, int, float, tuple, list, dict, frozenset)):
+                sources.setdefault(f"const {name}", repr(value))
+    return hashlib.sha256("\0".join(sources[name] for name in sorted(sources)).encode("utf-8")).hexdigest()
+
+
+def export_key(data_path: Path, weights: dict[str, float]) -> str:
+    """Fingerprint of everything the data files depend on."""
+    parts = [
+        f"payload-v{PAYLOAD_VERSION}",
+        f"brotli={brotli is not None}",
+        json.dumps(weights, sort_keys=True),
+        file_fingerprint(data_path),
+        scoring_code_fingerprint(load_aggregated_data, prepare_metrics),
+        file_fingerprint(__file__),
+    ]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def read_key(data_dir: Path) -> str:
+    try:
+        return (data_dir / KEY_FILE).read_text(encoding="utf-8").strip()
+    except OSError:
+        return ""
+
+
+def encode_data_files(payload: dict) -> dict[str, bytes]:
+    """records.json, its precompressed copies and the file:// fallback script."""
+    payload = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    files = {
+        DATA_FILE: payload,
+        DATA_FILE + ".gz": gzip.compress(payload, compresslevel=9, mtime=0),
+        SCRIPT_FILE: b"window.COMPARIA_RECORDS = " + payload + b";\n",
+    }
+    if brotli is not None:
+        files[DATA_FILE + ".br"] = brotli.compress(payload, quality=11)
+    return files
+
+
+def write_data_files(data_dir: Path, files: dict[str, bytes], key: str) -> list[Path]:
+    data_dir.mkdir(parents=True, exist_ok=True)
+    # Drop the key first: an interrupted write is rebuilt on the next run
+    (data_dir / KEY_FILE).unlink(missing_ok=True)
+    if DATA_FILE + ".br" not in files:
+        # Do not leave a stale brotli copy next to fresh data
+        (data_dir / (DATA_FILE + ".br")).unlink(missing_ok=True)
+    for name, content in files.items():
+        write_atomic(data_dir / name, content)
+    write_atomic(data_dir / KEY_FILE, key.encode("utf-8") + b"\n")
+    return [data_dir / name for name in files]
+
+
+def mirror_data_files(source_dir: Path, target_dir: Path) -> list[Path]:
+    """Bring ``target_dir`` in line with ``source_dir``; returns the files rewritten."""
+    names = {DATA_FILE, DATA_FILE + ".gz", DATA_FILE + ".br", SCRIPT_FILE}
+    changed = []
+    for name in sorted(names):
+        source, target = source_dir / name, target_dir / name
+        if not source.exists():
+            target.unlink(missing_ok=True)
+        elif sync_file(source, target):
+            changed.append(target)
+    # The key goes last, as in write_data_files
+    sync_file(source_dir / KEY_FILE, target_dir / KEY_FILE)
+    return changed
+
+
+def parse_weight(text: str) -> tuple[str, float]:
+    name, sep, value = text.partition("=")
+    if not sep or name not in DEFAULT_WEIGHTS:
+        raise argparse.ArgumentTypeError(f"expected one of {', '.join(DEFAULT_WEIGHTS)}=VALUE, got {text!r}")
+    try:
+        return name, float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{value!r} is not a number") from None
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--weight", type=parse_weight, action="append", default=[], metavar="NAME=VALUE",
+                        help=f"override a scoring weight (defaults: {DEFAULT_WEIGHTS})")
+    parser.add_argument("--force", action="store_true", help="rebuild even when the build key matches")
+    args = parser.parse_args(argv)
+    weights = {**DEFAULT_WEIGHTS, **dict(args.weight)}
+
+    timings: dict[str, float] = {}
+
+    @contextmanager
+    def phase(name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings[name] = time.perf_counter() - started
+
+    html_source = ROOT / HTML_SHELL
+    data_dir = ROOT / DATA_DIR
+    with phase("check shell"):
+        shell = html_source.read_text(encoding="utf-8")
+        if f"{DATA_DIR}/{DATA_FILE}" not in shell:
+            raise RuntimeError(f"{html_source} does not load {DATA_DIR}/{DATA_FILE}")
+        if f"PAYLOAD_VERSION = {PAYLOAD_VERSION};" not in shell:
+            raise RuntimeError(f"{html_source} does not read payload version {PAYLOAD_VERSION}")
+
+    with phase("fingerprint"):
+        data_path = aggregated_data_path()
+        if data_path is None:
+            raise SystemExit(f"Neither {REPORT_DIR}/ nor {AGGREGATED_DATA_FILE} found")
+        key = export_key(data_path, weights)
+        up_to_date = not args.force and read_key(data_dir) == key and (data_dir / DATA_FILE).exists()
+
+    if up_to_date:
+        print(f"{DATA_DIR}/ is up to date (key {key[:12]})")
+    else:
+        with phase("load"):
+            aggregated_df, message = load_aggregated_data()
+            if aggregated_df is None:
+                raise SystemExit(message)
+        with phase("score"):
+            metrics = prepare_metrics(aggregated_df, weights)
+            columns = export_columns(metrics)
+        with phase("encode"):
+            files = encode_data_files(pack_payload(columns))
+        with phase("write"):
+            written = write_data_files(data_dir, files, key)
+        sizes = ", ".join(f"{path.name} {path.stat().st_size:,} B" for path in written)
+        print(f"Wrote {DATA_DIR}/ ({len(columns)} models): {sizes}")
+        top = columns.iloc[0]
+        print(f"Top model: {top['Model']} (score {top['SustainabilityScore']:.4f})")
 
+    # The shell is static: its copies and docs/data follow the sources when they differ
+    with phase("sync copies"):
+        changed = [target for target in HTML_COPIES if sync_file(html_source, ROOT / target)]
+        changed += [str(path.relative_to(ROOT)) for path in mirror_data_files(data_dir, ROOT / "docs" / DATA_DIR)]
+    print(f"Updated: {', '.join(map(str, changed))}" if changed else "Copies unchanged")
 
-def export_records(metrics: pd.DataFrame) -> list[dict]:
-    ranked = metrics.copy()
-    ranked["Rank"] = ranked["Sustainability_Score"].rank(ascending=False, method="first").astype(int)
-    records: list[dict] = []
-    for _, row in ranked.sort_values("Sustainability_Score", ascending=False).iterrows():
-        records.append(
-            {
-                "Model": row["Model"],
-                "Model_Size": str(row["Model_Size"]),
-                "Quality_Score_mean": round(float(row["Quality_Score_mean"]), 3),
-                "Latency_sec_mean": round(float(row["Latency_sec_mean"]), 3),
-                "Energy_kWh_mean": round(float(row["Energy_kWh_mean"]), 3),
-                "CO2_kg_mean": round(float(row["CO2_kg_mean"]), 3),
-                "Cost_EUR_mean": round(float(row.get("Cost_EUR_mean", 0) or 0), 4),
-                "QualityEfficiency": round(float(row["Quality_Efficiency"]), 4),
-                "SpeedEfficiency": round(float(row["Speed_Efficiency"]), 4),
-                "QualityNorm": round(float(row["Quality_norm"]), 4),
-                "EnergyEffNorm": round(float(row["EnergyEfficiency_norm"]), 4),
-                "SpeedEffNorm": round(float(row["SpeedEfficiency_norm"]), 4),
-                "LowEnergyNorm": round(float(row["LowEnergy_norm"]), 4),
-                "LowCO2Norm": round(float(row["LowCO2_norm"]), 4),
-                "LowLatencyNorm": round(float(row["LowLatency_norm"]), 4),
-                "FootprintIndex": round(float(row["Footprint_Index"]), 4),
-                "SustainabilityScore": round(float(row["Sustainability_Score"]), 4),
-                "Rank": int(row["Rank"]),
-            }
-        )
-    return records
-
-
-def patch_html(html_path: Path, records: list[dict]) -> str:
-    content = html_path.read_text(encoding="utf-8")
-    payload = json.dumps(records, separators=(",", ":"))
-    updated, count = re.subn(r"const data = \[.*?\];", f"const data = {payload};", content, count=1, flags=re.S)
-    if count != 1:
-        raise RuntimeError(f"Could not patch embedded data in {html_path}")
-    return updated
-
-
-def main() -> None:
-    aggregated_df, message = load_aggregated_data()
-    if aggregated_df is None:
-        raise SystemExit(message)
-
-    metrics = prepare_metrics(aggregated_df, DEFAULT_WEIGHTS)
-    records = export_records(metrics)
-
-    html_source = ROOT / "comparia_dashboard.html"
-    patched = patch_html(html_source, records)
-    html_source.write_text(patched, encoding="utf-8")
-
-    docs_index = ROOT / "docs" / "index.html"
-    docs_index.write_text(patched, encoding="utf-8")
-    (ROOT / "index.html").write_text(patched, encoding="utf-8")
-
-    print(f"Updated {html_source.name} and docs/index.html ({len(records)} models)")
-    print(f"Top model: {records[0]['Model']} (score {records[0]['SustainabilityScore']})")
+    for name, seconds in timings.items():
+        print(f"  {name:<14}{seconds * 1000:9.1f} ms")
 
 
 if __name__ == "__main__":
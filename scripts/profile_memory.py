@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Peak and retained memory per dashboard.py pipeline stage, traced with tracemalloc.
+
+Runs the same stages as benchmark_pipeline.py against a task-level CSV (or
+synthetic runs) and writes a JSON report that can be compared with an
+earlier one, so a memory-hungry change shows up before it reaches the host.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from benchmark_pipeline import pipeline_stages, synthetic_runs, warm_up, write_dataset  # noqa: E402
+from dashboard import DATA_FILES  # noqa: E402
+
+TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:,.1f} {unit}"
+        size /= 1024
+    return f"{size:,.1f} GiB"
+
+
+def allocation_sites(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, top: int) -> list[dict]:
+    """Source lines that grew the most across a stage, i.e. what it kept alive."""
+    sites = []
+    for stat in after.compare_to(before, "lineno")[:top]:
+        if stat.size_diff <= 0:
+            break
+        frame = stat.traceback[0]
+        path = Path(frame.filename)
+        sites.append(
+            {
+                "site": f"{path.relative_to(ROOT) if path.is_relative_to(ROOT) else path}:{frame.lineno}",
+                "size_bytes": stat.size_diff,
+                "count": stat.count_diff,
+            }
+        )
+    return sites
+
+
+def profile_pipeline(directory: Path, top: int, frames: int) -> dict[str, dict]:
+    """Trace each stage separately. Peak is the high-water mark above the bytes
+    already held when the stage started; retained is what it leaves behind."""
+    stages = pipeline_stages()
+    results: dict[str, dict] = {}
+    previous = Path.cwd()
+    os.chdir(directory)
+    tracemalloc.start(frames)
+    try:
+        state: dict = {}
+        for name, step in stages:
+            before = tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+            tracemalloc.reset_peak()
+            start_bytes, _ = tracemalloc.get_traced_memory()
+            started = time.perf_counter()
+            step(state)
+            duration = time.perf_counter() - started
+            end_bytes, peak_bytes = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+            results[name] = {
+                "peak_bytes": peak_bytes - start_bytes,
+                "retained_bytes": end_bytes - start_bytes,
+                "duration_sec": round(duration, 6),
+                "top_sites": allocation_sites(before, after, top),
+            }
+            print(f"{name:<34} peak {format_bytes(peak_bytes - start_bytes):>12}  retained {format_bytes(end_bytes - start_bytes):>12}")
+    finally:
+        tracemalloc.stop()
+        os.chdir(previous)
+    return results
+
+
+def compare(current: dict, reference: dict) -> None:
+    print(f"\n{'stage':<34}{'peak before':>14}{'peak now':>14}{'change':>9}")
+    for name, stats in current["stages"].items():
+        before = reference.get("stages", {}).get(name)
+        if before is None:
+            print(f"{name:<34}{'-':>14}{format_bytes(stats['peak_bytes']):>14}")
+            continue
+        change = stats["peak_bytes"] / before["peak_bytes"] - 1 if before["peak_bytes"] else 0.0
+        print(f"{name:<34}{format_bytes(before['peak_bytes']):>14}{format_bytes(stats['peak_bytes']):>14}{change:>+9.0%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--data", type=Path, help=f"Task-level CSV in the {DATA_FILES[0]} format")
+    source.add_argument("--rows", type=int, default=100_000, help="Synthetic row count when --data is not given")
+    parser.add_argument("--top", type=int, default=5, help="Allocation sites to keep per stage")
+    parser.add_argument("--frames", type=int, default=1, help="Traceback depth recorded by tracemalloc")
+    parser.add_argument("--output", type=Path, default=Path("memory_profile.json"))
+    parser.add_argument("--compare", type=Path, help="Earlier report to compare peaks against")
+    args = parser.parse_args()
+    if args.data and not args.data.is_file():
+        parser.error(f"{args.data} not found")
+
+    warm_up()
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.data:
+            os.symlink(args.data.resolve(), Path(tmp) / DATA_FILES[0])
+            dataset = {"path": str(args.data)}
+        else:
+            write_dataset(synthetic_runs(args.rows), Path(tmp))
+            dataset = {"rows": args.rows}
+        stages = profile_pipeline(Path(tmp), args.top, args.frames)
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+        },
+        "dataset": dataset,
+        "stages": stages,
+    }
+    args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    worst = max(stages, key=lambda name: stages[name]["peak_bytes"])
+    print(f"\nHighest peak: {worst} ({format_bytes(stages[worst]['peak_bytes'])}); report written to {args.output}")
+    if args.compare:
+        compare(report, json.loads(args.compare.read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
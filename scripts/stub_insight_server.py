@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Offline OpenAI-compatible chat server for load-testing the AI insight tab.
+
+Serves ``POST /v1/chat/completions`` (plain and ``"stream": true`` SSE) with
+the deterministic answers of ``insight_backends.StubBackend``. Point the
+dashboard at it with::
+
+    COMPARIA_INSIGHT_BACKEND=openai COMPARIA_OPENAI_BASE_URL=http://127.0.0.1:8765/v1
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from insight_backends import BackendError, StubBackend  # noqa: E402
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    backend: StubBackend
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler signature
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_json(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_event(self, data: str) -> None:
+        chunk = f"data: {data}\n\n".encode("utf-8")
+        self.wfile.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+            self.send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            prompt = "\n".join(str(message.get("content", "")) for message in request["messages"])
+        except (ValueError, KeyError, TypeError) as exc:
+            self.send_json(400, {"error": {"message": f"Bad request: {exc}"}})
+            return
+
+        model = request.get("model") or "stub"
+        try:
+            text, usage = self.backend.complete(prompt, model=model, max_tokens=0, temperature=0.0)
+        except BackendError as exc:
+            self.send_json(exc.status_code or 500, {"error": {"message": str(exc)}})
+            return
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        usage_body = {"prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens}
+        if not request.get("stream"):
+            self.send_json(
+                200,
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                    "usage": usage_body,
+                },
+            )
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        base = {"id": completion_id, "object": "chat.completion.chunk", "model": model}
+        for word in text.split(" "):
+            delta = {"index": 0, "delta": {"content": word + " "}, "finish_reason": None}
+            self.send_event(json.dumps({**base, "choices": [delta]}))
+            if self.server.token_delay:
+                time.sleep(self.server.token_delay)
+        self.send_event(json.dumps({**base, "choices": [], "usage": usage_body}))
+        self.send_event("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay before each answer")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="uniform ± jitter on the delay")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of requests answered with HTTP 503")
+    parser.add_argument("--token-delay-ms", type=float, default=0.0, help="delay between streamed words")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    StubHandler.backend = StubBackend(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, failure_rate=args.failure_rate, seed=args.seed
+    )
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    server.daemon_threads = True
+    server.verbose = args.verbose
+    server.token_delay = args.token_delay_ms / 1000
+    print(f"Stub insight server on http://{args.host}:{args.port}/v1 (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
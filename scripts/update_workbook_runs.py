@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Merge new benchmark runs into the Runs sheet of the benchmark workbook.
+
+The input is a CSV (or .xlsx) whose columns use the Runs sheet headers and
+include the key columns "Task ID" and "Model". Matching rows are updated,
+new keys are appended; the other sheets are not rewritten::
+
+    python scripts/update_workbook_runs.py new_runs.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from workbook_io import RUNS_SHEET, WORKBOOK_PATH, update_runs  # noqa: E402
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("runs", type=Path, help="CSV or .xlsx file with the new runs")
+    parser.add_argument("--workbook", type=Path, default=ROOT / WORKBOOK_PATH)
+    parser.add_argument("--sheet", default=RUNS_SHEET)
+    parser.add_argument("--output", type=Path, help="write here instead of updating the workbook in place")
+    args = parser.parse_args(argv)
+
+    runs = pd.read_excel(args.runs) if args.runs.suffix == ".xlsx" else pd.read_csv(args.runs)
+    report = update_runs(runs, args.workbook, sheet=args.sheet, output=args.output)
+    print(f"{report.touched} row(s) touched. {report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Stage DAG with fingerprint caching: a stage runs again only when its code or
+the fingerprint of one of its inputs changed, and stages whose inputs are
+ready run in parallel.
+
+A stage's cache key covers its name, version, the source of its function, its
+``depends`` and its input fingerprints. ``depends`` lists what else the
+function reads: helpers it calls (hashed by source) and module-level constants
+(hashed by value), so editing one helper only invalidates the stages that
+list it. Outputs are fingerprinted as well, so a recomputed stage that
+produces an identical result leaves everything downstream cached. ``columns``
+narrows a DataFrame input to the columns the stage reads, both for the
+fingerprint and for the value passed in, so unrelated column edits do not
+invalidate it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import os
+import pickle
+import time
+from collections.abc import Callable, Collection, Mapping, Sequence
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import ModuleType
+
+import pandas as pd
+
+from response_cache import CACHE_DIR_ENV, DEFAULT_CACHE_DIR
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[..., object]
+    inputs: tuple[str, ...] = ()
+    columns: Mapping[str, Sequence[str]] = field(default_factory=dict)
+    version: str = "1"
+    cache: bool = True
+    depends: tuple[object, ...] = ()  # helpers the stage calls and constants it reads
+
+
+@dataclass
+class StageRun:
+    name: str
+    status: str  # "computed", "cached" or "uncached"
+    seconds: float
+    fingerprint: str
+
+
+def fingerprint(value) -> str:
+    """Content hash of a DataFrame, Series or any picklable value."""
+    digest = hashlib.sha256()
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr([(str(col), str(dtype)) for col, dtype in value.dtypes.items()]).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        digest.update(f"{value.name}:{value.dtype}".encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    else:
+        digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+
+def file_fingerprint(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source(obj) -> str:
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        return f"{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', repr(obj))}"
+
+
+def code_fingerprint(fn: Callable | ModuleType) -> str:
+    """Hash of the source of ``fn`` alone; code it calls is listed in ``Stage.depends``."""
+    fn = getattr(fn, "func", fn)  # functools.partial
+    return hashlib.sha256(_source(fn).encode("utf-8")).hexdigest()
+
+
+def dependency_fingerprint(obj) -> str:
+    """Source hash for functions, classes and modules, content hash for constants."""
+    if isinstance(obj, ModuleType) or inspect.isclass(obj) or callable(obj):
+        return code_fingerprint(obj)
+    return fingerprint(obj)
+
+
+class StageCache:
+    """Pickled stage outputs, ``keep`` most recent per stage."""
+
+    def __init__(self, directory: str | Path | None = None, keep: int = 3) -> None:
+        self.directory = Path(directory) if directory else Path(os.getenv(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)) / "stages"
+        self.keep = keep
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, name: str, key: str) -> Path:
+        return self.directory / f"{name}-{key[:32]}.pkl"
+
+    def get(self, name: str, key: str):
+        """(output, output fingerprint), or None on a miss or unreadable entry."""
+        path = self._path(name, key)
+        try:
+            with open(path, "rb") as handle:
+                entry = pickle.load(handle)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        os.utime(path)
+        return entry
+
+    def set(self, name: str, key: str, value, output_fingerprint: str) -> None:
+        path = self._path(name, key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as handle:
+            pickle.dump((value, output_fingerprint), handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        entries = sorted(self.directory.glob(f"{name}-*.pkl"), key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for stale in entries[self.keep :]:
+            stale.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        for entry in self.directory.glob("*.pkl"):
+            entry.unlink(missing_ok=True)
+
+
+def _project(value, columns: Sequence[str] | None):
+    if columns is None or not isinstance(value, pd.DataFrame):
+        return value
+    return value[[col for col in columns if col in value.columns]]
+
+
+def _run_stage(stage: Stage, values: dict, fingerprints: dict, cache: StageCache | None) -> tuple[object, StageRun]:
+    started = time.perf_counter()
+    args = []
+    parts = [stage.name, stage.version, code_fingerprint(stage.fn), *map(dependency_fingerprint, stage.depends)]
+    for name in stage.inputs:
+        columns = stage.columns.get(name)
+        arg = _project(values[name], columns)
+        args.append(arg)
+        parts.append(fingerprint(arg) if columns is not None else fingerprints[name])
+    key = hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    if cache is not None and stage.cache:
+        entry = cache.get(stage.name, key)
+        if entry is not None:
+            value, output_fingerprint = entry
+            return value, StageRun(stage.name, "cached", time.perf_counter() - started, output_fingerprint)
+
+    value = stage.fn(*args)
+    if cache is not None and stage.cache:
+        output_fingerprint = fingerprint(value)
+        cache.set(stage.name, key, value, output_fingerprint)
+        status = "computed"
+    else:
+        # Not cached: downstream keys chain off this stage's own key
+        output_fingerprint = key
+        status = "uncached"
+    return value, StageRun(stage.name, status, time.perf_counter() - started, output_fingerprint)
+
+
+def run_stages(
+    stages: Sequence[Stage],
+    sources: Mapping[str, object],
+    *,
+    source_fingerprints: Mapping[str, str] | None = None,
+    cache: StageCache | None = None,
+    max_workers: int = 4,
+    keep: Collection[str] | None = None,
+) -> tuple[dict[str, object], list[StageRun]]:
+    """Run ``stages`` over ``sources``; returns every value by name and one
+    ``StageRun`` per stage in completion order.
+
+    ``source_fingerprints`` overrides the fingerprint of a source, e.g. a file
+    hash for a source that is only a path. With ``keep``, a stage output is
+    dropped as soon as every stage reading it has finished, and only the
+    outputs named in ``keep`` (plus the sources) are returned.
+    """
+    values = dict(sources)
+    fingerprints = {name: fingerprint(value) for name, value in sources.items()}
+    fingerprints.update(source_fingerprints or {})
+    pending = {stage.name: stage for stage in stages}
+    known = set(values) | set(pending)
+    for stage in stages:
+        missing = [name for name in stage.inputs if name not in known]
+        if missing:
+            raise ValueError(f"Stage {stage.name!r} has unknown inputs: {missing}")
+
+    readers = {name: 0 for name in pending}
+    for stage in stages:
+        for name in stage.inputs:
+            if name in readers:
+                readers[name] += 1
+
+    def release(name: str) -> None:
+        if keep is not None and readers[name] == 0 and name not in keep:
+            values.pop(name, None)
+
+    runs: list[StageRun] = []
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="comparia-stage") as executor:
+        running = {}
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if all(dep in values for dep in stage.inputs):
+                    del pending[name]
+                    running[executor.submit(_run_stage, stage, values, fingerprints, cache)] = stage
+            if not running:
+                raise ValueError(f"Stage dependency cycle between: {sorted(pending)}")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                value, run = future.result()
+                values[stage.name] = value
+                fingerprints[stage.name] = run.fingerprint
+                runs.append(run)
+                release(stage.name)
+                for name in stage.inputs:
+                    if name in readers:
+                        readers[name] -= 1
+                        release(name)
+    return values, runs
@@ -4,5 +4,6 @@ Imports dashboard.main safely (dashboard.py has no Streamlit calls at import tim
 """
 
 from dashboard import main
+from profiling import run_profiled
 
-main()
+run_profiled(main, "dashboard")
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Vectorized, seedable synthetic benchmark runs for demos and load tests."""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_CATEGORIES = (
+    "Factual & Rewriting",
+    "Reasoning & Quantitative",
+    "Programming & Debugging",
+    "Knowledge & Synthesis",
+    "Advanced & Creative",
+)
+REFERENCE_MODELS = [
+    ("LLaMA 3.1 8B", "Small"),
+    ("Gemma 8B", "Small"),
+    ("Mistral Small", "Medium"),
+    ("GPT-OSS 20B", "Medium"),
+    ("GPT-5", "Large"),
+    ("DeepSeek R1", "Large"),
+]
+# (mean, std) per metric and size class, in dashboard.py units:
+# rubric 1-5, seconds, kWh, kg CO2 eq. and EUR per task.
+SIZE_PROFILES = {
+    "Small": {
+        "Quality_Score": (3.7, 0.45),
+        "Latency_sec": (2.6, 0.468),
+        "Energy_kWh": (0.16, 0.0288),
+        "CO2_kg": (0.072, 0.0128),
+        "Cost_EUR": (0.02, 0.0032),
+    },
+    "Medium": {
+        "Quality_Score": (4.1, 0.45),
+        "Latency_sec": (4.4, 0.792),
+        "Energy_kWh": (0.34, 0.0612),
+        "CO2_kg": (0.153, 0.0272),
+        "Cost_EUR": (0.08, 0.0128),
+    },
+    "Large": {
+        "Quality_Score": (4.45, 0.45),
+        "Latency_sec": (6.8, 1.224),
+        "Energy_kWh": (0.88, 0.1584),
+        "CO2_kg": (0.396, 0.0704),
+        "Cost_EUR": (0.26, 0.0416),
+    },
+}
+# The last third of the task list is harder: lower quality, higher footprint.
+HARD_TASK_MULTIPLIERS = {
+    "Quality_Score": 1 / 1.1,
+    "Latency_sec": 1.1,
+    "Energy_kWh": 1.1,
+    "CO2_kg": 1.1,
+    "Cost_EUR": 1.1,
+}
+BOUNDS = {
+    "Quality_Score": (1.0, 5.0),
+    "Latency_sec": (0.2, None),
+    "Energy_kWh": (0.01, None),
+    "CO2_kg": (0.005, None),
+    "Cost_EUR": (0.001, None),
+}
+
+
+def build_profiles(
+    models: list[tuple[str, str]],
+    size_profiles: dict[str, dict[str, tuple[float, float]]] = SIZE_PROFILES,
+) -> pd.DataFrame:
+    """Model × metric table with ``<metric>_mean`` / ``<metric>_std`` columns."""
+    rows = []
+    for model, size in models:
+        row = {"Model": model, "Model_Size": size}
+        for metric, (mean, std) in size_profiles[size].items():
+            row[f"{metric}_mean"] = mean
+            row[f"{metric}_std"] = std
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def default_profiles(n_models: int = len(REFERENCE_MODELS)) -> pd.DataFrame:
+    """The six reference models, followed by numbered variants that cycle
+    through the size classes when more models are requested."""
+    models = list(REFERENCE_MODELS[:n_models])
+    sizes = list(SIZE_PROFILES)
+    for index in range(len(models), n_models):
+        size = sizes[index % len(sizes)]
+        models.append((f"Variant {index + 1:05d} ({size})", size))
+    return build_profiles(models)
+
+
+def _clip(values: np.ndarray, bound: tuple[float | None, float | None] | None) -> np.ndarray:
+    lo, hi = bound or (None, None)
+    if lo is not None or hi is not None:
+        np.clip(values, lo, hi, out=values)
+    return values
+
+
+def generate_runs(
+    profiles: pd.DataFrame | None = None,
+    *,
+    n_tasks: int = 30,
+    repetitions: int = 1,
+    seed: int = 42,
+    categories: tuple[str, ...] = DEFAULT_CATEGORIES,
+    hard_task_multipliers: dict[str, float] | None = None,
+    hard_task_share: float = 1 / 3,
+    bounds: dict[str, tuple[float | None, float | None]] | None = None,
+    derived: dict[str, Callable[[dict[str, np.ndarray]], np.ndarray]] | None = None,
+    notes: str = "Synthetic demonstration row",
+    categorical: bool = True,
+) -> pd.DataFrame:
+    """Draw models × tasks × repetitions runs in one RNG call.
+
+    Every metric with ``<metric>_mean`` and ``<metric>_std`` columns in
+    ``profiles`` is sampled from a normal distribution, scaled on hard tasks and
+    clipped to ``bounds``. Each ``derived`` column is then computed from the
+    sampled columns (e.g. CO2 from energy) and clipped the same way. Rows are ordered model-major, then task, then
+    repetition. The same ``seed`` always yields the same frame.
+    """
+    profiles = default_profiles() if profiles is None else profiles
+    hard_task_multipliers = HARD_TASK_MULTIPLIERS if hard_task_multipliers is None else hard_task_multipliers
+    bounds = BOUNDS if bounds is None else bounds
+    metrics = [col[: -len("_mean")] for col in profiles.columns if col.endswith("_mean")]
+    n_models = len(profiles)
+    n_rows = n_models * n_tasks * repetitions
+
+    rng = np.random.default_rng(seed)
+    draws = rng.standard_normal((len(metrics), n_models, n_tasks, repetitions))
+
+    task_ids = np.arange(1, n_tasks + 1)
+    hard = task_ids > round(n_tasks * (1 - hard_task_share))
+    category_codes = np.minimum((task_ids - 1) * len(categories) // n_tasks, len(categories) - 1)
+
+    columns: dict[str, object] = {}
+    model_codes = np.repeat(np.arange(n_models), n_tasks * repetitions)
+    task_index = np.tile(np.repeat(np.arange(n_tasks), repetitions), n_models)
+    size_names = pd.Index(profiles["Model_Size"].unique())
+    size_codes = size_names.get_indexer(profiles["Model_Size"])
+    columns["Task_ID"] = task_ids[task_index]
+    columns["Task_Category"] = pd.Categorical.from_codes(category_codes[task_index], categories=list(categories))
+    columns["Model"] = pd.Categorical.from_codes(model_codes, categories=profiles["Model"].tolist())
+    columns["Model_Size"] = pd.Categorical.from_codes(size_codes[model_codes], categories=size_names.tolist())
+    if repetitions > 1:
+        columns["Repetition"] = np.tile(np.arange(1, repetitions + 1), n_models * n_tasks)
+
+    for index, metric in enumerate(metrics):
+        values = draws[index]
+        values *= profiles[f"{metric}_std"].to_numpy(dtype=float)[:, None, None]
+        values += profiles[f"{metric}_mean"].to_numpy(dtype=float)[:, None, None]
+        multiplier = hard_task_multipliers.get(metric, 1.0)
+        if multiplier != 1.0:
+            values[:, hard, :] *= multiplier
+        columns[metric] = _clip(values.reshape(n_rows), bounds.get(metric))
+    for metric, derive in (derived or {}).items():
+        columns[metric] = _clip(np.asarray(derive(columns), dtype=float), bounds.get(metric))
+
+    columns["Notes"] = pd.Categorical.from_codes(np.zeros(n_rows, dtype=np.int8), categories=[notes])
+    runs = pd.DataFrame(columns, copy=False)
+    if not categorical:
+        runs = runs.astype({col: object for col in ("Task_Category", "Model", "Model_Size", "Notes")})
+    return runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--models", type=int, default=len(REFERENCE_MODELS))
+    parser.add_argument("--tasks", type=int, default=30)
+    parser.add_argument("--repetitions", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, required=True, help="Destination .csv or .parquet file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    runs = generate_runs(default_profiles(args.models), n_tasks=args.tasks, repetitions=args.repetitions, seed=args.seed)
+    generated = time.perf_counter()
+    if args.output.suffix == ".parquet":
+        runs.to_parquet(args.output, index=False)
+    else:
+        runs.to_csv(args.output, index=False)
+    print(f"Generated {len(runs):,} rows in {generated - started:.2f}s, wrote {args.output} in {time.perf_counter() - generated:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import httpx
+import pytest
+
+import batch_calls
+from batch_calls import CallReport, TokenBucket, call_with_backoff, is_retryable, run_batch
+
+
+class FakeClock:
+    """Stands in for time.monotonic/time.sleep so waits are instant and exact."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(batch_calls.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(batch_calls.time, "sleep", fake.sleep)
+    return fake
+
+
+def status_error(code: int, headers: dict[str, str] | None = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://api.example.test/v1/chat/completions")
+    response = httpx.Response(code, headers=headers, request=request)
+    return httpx.HTTPStatusError(f"HTTP {code}", request=request, response=response)
+
+
+def failing(*errors: BaseException, result: object = "ok"):
+    pending = list(errors)
+
+    def call():
+        if pending:
+            raise pending.pop(0)
+        return result
+
+    return call
+
+
+@pytest.mark.parametrize(
+    "exc",
+    [
+        TimeoutError(),
+        ConnectionResetError(),
+        httpx.ConnectError("refused"),
+        httpx.ReadTimeout("slow"),
+        httpx.RemoteProtocolError("closed"),
+        status_error(429),
+        status_error(503),
+    ],
+)
+def test_retryable_errors(exc):
+    assert is_retryable(exc)
+
+
+@pytest.mark.parametrize("exc", [ValueError("bad"), status_error(400), status_error(401), KeyError("x")])
+def test_non_retryable_errors(exc):
+    assert not is_retryable(exc)
+
+
+def test_retries_until_success(clock):
+    report = CallReport("call")
+    call = failing(httpx.ConnectError("refused"), status_error(502))
+
+    assert call_with_backoff(call, report, base_delay=0.5) == "ok"
+    assert report.attempts == 3
+    assert report.retries == 2
+    assert report.error == ""
+    assert len(clock.sleeps) == 2
+    assert 0 <= clock.sleeps[0] <= 0.5 and 0 <= clock.sleeps[1] <= 1.0
+
+
+def test_gives_up_after_max_retries(clock):
+    report = CallReport("call")
+    call = failing(*[httpx.ReadTimeout("slow")] * 10)
+
+    with pytest.raises(httpx.ReadTimeout):
+        call_with_backoff(call, report, max_retries=3, base_delay=1.0, max_delay=2.0)
+    assert report.attempts == 4
+    assert report.error == "slow"
+    assert len(clock.sleeps) == 3
+    assert max(clock.sleeps) <= 2.0
+
+
+def test_non_retryable_error_is_raised_at_once(clock):
+    report = CallReport("call")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        call_with_backoff(failing(status_error(400)), report)
+    assert report.attempts == 1
+    assert clock.sleeps == []
+
+
+def test_retry_after_header_sets_the_delay(clock):
+    report = CallReport("call")
+    call = failing(status_error(429, {"Retry-After": "7"}))
+
+    assert call_with_backoff(call, report, max_delay=1.0) == "ok"
+    assert clock.sleeps == [7.0]
+    assert report.waited_sec == pytest.approx(7.0)
+
+
+def test_unparseable_retry_after_falls_back_to_backoff(clock):
+    call = failing(status_error(503, {"Retry-After": "Wed, 21 Oct 2026 07:28:00 GMT"}))
+
+    assert call_with_backoff(call, CallReport("call"), base_delay=0.5) == "ok"
+    assert len(clock.sleeps) == 1 and clock.sleeps[0] <= 0.5
+
+
+def test_token_bucket_allows_a_burst_then_paces(clock):
+    bucket = TokenBucket(rate=2.0, capacity=3)
+
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert bucket.acquire() == pytest.approx(0.5)
+    clock.now += 10.0
+    # Idle time refills the bucket up to its capacity only.
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(0.5)
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_each_attempt_takes_a_token(clock):
+    bucket = TokenBucket(rate=1.0, capacity=1)
+    report = CallReport("call")
+    call = failing(httpx.ConnectError("refused"))
+
+    call_with_backoff(call, report, bucket=bucket, base_delay=0.0)
+    assert report.attempts == 2
+    assert report.waited_sec == pytest.approx(1.0)
+
+
+def test_run_batch_keeps_failures_per_call(clock):
+    results, reports = run_batch(
+        {"a": failing(result=1), "b": failing(status_error(401)), "c": failing(httpx.ReadTimeout("slow"), result=3)},
+        rate_per_sec=1000.0,
+        base_delay=0.0,
+    )
+
+    assert results["a"] == 1 and results["c"] == 3
+    assert isinstance(results["b"], httpx.HTTPStatusError)
+    assert [report.label for report in reports] == ["a", "b", "c"]
+    assert [report.attempts for report in reports] == [1, 1, 2]
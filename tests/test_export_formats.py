@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import gzip
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from export_formats import EXPORT_FORMATS, write_export
+
+CASES = [(fmt, compression) for fmt, spec in EXPORT_FORMATS.items() for compression in spec.compressions]
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "Model": [f"model-{i % 7}" for i in range(1000)],
+            "Quality_Score": rng.uniform(1, 5, 1000).round(3),
+            "Energy_kWh": np.where(np.arange(1000) % 50 == 0, np.nan, rng.uniform(0, 0.01, 1000)),
+            "Task_ID": np.arange(1000),
+        }
+    )
+
+
+def read_back(data: bytes, fmt: str, compression: str) -> pd.DataFrame:
+    if fmt == "csv":
+        return pd.read_csv(io.BytesIO(gzip.decompress(data) if compression == "gzip" else data))
+    if fmt == "parquet":
+        return pd.read_parquet(io.BytesIO(data))
+    if fmt == "arrow":
+        return pa.ipc.open_file(pa.BufferReader(data)).read_pandas()
+    return pd.read_excel(io.BytesIO(data), sheet_name="data")
+
+
+@pytest.mark.parametrize(("fmt", "compression"), CASES)
+def test_streamlit_accepts_export(frame, fmt, compression):
+    export = write_export(frame, fmt, compression, chunk_rows=300)
+    data, _ = convert_data_to_bytes_and_infer_mime(export, TypeError(f"unsupported type {type(export)}"))
+    export.close()
+
+    pd.testing.assert_frame_equal(read_back(data, fmt, compression), frame, check_dtype=False)
+
+
+def test_export_file_is_removed_on_close(frame):
+    export = write_export(frame, "csv")
+    assert os.path.exists(export.name)
+    export.close()
+    assert not os.path.exists(export.name)
+
+
+def test_unknown_format_and_compression_are_rejected(frame):
+    with pytest.raises(ValueError):
+        write_export(frame, "json")
+    with pytest.raises(ValueError):
+        write_export(frame, "csv", "zstd")
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import generate_report
+from report_store import ReportWriter, load_analysis_report
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    rng = np.random.default_rng(0)
+    runs = pd.DataFrame(
+        {
+            "Prompt Category": rng.choice(["Factual", "Coding"], 60),
+            "Task ID": np.arange(60) % 30 + 1,
+            "Model": np.repeat(["Gemma 8B", "GPT-5"], 30),
+            "Quality (1-5)": rng.integers(1, 6, 60),
+            "Latency (sec)": rng.uniform(1, 5, 60),
+            "Energy": rng.uniform(0.1, 1, 60),
+            "co2": rng.uniform(0.1, 1, 60),
+        }
+    )
+    path = tmp_path / "runs.xlsx"
+    runs.to_excel(path, sheet_name="Runs", index=False)
+    return path
+
+
+def test_stages_write_the_same_report_as_the_analysis_dict(workbook, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    generate_report.main(["--workbook", str(workbook), "--cache-dir", str(tmp_path / "cache"), "--output", "staged"])
+
+    runs = generate_report.read_comparai_workbook(workbook)
+    metrics = generate_report.calculate_advanced_metrics(runs)
+    generate_report.save_analysis_report(
+        metrics,
+        generate_report.perform_statistical_analysis(runs, metrics),
+        generate_report.generate_insights(metrics),
+        generate_report.generate_recommendations(metrics),
+        tmp_path / "reference",
+    )
+
+    staged = load_analysis_report(tmp_path / "staged")
+    reference = load_analysis_report(tmp_path / "reference")
+    assert list(staged.tables) == generate_report.REPORT_TABLES
+    for name, table in reference.tables.items():
+        pd.testing.assert_frame_equal(staged.tables[name], table)
+    without_created = lambda manifest: {key: value for key, value in manifest.items() if key != "created"}
+    assert without_created(staged.manifest) == without_created(reference.manifest)
+
+
+def test_section_tables_are_not_kept(workbook, tmp_path):
+    with ReportWriter(tmp_path / "report") as report:
+        values, runs = generate_report.run_report_stages(workbook, use_cache=False, report=report)
+
+    assert set(values) == {"workbook", "report", *generate_report.REPORT_VALUES}
+    assert values["store_by_size"] == report.manifest["tables"]["by_size"]
+    assert len(runs) == len(generate_report.REPORT_STAGES) + len(generate_report.STORE_STAGES)
+
+
+def test_dashboard_reads_the_saved_report(workbook, tmp_path, monkeypatch):
+    import dashboard
+
+    monkeypatch.chdir(tmp_path)
+    generate_report.main(["--workbook", str(workbook), "--no-cache"])
+    csv = pd.read_csv(dashboard.AGGREGATED_DATA_FILE)
+    (tmp_path / dashboard.AGGREGATED_DATA_FILE).unlink()
+
+    metrics, message = dashboard.load_aggregated_data()
+    assert message.endswith("comparai_analysis_report/metrics.parquet")
+    pd.testing.assert_frame_equal(metrics, csv, check_dtype=False)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard import tail_percentiles
+from quantile_sketch import KLLSketch
+
+QS = np.linspace(0.01, 0.99, 99)
+
+
+def rank_errors(data: np.ndarray, estimates: np.ndarray) -> np.ndarray:
+    ranks = np.searchsorted(np.sort(data), estimates, side="right") / data.size
+    return np.abs(ranks - QS)
+
+
+@pytest.fixture
+def data() -> np.ndarray:
+    return np.random.default_rng(7).lognormal(size=100_000)
+
+
+@pytest.mark.parametrize("k", [50, 200])
+def test_quantiles_within_rank_error(data, k):
+    sketch = KLLSketch(k, seed=1)
+    for batch in np.array_split(data, 37):
+        sketch.update(batch)
+    estimates = sketch.quantiles(QS)
+
+    assert sketch.count == data.size
+    assert sketch.retained < 3 * k
+    assert rank_errors(data, estimates).max() <= sketch.rank_error
+    # The same bound expressed against np.quantile's own ranks.
+    assert rank_errors(data, np.quantile(data, QS)).max() <= 1 / data.size + 1e-12
+
+
+def test_small_input_is_exact():
+    values = np.arange(100.0)
+    sketch = KLLSketch(200, seed=0).update(values)
+    np.testing.assert_allclose(sketch.quantiles([0.5, 0.9]), np.quantile(values, [0.5, 0.9]))
+
+
+def test_merge_matches_sketch_over_concatenated_data(data):
+    parts = np.array_split(data, 10)
+    merged = KLLSketch(200, seed=0).update(parts[0])
+    for seed, part in enumerate(parts[1:], start=1):
+        merged.merge(KLLSketch(200, seed=seed).update(part))
+    whole = KLLSketch(200, seed=0).update(data)
+
+    assert (merged.count, merged.min, merged.max) == (whole.count, whole.min, whole.max)
+    assert rank_errors(data, merged.quantiles(QS)).max() <= merged.rank_error
+    # Both are estimates of the same ranks, so they differ by at most twice the bound.
+    sorted_data = np.sort(data)
+    merged_ranks = np.searchsorted(sorted_data, merged.quantiles(QS), side="right")
+    whole_ranks = np.searchsorted(sorted_data, whole.quantiles(QS), side="right")
+    assert np.abs(merged_ranks - whole_ranks).max() / data.size <= 2 * whole.rank_error
+
+
+def test_tail_percentiles_per_model_and_category():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(
+        {
+            "Model": rng.choice(["A", "B", "C"], 3000),
+            "Model_Size": "Small",
+            "Task_Category": rng.choice(["Factual", "Coding"], 3000),
+            "Latency_sec": rng.lognormal(size=3000),
+            "Energy_kWh": rng.lognormal(size=3000) / 1000,
+        }
+    )
+    tails = tail_percentiles(df)
+
+    assert set(tails) == {"model", "category"}
+    assert sorted(tails["model"]["Model"]) == ["A", "B", "C"]
+    by_category = tails["category"].set_index("Task_Category")
+    assert sorted(by_category.index) == ["Coding", "Factual"]
+    for category, runs in df.groupby("Task_Category"):
+        expected = np.quantile(runs["Latency_sec"], 0.9)
+        assert by_category.loc[category, "Latency_sec_p90"] == pytest.approx(expected, rel=0.1)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import importlib
+import sys
+import textwrap
+
+import pandas as pd
+import pytest
+
+from stage_dag import Stage, StageCache, run_stages
+
+MODULE = '''
+SCALE = {scale}
+
+
+def double(value):
+    return value * 2
+
+
+def shift(value):
+    return value + {shift}
+
+
+def doubled(frame):
+    return frame.assign(x=double(frame["x"]))
+
+
+def shifted(frame):
+    return frame.assign(x=shift(frame["x"]) * SCALE)
+'''
+
+
+@pytest.fixture
+def write_module(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    def write(scale: int = 1, shift: int = 1):
+        (tmp_path / "dag_helpers.py").write_text(textwrap.dedent(MODULE.format(scale=scale, shift=shift)))
+        if "dag_helpers" in sys.modules:
+            return importlib.reload(sys.modules["dag_helpers"])
+        return importlib.import_module("dag_helpers")
+
+    yield write
+    sys.modules.pop("dag_helpers", None)
+
+
+def run(module, cache):
+    stages = [
+        Stage("doubled", module.doubled, inputs=("frame",), depends=(module.double,)),
+        Stage("shifted", module.shifted, inputs=("frame",), depends=(module.shift, module.SCALE)),
+    ]
+    values, runs = run_stages(stages, {"frame": pd.DataFrame({"x": [1, 2, 3]})}, cache=cache)
+    return values, {stage_run.name: stage_run.status for stage_run in runs}
+
+
+def test_only_stages_listing_an_edited_helper_rerun(write_module, tmp_path):
+    cache = StageCache(tmp_path / "cache")
+    assert run(write_module(), cache)[1] == {"doubled": "computed", "shifted": "computed"}
+    assert run(write_module(), cache)[1] == {"doubled": "cached", "shifted": "cached"}
+
+    values, statuses = run(write_module(shift=10), cache)
+    assert statuses == {"doubled": "cached", "shifted": "computed"}
+    assert values["shifted"]["x"].tolist() == [11, 12, 13]
+
+
+def test_constants_are_keyed_on_their_value(write_module, tmp_path):
+    cache = StageCache(tmp_path / "cache")
+    run(write_module(), cache)
+
+    values, statuses = run(write_module(scale=3), cache)
+    assert statuses == {"doubled": "cached", "shifted": "computed"}
+    assert values["shifted"]["x"].tolist() == [6, 9, 12]
+
+
+def test_keep_drops_consumed_outputs():
+    stages = [
+        Stage("a", lambda x: x + 1, inputs=("x",)),
+        Stage("b", lambda a: a * 2, inputs=("a",)),
+        Stage("c", lambda a, b: a + b, inputs=("a", "b")),
+    ]
+    values, runs = run_stages(stages, {"x": 1}, keep=("c",))
+
+    assert values == {"x": 1, "c": 6}
+    assert len(runs) == 3
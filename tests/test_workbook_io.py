@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import re
+import shutil
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from workbook_io import DEFAULT_READER, READER_ENV, RUNS_SHEET, WORKBOOK_PATH, available_readers, read_sheet, update_runs
+
+ROOT = Path(__file__).resolve().parents[1]
+HEADER = ["Task ID", "Model", "Quality", "Notes"]
+ROWS = [[1, "Gemma 8B", 3, "short"], [1, "GPT-5", 5, "long"], [2, "Gemma 8B", 4, "short"]]
+
+
+def part(path: Path, name: str) -> str:
+    with zipfile.ZipFile(path) as archive:
+        return archive.read(name).decode("utf-8")
+
+
+def rewrite_part(path: Path, name: str, edit) -> None:
+    with zipfile.ZipFile(path) as archive:
+        parts = [(info, archive.read(info)) for info in archive.infolist()]
+    with zipfile.ZipFile(path, "w") as archive:
+        for info, data in parts:
+            archive.writestr(info, edit(data.decode("utf-8")).encode("utf-8") if info.filename == name else data)
+
+
+def read_both(path: Path) -> tuple[list[list], pd.DataFrame]:
+    workbook = load_workbook(path)
+    rows = [list(row) for row in workbook[RUNS_SHEET].iter_rows(values_only=True)]
+    return rows, pd.read_excel(path, sheet_name=RUNS_SHEET)
+
+
+@pytest.fixture
+def workbook(tmp_path) -> Path:
+    book = Workbook()
+    runs = book.active
+    runs.title = RUNS_SHEET
+    runs.append(HEADER)
+    for row in ROWS:
+        runs.append(row)
+    summary = book.create_sheet("Summary")
+    summary["A1"] = "=AVERAGE(Runs!C2:C100)"
+    path = tmp_path / "runs.xlsx"
+    book.save(path)
+    return path
+
+
+def test_update_existing_row(workbook):
+    report = update_runs([{"Task ID": 1, "Model": "GPT-5", "Quality": 4, "Notes": "edited & <escaped>"}], workbook)
+
+    assert (report.updated, report.appended, report.unchanged) == (1, 0, 0)
+    rows, df = read_both(workbook)
+    assert rows == [HEADER, ROWS[0], [1, "GPT-5", 4, "edited & <escaped>"], ROWS[2]]
+    assert df.to_dict("list") == {
+        "Task ID": [1, 1, 2],
+        "Model": ["Gemma 8B", "GPT-5", "Gemma 8B"],
+        "Quality": [3, 4, 4],
+        "Notes": ["short", "edited & <escaped>", "short"],
+    }
+
+
+def test_append_new_rows(workbook):
+    report = update_runs(
+        pd.DataFrame({"Task ID": ["2", 3], "Model": ["GPT-5", "GPT-5"], "Quality": [2.5, 5], "Notes": [None, "new"]}),
+        workbook,
+    )
+
+    assert (report.updated, report.appended) == (0, 2)
+    rows, df = read_both(workbook)
+    assert rows[1:4] == ROWS
+    assert rows[4:] == [["2", "GPT-5", 2.5, None], [3, "GPT-5", 5, "new"]]
+    assert len(df) == 5 and df["Quality"].tolist() == [3, 5, 4, 2.5, 5]
+    assert re.search(r'<dimension ref="A1:D6"', part(workbook, "xl/worksheets/sheet1.xml"))
+
+
+def test_matching_values_are_left_alone(workbook):
+    before = workbook.read_bytes()
+    report = update_runs([{"Task ID": "1", "Model": "Gemma 8B", "Quality": 3.0, "Notes": None}], workbook)
+
+    assert (report.updated, report.appended, report.unchanged) == (0, 0, 1)
+    assert workbook.read_bytes() == before
+
+
+@pytest.fixture
+def committed(tmp_path) -> Path:
+    """A copy of the shipped workbook: shared strings, no <dimension>, an empty <calcPr/>."""
+    path = tmp_path / "benchmark.xlsx"
+    shutil.copy(ROOT / WORKBOOK_PATH, path)
+    return path
+
+
+def test_existing_shared_strings_are_kept(committed):
+    shared = part(committed, "xl/sharedStrings.xml")
+    update_runs([{"Task ID": 1, "Model": "Gemma 8B", "Task Description": "Who leads the UN?"}], committed)
+
+    # New text goes inline; the shared string table and the cells pointing into it are untouched
+    assert part(committed, "xl/sharedStrings.xml") == shared
+    sheet = part(committed, "xl/worksheets/sheet1.xml")
+    assert re.search(r'<c r="E3"[^>]*t="inlineStr"><is><t>Who leads the UN\?</t></is></c>', sheet)
+    assert re.search(r'<c r="F3" s="2" t="s"><v>\d+</v></c>', sheet)
+    rows, df = read_both(committed)
+    assert rows[2][2:6] == ["Easy factual & rewriting", 1, "Who leads the UN?", "Gemma 8B"]
+    assert df.loc[1, "Task Description"] == "Who leads the UN?"
+    assert df.loc[0, "Task Description"] == "Who is the current UN Secretary-General?"
+
+
+def test_sheet_without_dimension(committed):
+    original = pd.read_excel(committed, sheet_name=None)
+    update_runs(
+        [
+            {"Task ID": 1, "Model": "Gemma 8B", "Quality (1-5)": 2},
+            {"Task ID": 31, "Model": "Gemma 8B", "Prompt Category": "Extra", "Quality (1-5)": 4},
+        ],
+        committed,
+    )
+
+    assert "<dimension" not in part(committed, "xl/worksheets/sheet1.xml")
+    rows, df = read_both(committed)
+    assert len(rows) == len(original[RUNS_SHEET]) + 2
+    assert rows[-1][2:7] == ["Extra", 31, None, "Gemma 8B", 4]
+    assert df.loc[1, "Quality (1-5)"] == 2
+    pd.testing.assert_frame_equal(df.iloc[:-1].drop(index=1), original[RUNS_SHEET].drop(index=1))
+    updated = pd.read_excel(committed, sheet_name=None)
+    for name in ("Reference", "Summary"):
+        pd.testing.assert_frame_equal(updated[name], original[name])
+
+
+def test_update_grows_dimension(workbook):
+    update_runs([{"Task ID": 4, "Model": "GPT-5", "Quality": 2}], workbook)
+
+    assert '<dimension ref="A1:D5"' in part(workbook, "xl/worksheets/sheet1.xml")
+    assert load_workbook(workbook, read_only=True)[RUNS_SHEET].max_row == 5
+
+
+@pytest.mark.parametrize(
+    "strip",
+    [
+        lambda xml: xml.replace('fullCalcOnLoad="1"', ""),
+        lambda xml: re.sub(r"<calcPr\b[^>]*/>", "", xml),
+    ],
+    ids=["calcPr without flag", "no calcPr"],
+)
+def test_workbook_recalculates_on_open(workbook, strip):
+    rewrite_part(workbook, "xl/workbook.xml", strip)
+    assert "fullCalcOnLoad" not in part(workbook, "xl/workbook.xml")
+    update_runs([{"Task ID": 3, "Model": "GPT-5", "Quality": 5}], workbook)
+
+    assert re.search(r'<calcPr\b[^>]*fullCalcOnLoad="1"', part(workbook, "xl/workbook.xml"))
+    assert load_workbook(workbook).calculation.fullCalcOnLoad is True
+    assert load_workbook(workbook)["Summary"]["A1"].value == "=AVERAGE(Runs!C2:C100)"
+
+
+def test_committed_workbook_recalculates_on_open(committed):
+    update_runs([{"Task ID": 1, "Model": "GPT-5", "Quality (1-5)": 1}], committed)
+
+    assert "<calcPr fullCalcOnLoad=\"1\"/>" in part(committed, "xl/workbook.xml")
+    assert load_workbook(committed).calculation.fullCalcOnLoad is True
+
+
+def test_output_leaves_source_untouched(workbook, tmp_path):
+    before = workbook.read_bytes()
+    target = tmp_path / "copy.xlsx"
+    update_runs([{"Task ID": 1, "Model": "GPT-5", "Quality": 1}], workbook, output=target)
+
+    assert workbook.read_bytes() == before
+    assert read_both(target)[0][2][2] == 1
+
+
+def test_unknown_column_is_rejected(workbook):
+    with pytest.raises(ValueError, match="no column"):
+        update_runs([{"Task ID": 1, "Model": "GPT-5", "Latency": 3}], workbook)
+
+
+@pytest.mark.parametrize("reader", available_readers())
+def test_readers_match_read_excel(committed, reader):
+    expected = pd.read_excel(committed, sheet_name=RUNS_SHEET)
+    df = read_sheet(committed, RUNS_SHEET, reader=reader)
+
+    # calamine names the blank first header "Unnamed: 0" where read_excel keeps " "
+    pd.testing.assert_frame_equal(df.set_axis(expected.columns, axis=1), expected)
+
+
+def test_reader_selection(committed, monkeypatch):
+    assert DEFAULT_READER == "pandas"
+    monkeypatch.setenv(READER_ENV, "nope")
+    with pytest.raises(ValueError, match="Unknown Excel reader"):
+        read_sheet(committed)
+    monkeypatch.setenv(READER_ENV, " OpenPyXL ")
+    assert len(read_sheet(committed)) == 180
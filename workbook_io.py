@@ -0,0 +1,437 @@
+"""Reading and in-place updates of the benchmark workbook's Runs sheet.
+
+``read_sheet`` loads a sheet into a DataFrame through one of ``READERS``,
+chosen by ``COMPARIA_EXCEL_READER``:
+
+- ``pandas`` (default): plain ``pd.read_excel``.
+- ``openpyxl``: openpyxl in read-only mode, rows streamed straight into the
+  frame without pandas' per-cell conversion.
+- ``calamine``: the Rust calamine parser through pandas; needs the optional
+  ``python-calamine`` package.
+
+scripts/benchmark_excel_readers.py times them on a workbook; measured numbers
+are in the README.
+
+For updates: an .xlsx file is a zip of XML parts. ``update_runs`` rewrites only the Runs
+sheet part, and within it only the rows whose values change plus the rows it
+appends; every other row keeps its original bytes, and every other part
+(the other sheets, styles, shared strings, drawings) is copied over as is.
+New and changed text is written as inline strings so the shared string table
+never has to be rebuilt. The workbook is flagged for a full recalculation on
+open, so formulas over the Runs sheet (the Summary sheet) pick up new values.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import numbers
+import os
+import re
+import time
+import zipfile
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from xml.sax.saxutils import escape, unescape
+
+import pandas as pd
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+WORKBOOK_PATH = "ComparAI_Benchmark_Template_v2 (3).xlsx"
+RUNS_SHEET = "Runs"
+KEY_COLUMNS = ("Task ID", "Model")
+READER_ENV = "COMPARIA_EXCEL_READER"
+DEFAULT_READER = "pandas"
+
+_ENTITIES = {"&quot;": '"', "&apos;": "'"}
+_ROW = re.compile(r"<row\b([^>]*?)(?:/>|>(.*?)</row>)", re.S)
+_CELL = re.compile(r"<c\b([^>]*?)(?:/>|>(.*?)</c>)", re.S)
+_CELL_COLUMN = re.compile(r'<c\b[^>]*?\br="([A-Z]+)\d+"[^>]*?(?:/>|>.*?</c>)', re.S)
+_ATTR = re.compile(r'([\w:]+)="([^"]*)"')
+_VALUE = re.compile(r"<v>(.*?)</v>", re.S)
+_TEXT = re.compile(r"<t\b[^>]*>(.*?)</t>", re.S)
+_ROW_NUMBER = re.compile(r'\br="(\d+)"')
+
+
+@dataclass
+class UpdateReport:
+    updated: int
+    appended: int
+    unchanged: int
+    seconds: float
+    path: Path
+
+    @property
+    def touched(self) -> int:
+        return self.updated + self.appended
+
+    def __str__(self) -> str:
+        return (
+            f"{self.path.name}: {self.updated} row(s) updated, {self.appended} appended, "
+            f"{self.unchanged} already up to date in {self.seconds * 1000:.1f} ms"
+        )
+
+
+@dataclass
+class _Row:
+    number: int
+    attrs: str
+    cells: dict[int, str]  # column -> cell xml
+    start: int
+    end: int
+
+
+def _attrs(text: str) -> dict[str, str]:
+    return dict(_ATTR.findall(text))
+
+
+def _style(cell: str) -> str | None:
+    return _attrs(_CELL.match(cell).group(1)).get("s")
+
+
+def _text(xml: str) -> str:
+    return unescape("".join(_TEXT.findall(xml)), _ENTITIES)
+
+
+def _read_pandas(path: str | Path, sheet: str) -> pd.DataFrame:
+    return pd.read_excel(path, sheet_name=sheet)
+
+
+def _read_openpyxl(path: str | Path, sheet: str) -> pd.DataFrame:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet].iter_rows(values_only=True)
+        header = next(rows, ())
+        records = [row for row in rows if any(value is not None for value in row)]
+    finally:
+        workbook.close()
+    width = max([len(header)] + [len(row) for row in records])
+    header = list(header) + [None] * (width - len(header))
+    columns = [f"Unnamed: {i}" if name is None else name for i, name in enumerate(header)]
+    df = pd.DataFrame.from_records(records, columns=columns).infer_objects()
+    # Match pd.read_excel: blanks are NaN, empty columns are float and
+    # whole-number columns int
+    for column in df.columns:
+        values = df[column]
+        if values.dtype == object and values.isna().all():
+            df[column] = values.astype(float)
+        elif values.dtype == object:
+            df[column] = values.where(values.notna(), float("nan"))
+        elif values.dtype.kind == "f" and values.notna().all() and (values % 1 == 0).all():
+            df[column] = values.astype("int64")
+    return df
+
+
+def _read_calamine(path: str | Path, sheet: str) -> pd.DataFrame:
+    return pd.read_excel(path, sheet_name=sheet, engine="calamine")
+
+
+@dataclass(frozen=True)
+class Reader:
+    read: Callable[[str | Path, str], pd.DataFrame]
+    module: str | None = None  # optional package the reader needs
+
+    @property
+    def available(self) -> bool:
+        return self.module is None or importlib.util.find_spec(self.module) is not None
+
+
+READERS = {
+    "pandas": Reader(_read_pandas),
+    "openpyxl": Reader(_read_openpyxl),
+    "calamine": Reader(_read_calamine, "python_calamine"),
+}
+
+
+def available_readers() -> list[str]:
+    return [name for name, reader in READERS.items() if reader.available]
+
+
+def read_sheet(path: str | Path = WORKBOOK_PATH, sheet: str = RUNS_SHEET, reader: str | None = None) -> pd.DataFrame:
+    """Load ``sheet`` with the first row as header; ``reader`` defaults to
+    ``COMPARIA_EXCEL_READER``, then ``pandas``."""
+    name = (reader or os.getenv(READER_ENV) or DEFAULT_READER).strip().lower()
+    if name not in READERS:
+        raise ValueError(f"Unknown Excel reader {name!r}; expected one of {sorted(READERS)}")
+    if not READERS[name].available:
+        raise ValueError(f"Excel reader {name!r} needs the {READERS[name].module} package")
+    return READERS[name].read(path, sheet)
+
+
+def _sheet_part(archive: zipfile.ZipFile, sheet: str) -> str:
+    workbook = archive.read("xl/workbook.xml").decode("utf-8")
+    for match in re.finditer(r"<sheet\b([^>]*)/?>", workbook):
+        attrs = _attrs(match.group(1))
+        if unescape(attrs.get("name", ""), _ENTITIES) == sheet:
+            rel_id = attrs["r:id"]
+            break
+    else:
+        raise KeyError(f"Workbook has no sheet named {sheet!r}")
+    rels = archive.read("xl/_rels/workbook.xml.rels").decode("utf-8")
+    for match in re.finditer(r"<Relationship\b([^>]*)/?>", rels):
+        attrs = _attrs(match.group(1))
+        if attrs.get("Id") == rel_id:
+            target = attrs["Target"]
+            return target.lstrip("/") if target.startswith("/") else str(PurePosixPath("xl") / target)
+    raise KeyError(f"No relationship {rel_id} for sheet {sheet!r}")
+
+
+def _shared_strings(archive: zipfile.ZipFile) -> list[str]:
+    try:
+        xml = archive.read("xl/sharedStrings.xml").decode("utf-8")
+    except KeyError:
+        return []
+    return [_text(item) for item in re.findall(r"<si>(.*?)</si>", xml, re.S)]
+
+
+def _cell_value(cell: str | None, strings: list[str]):
+    if cell is None:
+        return None
+    match = _CELL.match(cell)
+    kind = _attrs(match.group(1)).get("t", "n")
+    body = match.group(2) or ""
+    if kind == "inlineStr":
+        return _text(body)
+    match = _VALUE.search(body)
+    if match is None:
+        return None
+    raw = match.group(1)
+    if "&" in raw:
+        raw = unescape(raw, _ENTITIES)
+    if kind == "s":
+        return strings[int(raw)]
+    if kind in ("str", "e"):
+        return raw
+    if kind == "b":
+        return raw == "1"
+    return float(raw)
+
+
+def _parse_rows(sheet_data: str, offset: int) -> list[_Row]:
+    # Cell values are decoded on demand: a run only looks at its key cells
+    rows = []
+    for match in _ROW.finditer(sheet_data):
+        cells = {
+            column_index_from_string(cell.group(1)): cell.group(0)
+            for cell in _CELL_COLUMN.finditer(match.group(2) or "")
+        }
+        number = int(_ROW_NUMBER.search(match.group(1)).group(1))
+        rows.append(_Row(number, match.group(1), cells, offset + match.start(), offset + match.end()))
+    return rows
+
+
+def _is_blank(value) -> bool:
+    return value is None or (isinstance(value, float) and value != value) or value is pd.NA or value is pd.NaT
+
+
+def _key_part(value):
+    """Normalize a key cell: 7, 7.0 and "7" all match."""
+    if isinstance(value, str):
+        value = value.strip()
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return float(value) if isinstance(value, numbers.Real) else value
+
+
+def _same(old, new) -> bool:
+    if isinstance(new, str) or isinstance(old, str):
+        return str(old) == str(new)
+    try:
+        return float(old) == float(new)
+    except (TypeError, ValueError):
+        return old == new
+
+
+def _cell_xml(ref: str, style: str | None, value) -> str:
+    style_attr = f' s="{style}"' if style is not None else ""
+    if _is_blank(value):
+        return f'<c r="{ref}"{style_attr}/>'
+    if isinstance(value, bool):
+        return f'<c r="{ref}"{style_attr} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, numbers.Real):
+        return f'<c r="{ref}"{style_attr}><v>{float(value)!r}</v></c>'
+    text = str(value)
+    space = ' xml:space="preserve"' if text != text.strip() else ""
+    return f'<c r="{ref}"{style_attr} t="inlineStr"><is><t{space}>{escape(text)}</t></is></c>'
+
+
+def _row_xml(number: int, attrs: str, cells: dict[int, str]) -> str:
+    # spans is only a hint and may no longer hold for the new cells
+    attrs = re.sub(r'\s+spans="[^"]*"', "", attrs)
+    attrs = re.sub(r'\br="\d+"', f'r="{number}"', attrs) if 'r="' in attrs else f' r="{number}"{attrs}'
+    return f"<row{attrs}>" + "".join(cells[column] for column in sorted(cells)) + "</row>"
+
+
+def _records(runs) -> list[dict]:
+    if isinstance(runs, pd.DataFrame):
+        return runs.to_dict("records")
+    return [dict(row) for row in runs]
+
+
+def _recalculate_on_open(workbook_xml: str) -> str:
+    if re.search(r"<calcPr\b[^>]*\bfullCalcOnLoad=", workbook_xml):
+        return re.sub(r'(<calcPr\b[^>]*\bfullCalcOnLoad=")[^"]*"', r'\g<1>1"', workbook_xml)
+    if "<calcPr" in workbook_xml:
+        return re.sub(r"<calcPr\b", '<calcPr fullCalcOnLoad="1"', workbook_xml, count=1)
+    # calcPr follows definedNames (or sheets) in the schema order
+    for anchor in ("</definedNames>", "<definedNames/>", "</sheets>"):
+        if anchor in workbook_xml:
+            return workbook_xml.replace(anchor, anchor + '<calcPr fullCalcOnLoad="1"/>', 1)
+    return workbook_xml
+
+
+def update_runs(
+    runs: pd.DataFrame | Iterable[Mapping],
+    path: str | Path = WORKBOOK_PATH,
+    *,
+    sheet: str = RUNS_SHEET,
+    key: tuple[str, ...] = KEY_COLUMNS,
+    output: str | Path | None = None,
+) -> UpdateReport:
+    """Merge ``runs`` into the sheet: rows whose ``key`` columns match an
+    existing row overwrite its cells, the others are appended after the last
+    row with data. Columns are matched on the sheet's header row; blank
+    values leave an existing cell alone.
+
+    Writes ``output`` (default: ``path`` itself, replaced atomically).
+    """
+    started = time.perf_counter()
+    path = Path(path)
+    output = Path(output) if output else path
+    records = _records(runs)
+
+    with zipfile.ZipFile(path) as archive:
+        part = _sheet_part(archive, sheet)
+        strings = _shared_strings(archive)
+        xml = archive.read(part).decode("utf-8")
+        data_start = xml.find("<sheetData")
+        if data_start < 0:
+            raise ValueError(f"{part} has no sheetData")
+        if xml.startswith("<sheetData/>", data_start):
+            raise ValueError(f"Sheet {sheet!r} is empty; it needs at least a header row")
+        body_start = xml.index(">", data_start) + 1
+        body_end = xml.index("</sheetData>", body_start)
+        rows = _parse_rows(xml[body_start:body_end], body_start)
+
+        header_row = next(row for row in rows if row.cells)
+        header = {column: _cell_value(cell, strings) for column, cell in header_row.cells.items()}
+        columns = {str(value).strip(): column for column, value in header.items() if not _is_blank(value)}
+        missing = [name for name in key if name not in columns]
+        if missing:
+            raise ValueError(f"Sheet {sheet!r} has no key column(s) {missing}")
+        unknown = sorted({name for record in records for name in record} - set(columns))
+        if unknown:
+            raise ValueError(f"Sheet {sheet!r} has no column(s) {unknown}")
+
+        data_rows = [row for row in rows if row.number > header_row.number]
+        index: dict[tuple, _Row] = {}
+        for row in data_rows:
+            values = [_cell_value(row.cells.get(columns[name]), strings) for name in key]
+            if not any(_is_blank(value) for value in values):
+                index.setdefault(tuple(_key_part(value) for value in values), row)
+        filled = [row for row in data_rows if row.cells]
+        last = filled[-1] if filled else header_row
+        # New rows take each column's style from the last row with data
+        template = {column: _style(cell) for column, cell in last.cells.items() if 's="' in cell}
+        existing = {row.number: row for row in rows}
+
+        replacements: dict[int, str] = {}  # row number -> new row xml
+        updated = unchanged = appended = 0
+        next_number = last.number
+        for record in records:
+            key_values = tuple(_key_part(record.get(name)) for name in key)
+            if any(_is_blank(value) for value in key_values):
+                raise ValueError(f"Row without a complete key {key}: {record}")
+            row = index.get(key_values)
+            if row is not None:
+                changed = False
+                for name, value in record.items():
+                    if name in key:
+                        # Already equal up to _key_part ("7" matches 7); keep the cell's type
+                        continue
+                    column = columns[name]
+                    old_cell = row.cells.get(column)
+                    old_value = _cell_value(old_cell, strings)
+                    if _is_blank(value) or (not _is_blank(old_value) and _same(old_value, value)):
+                        continue
+                    style = _style(old_cell) if old_cell else template.get(column)
+                    row.cells[column] = _cell_xml(f"{get_column_letter(column)}{row.number}", style, value)
+                    changed = True
+                if changed:
+                    if row.number not in replacements:
+                        updated += 1
+                    replacements[row.number] = _row_xml(row.number, row.attrs, row.cells)
+                else:
+                    unchanged += 1
+                continue
+            next_number += 1
+            cells = {}
+            for name, value in record.items():
+                column = columns[name]
+                cells[column] = _cell_xml(f"{get_column_letter(column)}{next_number}", template.get(column), value)
+            placeholder = existing.get(next_number)
+            attrs = placeholder.attrs if placeholder is not None else ""
+            replacements[next_number] = _row_xml(next_number, attrs, cells)
+            # A later record with the same key updates this new row
+            index[key_values] = _Row(next_number, attrs, cells, -1, -1)
+            appended += 1
+
+        if replacements:
+            xml = _splice_rows(xml, rows, replacements, body_end)
+            xml = _update_dimension(xml, max([row.number for row in rows] + list(replacements)))
+            _write_parts(archive, output, {part: xml.encode("utf-8"), **_workbook_flag(archive)})
+        elif output != path:
+            _write_parts(archive, output, {})
+
+    return UpdateReport(updated, appended, unchanged, time.perf_counter() - started, output)
+
+
+def _splice_rows(xml: str, rows: list[_Row], replacements: dict[int, str], body_end: int) -> str:
+    """Swap the replaced rows in place and insert the new ones in row order."""
+    pieces = []
+    present = {row.number for row in rows}
+    pending = sorted(number for number in replacements if number not in present)
+    cursor = 0
+    for row in rows:
+        while pending and pending[0] < row.number:
+            pieces.append(xml[cursor : row.start])
+            cursor = row.start
+            pieces.append(replacements[pending.pop(0)])
+        if row.number in replacements:
+            pieces.append(xml[cursor : row.start])
+            pieces.append(replacements[row.number])
+            cursor = row.end
+    pieces.append(xml[cursor:body_end])
+    pieces.extend(replacements[number] for number in pending)
+    pieces.append(xml[body_end:])
+    return "".join(pieces)
+
+
+def _update_dimension(xml: str, last_row: int) -> str:
+    match = re.search(r'<dimension ref="([A-Z]+\d+)(?::([A-Z]+)(\d+))?"', xml)
+    if match is None or not match.group(2) or int(match.group(3)) >= last_row:
+        return xml
+    return xml[: match.start()] + f'<dimension ref="{match.group(1)}:{match.group(2)}{last_row}"' + xml[match.end() :]
+
+
+def _workbook_flag(archive: zipfile.ZipFile) -> dict[str, bytes]:
+    workbook = archive.read("xl/workbook.xml").decode("utf-8")
+    flagged = _recalculate_on_open(workbook)
+    return {"xl/workbook.xml": flagged.encode("utf-8")} if flagged != workbook else {}
+
+
+def _write_parts(archive: zipfile.ZipFile, output: Path, changed: dict[str, bytes]) -> None:
+    """Copy ``archive`` to ``output`` with the ``changed`` parts swapped in."""
+    tmp = output.with_name(f".{output.name}.{os.getpid()}.tmp")
+    try:
+        with zipfile.ZipFile(tmp, "w") as target:
+            for info in archive.infolist():
+                data = changed.get(info.filename)
+                target.writestr(info, archive.read(info) if data is None else data)
+        os.replace(tmp, output)
+    finally:
+        tmp.unlink(missing_ok=True)